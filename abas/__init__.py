@@ -0,0 +1 @@
+"""Abas do app Streamlit (``infos_influencers.py``), uma por módulo."""
@@ -0,0 +1,158 @@
+"""Aba Campanha: audiência combinada de um elenco e sugestão de elencos para um público-alvo.
+
+Só é executada com a aba aberta. Os vetores de audiência dos perfis ficam na
+sessão e só são refeitos quando algum arquivo muda; trocar o elenco apenas
+soma os vetores dos membros.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analise import campanha, instrumentacao, otimizacao, pontuacao, referencias
+
+CLASSES_ALTAS = ["Classe B", "Classe A"]
+EDUCACAO_ALTA = "> 12 anos"
+PERCENTUAL = st.column_config.NumberColumn(format="percent")
+
+
+def _seguidores(valor):
+	return f"{valor:,.0f}".replace(",", ".")
+
+
+def _simulacoes(elenco, metricas):
+	# Cada linha é o elenco atual com um perfil a mais (se fora) ou a menos (se
+	# dentro), obtida das somas do elenco mais ou menos os vetores do perfil
+	perfis, seguidores, classes, educacao = elenco.simular_cada()
+	colunas_altas = [pontuacao.COLUNAS_CLASSES.index(coluna) for coluna in CLASSES_ALTAS]
+	classes_altas = classes[:, colunas_altas].sum(axis=1)
+	educacao_alta = educacao[:, pontuacao.COLUNAS_EDUCACAO.index(EDUCACAO_ALTA)]
+	membros = np.zeros(len(elenco.vetores.influencers), dtype=bool)
+	membros[list(elenco.membros.values())] = True
+	df = pd.DataFrame({
+		"Perfil": elenco.vetores.influencers,
+		"Ação": np.where(membros, "Retirar", "Incluir"),
+		"Seguidores": seguidores,
+		"Classes A e B": classes_altas,
+		"Variação A e B": classes_altas - metricas.classes[CLASSES_ALTAS].to_numpy().sum(),
+		"> 12 anos de estudo": educacao_alta,
+		"Variação > 12 anos": educacao_alta - metricas.educacao[EDUCACAO_ALTA],
+	})
+	return df[perfis > 0].sort_values("Variação A e B", ascending=False, ignore_index=True)
+
+
+def _usar_elenco(perfis):
+	st.session_state["elenco_campanha"] = list(perfis)
+
+
+def _exibir_otimizador(vetores, membros):
+	# Os valores iniciais vão para o estado antes dos widgets, que não recebem value=
+	n_maximo = len(vetores.influencers)
+	st.session_state.setdefault("otimizacao_ponderar", True)
+	st.session_state["otimizacao_n_perfis"] = min(st.session_state.get("otimizacao_n_perfis", 5), n_maximo)
+
+	matriz = otimizacao.MatrizMetricas.construir(vetores)
+	metricas = st.multiselect("Maximizar a soma das participações", list(matriz.colunas), key="otimizacao_metricas")
+	col_n, col_opcoes = st.columns(2)
+	n_perfis = col_n.number_input("Número de perfis", min_value=1, max_value=n_maximo, step=1, key="otimizacao_n_perfis")
+	ponderar = col_opcoes.checkbox("Ponderar pelo número de seguidores", key="otimizacao_ponderar")
+	manter = col_opcoes.checkbox("Manter os perfis do elenco atual", key="otimizacao_manter")
+	if not metricas:
+		st.caption("Escolha as métricas do público-alvo (ex.: Classe A, Classe B e > 12 anos).")
+		return
+
+	alvo = otimizacao.Alvo(
+		{metrica: 1.0 for metrica in metricas},
+		int(n_perfis),
+		obrigatorios=tuple(membros) if manter else (),
+		ponderar_por_seguidores=ponderar,
+	)
+	try:
+		with instrumentacao.etapa("Otimização do elenco", linhas=n_maximo):
+			df_elencos = otimizacao.otimizar(matriz, alvo)
+	except ValueError as erro:
+		st.warning(str(erro))
+		return
+
+	st.caption("O primeiro elenco é o de maior pontuação; os seguintes trocam um perfil do primeiro.")
+	st.dataframe(
+		df_elencos.assign(Perfis=df_elencos["Perfis"].map(", ".join)),
+		hide_index=True,
+		column_config={
+			"Pontuação": st.column_config.NumberColumn(format="%.4f"),
+			"Seguidores": st.column_config.NumberColumn(format="localized"),
+			**{metrica: PERCENTUAL for metrica in metricas},
+		},
+	)
+	if len(df_elencos):
+		st.button("Usar o primeiro elenco", key="usar_elenco_otimizado", on_click=_usar_elenco, args=(df_elencos["Perfis"][0],))
+
+
+def exibir(armazem, tem_perfis):
+	"""Desenha a aba com os perfis carregados em ``armazem``."""
+	if not tem_perfis:
+		st.warning("Por favor, faça o upload de arquivos JSON válidos na primeira aba")
+		return
+
+	tabelas = armazem.tabelas
+	chave = (tuple(armazem.hashes.items()), referencias.versao())
+	with instrumentacao.etapa("Vetores de audiência", linhas=len(tabelas.perfis)):
+		vetores = armazem.vetores_audiencia(chave, lambda: campanha.VetoresAudiencia.construir(tabelas))
+
+	st.markdown("## Audiência combinada do elenco 🎯")
+	st.caption(
+		"Médias das audiências dos perfis escolhidos, ponderadas pelo número de seguidores. "
+		"O alcance por cidade é a soma dos seguidores estimados de cada perfil na cidade."
+	)
+	perfis = list(vetores.influencers)
+	# Perfis que saíram do upload deixam o elenco antes de o widget ser desenhado
+	if "elenco_campanha" in st.session_state:
+		st.session_state["elenco_campanha"] = [perfil for perfil in st.session_state["elenco_campanha"] if perfil in perfis]
+	membros = list(st.session_state.get("elenco_campanha", []))
+
+	with st.expander("🧮 Sugerir um elenco para um público-alvo"):
+		_exibir_otimizador(vetores, membros)
+
+	membros = st.multiselect("Perfis do elenco", perfis, key="elenco_campanha")
+	if not membros:
+		st.info("Escolha os perfis do elenco para ver a audiência combinada.")
+		return
+
+	sem_seguidores = [perfil for perfil, i in zip(membros, vetores.posicoes(membros)) if vetores.seguidores[i] <= 0]
+	if sem_seguidores:
+		st.warning("Sem número de seguidores (fora das médias): {}".format(", ".join(sem_seguidores)))
+
+	with instrumentacao.etapa("Métricas do elenco", linhas=len(membros)):
+		elenco = campanha.Elenco(vetores, membros)
+		metricas = elenco.metricas()
+
+	col_perfis, col_seguidores = st.columns(2)
+	col_perfis.metric("Perfis", metricas.perfis)
+	col_seguidores.metric("Seguidores somados", _seguidores(metricas.seguidores))
+
+	col_classes, col_educacao = st.columns(2)
+	with col_classes:
+		st.markdown("#### Classes sociais")
+		st.dataframe(metricas.classes.rename("Participação").to_frame(), column_config={"Participação": PERCENTUAL})
+	with col_educacao:
+		st.markdown("#### Escolaridade")
+		st.dataframe(metricas.educacao.rename("Probabilidade").to_frame(), column_config={"Probabilidade": PERCENTUAL})
+
+	col_cidades, col_interesses = st.columns(2)
+	with col_cidades:
+		st.markdown("#### Cidades com maior alcance")
+		st.dataframe(metricas.alcance_cidades.head(15).round().rename("Seguidores estimados").to_frame())
+	with col_interesses:
+		st.markdown("#### Interesses da audiência")
+		st.dataframe(metricas.interesses.head(10), column_config={"Peso": PERCENTUAL})
+
+	with st.expander("Simular a inclusão ou retirada de cada perfil"):
+		with instrumentacao.etapa("Simulações do elenco", linhas=len(perfis)):
+			df_simulacoes = _simulacoes(elenco, metricas)
+		st.dataframe(
+			df_simulacoes,
+			hide_index=True,
+			column_config={
+				coluna: PERCENTUAL
+				for coluna in ["Classes A e B", "Variação A e B", "> 12 anos de estudo", "Variação > 12 anos"]
+			},
+		)
@@ -0,0 +1,35 @@
+"""Recursos compartilhados entre as abas do app."""
+import streamlit as st
+
+from analise import acervo, cache
+
+# Widgets das abas executadas só quando abertas. O Streamlit descarta o estado
+# de um widget na execução em que ele não é desenhado; regravá-lo no início de
+# cada execução mantém as escolhas ao trocar de aba
+CHAVES_PERSISTENTES = ("formato_exportacao", "exportacao_extras", "select_influencer_posts", "elenco_campanha")
+PREFIXOS_PERSISTENTES = ("pagina_", "otimizacao_", "modelo_", "geografia_")
+
+
+@st.cache_resource
+def obter_cache_resultados():
+	return cache.CacheResultados()
+
+
+@st.cache_resource
+def obter_acervo():
+	return acervo.AcervoPerfis()
+
+
+def manter_estado():
+	"""Preserva o estado dos widgets das abas que não são executadas nesta atualização."""
+	for chave in list(st.session_state.keys()):
+		if chave in CHAVES_PERSISTENTES or chave.startswith(PREFIXOS_PERSISTENTES):
+			st.session_state[chave] = st.session_state[chave]
+
+
+def exibir_diagnostico(medidor, segundos, segundos_inicializacao):
+	"""Tempo total da atualização, importações do início do processo e etapas medidas em ``medidor``."""
+	st.caption("Última atualização: {:.2f} s. Importações no início do processo: {:.2f} s.".format(segundos, segundos_inicializacao))
+	st.dataframe(medidor.tabela(), hide_index=True)
+	if medidor.memoria_compartilhada:
+		st.caption("Outra sessão mediu a memória ao mesmo tempo: o pico das etapas sobrepostas ficou em branco.")
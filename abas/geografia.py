@@ -0,0 +1,73 @@
+"""Aba Geografia: alcance da audiência por cidade, UF e região.
+
+Só é executada com a aba aberta. O índice geográfico dos perfis fica na
+sessão e só é refeito quando algum arquivo muda; as consultas usam apenas as
+matrizes do índice.
+"""
+import streamlit as st
+
+from analise import geografia, instrumentacao, referencias
+
+TODOS = "Todos os perfis"
+ELENCO = "Elenco da aba Campanha"
+PERCENTUAL = st.column_config.NumberColumn(format="percent")
+SEGUIDORES = st.column_config.NumberColumn(format="localized")
+
+
+def exibir(armazem, tem_perfis):
+	"""Desenha a aba com os perfis carregados em ``armazem``."""
+	if not tem_perfis:
+		st.warning("Por favor, faça o upload de arquivos JSON válidos na primeira aba")
+		return
+
+	tabelas = armazem.tabelas
+	chave = (tuple(armazem.hashes.items()), referencias.versao())
+	with instrumentacao.etapa("Índice geográfico", linhas=len(tabelas.cidades)):
+		indice = armazem.indice_geografico(chave, lambda: geografia.IndiceGeografico.construir(tabelas))
+
+	st.markdown("## Geografia da audiência 🗺️")
+	st.caption(
+		"Seguidores estimados = seguidores do perfil × fração da audiência no local, somados entre os perfis. "
+		"O IMAI lista apenas as principais cidades de cada perfil."
+	)
+	base = st.radio("Perfis considerados", [TODOS, ELENCO], key="geografia_base", horizontal=True)
+	perfis = None
+	if base == ELENCO:
+		perfis = [perfil for perfil in st.session_state.get("elenco_campanha", []) if perfil in indice.influencers]
+		if not perfis:
+			st.info("O elenco da aba Campanha está vazio.")
+			return
+
+	with instrumentacao.etapa("Consultas geográficas"):
+		df_ufs = indice.alcance_por_uf(perfis)
+		df_regioes = indice.alcance_por_regiao(perfis)
+		df_cidades = indice.top_cidades(perfis, n=15)
+
+	col_ufs, col_regioes = st.columns([2, 1])
+	with col_ufs:
+		st.markdown("#### Alcance por UF")
+		st.bar_chart(df_ufs[df_ufs["Seguidores estimados"] > 0], x="UF", y="Seguidores estimados", sort="-Seguidores estimados")
+	with col_regioes:
+		st.markdown("#### Alcance por região")
+		st.dataframe(df_regioes[df_regioes["Seguidores estimados"] > 0], hide_index=True, column_config={"Seguidores estimados": SEGUIDORES, "Participação": PERCENTUAL})
+
+	st.markdown("#### Cidades com maior alcance")
+	st.dataframe(df_cidades, hide_index=True, column_config={"Seguidores estimados": SEGUIDORES})
+
+	st.markdown("#### Perfis com maior participação da audiência em um local")
+	# Começa pela UF de maior alcance; os valores iniciais vão para o estado antes dos widgets
+	st.session_state.setdefault("geografia_local", next(uf for uf in df_ufs["UF"] if uf != geografia.SEM_UF))
+	st.session_state.setdefault("geografia_minimo", 10.0)
+	col_local, col_minimo = st.columns(2)
+	locais = [uf for uf in indice.ufs if uf != geografia.SEM_UF] + [regiao for regiao in indice.regioes if regiao != geografia.SEM_UF]
+	local = col_local.selectbox(
+		"UF ou região",
+		locais,
+		key="geografia_local",
+		format_func=lambda local: "{} ({})".format(geografia.NOMES_UFS[local], local) if local in geografia.NOMES_UFS else local,
+	)
+	minimo = col_minimo.number_input("Participação mínima (%)", min_value=0.0, max_value=100.0, step=5.0, key="geografia_minimo")
+	with instrumentacao.etapa("Perfis por local"):
+		df_perfis = indice.perfis_com_participacao(local, minimo / 100, perfis)
+	st.caption("{} perfis com pelo menos {:g}% da audiência em {}.".format(len(df_perfis), minimo, local))
+	st.dataframe(df_perfis, hide_index=True, column_config={"Participação": PERCENTUAL, "Seguidores estimados": SEGUIDORES})
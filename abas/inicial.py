@@ -0,0 +1,210 @@
+"""Aba Página Inicial: upload dos JSON, perfis do acervo e ingestão.
+
+É executada em toda atualização do app, mesmo com outra aba aberta: o estado
+do uploader se perderia se ele deixasse de ser desenhado.
+"""
+import os
+
+import streamlit as st
+
+from abas import comum
+from analise import cache, decodificacao, ingestao, instrumentacao, referencias, sessao
+
+
+def _baixar_do_imai(acervo_perfis):
+	"""Baixa os relatórios dos perfis digitados direto para o acervo e os seleciona."""
+	from analise import imai
+
+	perfis = [perfil.strip().lstrip("@") for perfil in st.session_state.get("perfis_imai", "").replace(",", "\n").splitlines()]
+	perfis = [perfil for perfil in dict.fromkeys(perfis) if perfil]
+	if not perfis:
+		return
+
+	baixados = []
+
+	def guardar(perfil, conteudo, registro):
+		baixados.append((perfil, cache.sha256_conteudo(conteudo), "json_{}.json".format(perfil), conteudo, registro))
+
+	barra = st.progress(0.0, text="Baixando relatórios...")
+	with instrumentacao.etapa("Download do IMAI", linhas=len(perfis)), imai.ClienteIMAI() as cliente:
+		registros, erros = imai.baixar_registros(
+			cliente,
+			perfis,
+			progresso=lambda feitos, total: barra.progress(feitos / total, text=f"{feitos}/{total} relatórios baixados"),
+			ao_baixar=guardar,
+		)
+	barra.empty()
+	acervo_perfis.guardar(baixados)
+	for erro in erros:
+		st.warning(erro)
+	# O multiselect do acervo ainda não foi desenhado nesta execução
+	selecionados = st.session_state.get("perfis_acervo", [])
+	st.session_state["perfis_acervo"] = list(dict.fromkeys(selecionados + list(registros)))
+
+
+def exibir():
+	"""Desenha a aba e atualiza a sessão; retorna ``(armazem, tem_perfis)``."""
+	st.title("Análise de influenciadores")
+	st.markdown("### Introdução")
+	st.markdown('''Este app tem a função de consolidar o processo de extração de dados de influenciadores anteriormente 
+ 				implementado manualmente, caso a caso. O resumo tradicionalmente disponibilizado está disponível na aba
+	 			Resumo, com a opção de download direto de um arquivo Excel. Num futuro próximo planejamos separar e adicionar, ainda, dados e visualizações
+	 			relativas ao Influencer e à Audiência a outras abas.''')
+
+	st.markdown("### Como utilizar")
+	st.markdown('''Os arquivos de input devem ser arquivos .json extraídos
+ 				diretamente do IMAI. Para o processo ser bem-sucedido, os arquivos devem ser nomeados no formato
+	 			```json_{perfil do influenciador}.json```. Para já, apenas a análise dos perfis do Instagram é funcional.''')
+
+	# Upload de múltiplos arquivos JSON
+	st.markdown("### Uploader")
+	uploaded_files = st.file_uploader("Carregue os arquivos JSON dos influencers", type="json", accept_multiple_files=True)
+	
+	# Inicialização
+	influencers = []
+	ficheiros = []
+
+	# Dados da sessão: tabelas compactas e conteúdo dos JSON em arquivo temporário
+	if "armazem" not in st.session_state:
+		st.session_state["armazem"] = sessao.ArmazemSessao()
+	armazem = st.session_state["armazem"]
+
+	# Perfis já processados em outras sessões, guardados no acervo local
+	acervo_perfis = comum.obter_acervo()
+
+	# Relatórios baixados da API do IMAI vão direto para o acervo
+	with st.expander("🌐 Baixar relatórios do IMAI"):
+		if os.environ.get("IMAI_AUTHKEY"):
+			st.text_area("Perfis do Instagram, um por linha", key="perfis_imai")
+			if st.button("Baixar", key="baixar_imai"):
+				_baixar_do_imai(acervo_perfis)
+		else:
+			st.caption("Defina a variável de ambiente IMAI_AUTHKEY com a chave da API para baixar os relatórios por aqui.")
+
+	df_acervo = acervo_perfis.listar()
+	with st.expander("📚 Carregar perfis do acervo"):
+		if df_acervo.empty:
+			st.caption("O acervo está vazio. Os arquivos carregados no uploader são guardados nele automaticamente.")
+		else:
+			st.multiselect("Perfis já processados", df_acervo["perfil"].tolist(), key="perfis_acervo")
+			st.caption(
+				"{} perfis no acervo ({:.1f} MB). Exportações sem acesso há mais de {} dias são removidas.".format(
+					len(df_acervo), acervo_perfis.bytes() / 1024 ** 2, acervo_perfis.max_dias
+				)
+			)
+	identidades_acervo = {
+		linha.perfil: (linha.nome_arquivo, linha.tamanho, linha.sha256)
+		for linha in df_acervo[df_acervo["perfil"].isin(st.session_state.get("perfis_acervo", []))].itertuples()
+	}
+	tem_perfis = bool(uploaded_files) or bool(identidades_acervo)
+	
+	if tem_perfis:
+		for file in uploaded_files or []:
+			filename = file.name
+			if "desktop.ini" in filename:
+				continue
+			perfil = ingestao.nome_perfil(filename)
+			if perfil is not None:
+				ficheiros.append(file)
+				influencers.append(perfil)
+			else:
+				print(f"Aviso: O arquivo '{filename}' não segue o padrão esperado.")
+		influencers_ficheiros = dict(zip(influencers, ficheiros))
+
+		# Identificar os arquivos e processar apenas os novos ou alterados; um
+		# arquivo enviado tem precedência sobre o mesmo perfil escolhido no acervo
+		arquivos_upload = {influencer: armazem.identificar(arquivo_json) for influencer, arquivo_json in influencers_ficheiros.items()}
+		for influencer, identidade in identidades_acervo.items():
+			arquivos_upload.setdefault(influencer, identidade)
+		novos, removidos = armazem.diferenca(arquivos_upload)
+
+		processar_em_paralelo = st.toggle("Processar em paralelo (todos os núcleos)", key="processar_em_paralelo")
+
+		if novos or removidos or list(arquivos_upload) != list(armazem.arquivos):
+			novos_upload = [influencer for influencer in novos if influencer in influencers_ficheiros]
+			novos_acervo = [influencer for influencer in novos if influencer not in influencers_ficheiros]
+			conteudos = {influencer: influencers_ficheiros[influencer].getvalue() for influencer in novos_upload}
+			registros = {}
+			linhas_paralelo = {}
+
+			with instrumentacao.etapa("Ingestão", linhas=len(conteudos)):
+				if processar_em_paralelo and conteudos:
+					# Decodificação, extração e cálculo do resumo distribuídos entre
+					# processos; o lote traz o scipy, importado só quando usado
+					from analise import lote
+
+					barra = st.progress(0.0, text="Processando perfis...")
+					tabelas, df_paralelo, lista_erros = lote.processar_em_paralelo(
+						conteudos,
+						progresso=lambda feitos, total: barra.progress(feitos / total, text=f"{feitos}/{total} perfis processados"),
+					)
+					barra.empty()
+					# Os erros vêm na ordem dos arquivos que não puderam ser lidos
+					erros_upload = dict(zip([influencer for influencer in conteudos if influencer not in tabelas.perfis.index], lista_erros))
+
+					# Guardar as linhas calculadas para a aba Resumo
+					versao_referencias = referencias.versao()
+					cache_resultados = comum.obter_cache_resultados()
+					for linha in df_paralelo.to_dict("records"):
+						influencer = linha["Username do influenciador"]
+						cache_resultados.guardar(cache.chave_resultado(arquivos_upload[influencer][2], influencer, versao_referencias), linha)
+						linhas_paralelo[(influencer, arquivos_upload[influencer][2])] = linha
+				else:
+					# Manter apenas os campos usados pela ingestão; os JSON completos são
+					# decodificados novamente, sob demanda, na aba Posts
+					erros_upload = {}
+					for influencer, conteudo in conteudos.items():
+						try:
+							registros[influencer] = decodificacao.carregar_registro(conteudo)
+						except:
+							erros_upload[influencer] = "Erro ao processar o arquivo para o influenciador {}".format(influencer)
+
+					# Extrair todas as tabelas planas em uma única passagem pelos JSON
+					tabelas = ingestao.extrair_tabelas(registros)
+
+			# Guardar no acervo os arquivos enviados que puderam ser lidos
+			with instrumentacao.etapa("Gravação no acervo", linhas=len(conteudos)):
+				acervo_perfis.guardar([
+					(influencer, arquivos_upload[influencer][2], arquivos_upload[influencer][0], conteudo, registros.get(influencer))
+					for influencer, conteudo in conteudos.items()
+					if influencer not in erros_upload
+				])
+				if linhas_paralelo:
+					acervo_perfis.guardar_linhas(versao_referencias, linhas_paralelo)
+
+			# Perfis escolhidos no acervo: tabelas extraídas do registro já guardado, sem decodificar o JSON
+			if novos_acervo:
+				with instrumentacao.etapa("Carga do acervo", linhas=len(novos_acervo)):
+					guardados = acervo_perfis.carregar((influencer, arquivos_upload[influencer][2]) for influencer in novos_acervo)
+					registros_acervo = {perfil: registro for (perfil, _), (registro, _) in guardados.items()}
+					tabelas = ingestao.concatenar_tabelas([tabelas, ingestao.extrair_tabelas(registros_acervo)])
+					conteudos.update({perfil: conteudo for (perfil, _), (_, conteudo) in guardados.items()})
+					for influencer in novos_acervo:
+						if influencer not in registros_acervo:
+							erros_upload[influencer] = "O perfil {} não está mais no acervo".format(influencer)
+
+			with instrumentacao.etapa("Atualização da sessão", linhas=len(novos) + len(removidos)):
+				armazem.aplicar(arquivos_upload, tabelas, erros_upload, conteudos)
+
+		for erro in armazem.erros:
+			st.warning(erro)
+		for secao, _, aviso in armazem.tabelas.avisos:
+			if secao in ("perfil", "cidades"):
+				st.warning(aviso)
+
+		if ingestao.cidades_brasileiras(armazem.tabelas).empty:
+			st.warning("Sem dados de cidade para um ou mais dos influencers")
+
+		em_memoria, em_disco = armazem.memoria()
+		st.caption(
+			"Memória desta sessão: {:.1f} MB em tabelas e resumo; {:.1f} MB de JSON em arquivo temporário".format(
+				em_memoria / 1024 ** 2, em_disco / 1024 ** 2
+			)
+		)
+		
+	else:
+		st.info("Por favor, carregue arquivos JSON para começar.")
+		if armazem.arquivos:
+			armazem.limpar()
+
+	return armazem, tem_perfis
@@ -0,0 +1,168 @@
+"""Aba Posts: métricas e cards dos posts comerciais e recentes de um perfil.
+
+Só é executada com a aba aberta, de modo que navegar pelos posts não refaz o
+resumo; o Pillow e o requests (miniaturas) são importados com ela.
+"""
+import numpy as np
+import streamlit as st
+
+from analise import galeria, miniaturas
+
+
+@st.cache_resource
+def obter_cache_miniaturas():
+	return miniaturas.CacheMiniaturas()
+
+
+def exibir_cards_de_posts(lista_posts, chave):
+	# Apenas a página selecionada é montada e renderizada
+	total_paginas = galeria.total_paginas(len(lista_posts))
+	pagina = 1
+	if total_paginas > 1:
+		pagina = st.number_input(
+			"Página ({} no total)".format(total_paginas),
+			min_value=1,
+			max_value=total_paginas,
+			step=1,
+			key="pagina_" + chave,
+		)
+	inicio, fim = galeria.intervalo_pagina(pagina, len(lista_posts))
+	if lista_posts:
+		st.caption("Posts {} a {} de {}".format(inicio + 1, fim, len(lista_posts)))
+
+	cards = galeria.cards_da_pagina(lista_posts, pagina)
+	# Miniaturas reduzidas e guardadas em disco; sem elas, usa a URL original
+	miniaturas_pagina = obter_cache_miniaturas().obter_varias(card["imagem"] for card in cards)
+
+	for row_start in range(0, len(cards), 3):
+		cols = st.columns(3)
+		for i in range(3):
+			if row_start + i >= len(cards):
+				break
+			card = cards[row_start + i]
+			link = card["link"]
+			with cols[i]:
+				img_url = card["imagem"]
+				if img_url:
+					miniatura = miniaturas_pagina.get(img_url)
+					if miniatura is not None:
+						img_url = miniaturas.uri_dados(miniatura)
+					st.markdown(
+						f'<a href="{link}" target="_blank"><img src="{img_url}" style="width:100%; border-radius:10px;" /></a>',
+						unsafe_allow_html=True
+					)
+				else:
+					st.warning("Imagem não disponível para este post.")
+
+				st.markdown(f"**{card['texto']}**")
+				st.markdown(f"👍 Likes: **{card['likes']}**")
+				st.markdown(f"💬 Comentários: **{card['comments']}**")
+				st.markdown(f"🔁 Compartilhamentos: **{card['shares']}**")
+
+
+def exibir_posts_comerciais(commercial_posts, influencer):
+	likes_posts = []
+	comments_posts = []
+	shares_posts = []
+	marcas_posts = []
+
+	for post in commercial_posts:
+		stat = post.get("stat", {})
+		likes_posts.append(stat.get("likes", 0))
+		comments_posts.append(stat.get("comments", 0))
+		shares_posts.append(stat.get("shares", 0))
+		
+		sponsor = post.get("sponsor", {})
+		marca = sponsor.get("usename")
+		if marca:
+			marcas_posts.append(marca)
+    
+    # Cálculos - Posts comerciais
+	likes_total_comercial = np.sum(likes_posts) if likes_posts else 0
+	comments_total_comercial = np.sum(comments_posts) if comments_posts else 0
+	shares_total_comercial = np.sum(shares_posts) if shares_posts else 0
+	marcas_posts = np.unique(marcas_posts)
+
+    # Subtítulo
+	st.markdown("### Posts comerciais:")
+
+	# Mostrar marcas
+	if marcas_posts.size > 0:
+		st.markdown("### Perfis no Instagram das marcas mencionadas:")
+		texto_links = "\n".join([f"- [{marca}](https://www.instagram.com/{marca})" for marca in marcas_posts])
+		st.markdown(texto_links)
+
+    # Mostrar métricas
+	st.markdown("### Métricas das publicações identificadas na amostra:")
+	col1, col2, col3 = st.columns(3)
+	with col1:
+		st.metric("👍 Média de Likes", f"{int(likes_total_comercial):,}".replace(",", "."))
+	with col2:
+		st.metric("💬 Média de Comentários", f"{int(comments_total_comercial):,}".replace(",", "."))
+	with col3:
+		st.metric("🔁 Média de Shares", f"{int(shares_total_comercial):,}".replace(",", "."))
+
+	exibir_cards_de_posts(commercial_posts, "comerciais_" + influencer)
+
+
+def exibir_posts(armazem, influencer):
+	# O JSON completo não fica em memória: é lido do depósito da sessão ao exibir os posts
+	dados_perfil = armazem.posts.carregar(influencer)
+	recent_posts = dados_perfil["user_profile"]["recent_posts"]
+	
+	# Só a ausência dos posts comerciais no JSON vira aviso; erros ao exibi-los não são mascarados
+	try:
+		commercial_posts = dados_perfil["user_profile"]["commercial_posts"]
+	except (KeyError, TypeError):
+		commercial_posts = None
+
+	if isinstance(commercial_posts, list):
+		exibir_posts_comerciais(commercial_posts, influencer)
+	else:
+		st.warning("Não há posts comerciais identificados para o influenciador {}".format(influencer))
+    
+	likes_posts = []
+	comments_posts = []
+	shares_posts = []
+
+	for post in recent_posts:
+		stat = post.get("stat", {})
+		likes_posts.append(stat.get("likes", 0))
+		comments_posts.append(stat.get("comments", 0))
+		shares_posts.append(stat.get("shares", 0))
+    
+    # Cálculos - Posts recentes
+	likes_total_recentes = np.sum(likes_posts) if likes_posts else 0
+	comments_total_recentes = np.sum(comments_posts) if comments_posts else 0
+	shares_total_recentes = np.sum(shares_posts) if shares_posts else 0
+
+    # Subtítulo
+	st.markdown("\n\n### Posts recentes:")
+
+    # Mostrar métricas
+	st.markdown("### Métricas das publicações identificadas na amostra:")
+	col1, col2, col3 = st.columns(3)
+	with col1:
+		st.metric("👍 Média de Likes", f"{int(likes_total_recentes):,}".replace(",", "."))
+	with col2:
+		st.metric("💬 Média de Comentários", f"{int(comments_total_recentes):,}".replace(",", "."))
+	with col3:
+		st.metric("🔁 Média de Shares", f"{int(shares_total_recentes):,}".replace(",", "."))
+
+	exibir_cards_de_posts(recent_posts, "recentes_" + influencer)
+
+def exibir(armazem, tem_perfis):
+	"""Desenha a aba com os posts do perfil escolhido entre os de ``armazem``."""
+	if tem_perfis:
+		influenciador_selecionado = st.selectbox(
+				"Influenciador:", 
+				list(armazem.tabelas.perfis.index),
+				index=None,
+				key="select_influencer_posts"
+		)
+	    
+		if influenciador_selecionado:
+			exibir_posts(armazem, influencer=influenciador_selecionado)
+	
+	else:
+		st.warning("Por favor, faça o upload de arquivos JSON válidos na primeira aba")
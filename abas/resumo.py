@@ -0,0 +1,162 @@
+"""Aba Resumo: consolidação das métricas dos perfis e exportação.
+
+Só é executada com a aba aberta; o scipy e os escritores de planilha são
+importados com ela.
+"""
+import pandas as pd
+import streamlit as st
+
+from abas import comum
+from analise import cache, exportacao, ingestao, instrumentacao, pontuacao, referencias, resumo
+
+
+def _consolidar(tabelas, hashes_arquivos, chaves, versao_referencias, cache_resultados, acervo_perfis):
+	# Reaproveitar as linhas já calculadas para o mesmo conteúdo de arquivo
+	linhas_resumo = {}
+	for influencer, chave in chaves.items():
+		linha = cache_resultados.obter(chave)
+		if linha is not None:
+			linhas_resumo[influencer] = linha
+
+	# Em seguida, as linhas guardadas no acervo em outras sessões
+	pendentes = [influencer for influencer in chaves if influencer not in linhas_resumo]
+	if pendentes:
+		guardadas = acervo_perfis.linhas([(influencer, hashes_arquivos[influencer]) for influencer in pendentes], versao_referencias)
+		for (influencer, _), linha in guardadas.items():
+			linhas_resumo[influencer] = linha
+			cache_resultados.guardar(chaves[influencer], linha)
+
+	# Calcular apenas os perfis novos ou alterados
+	pendentes = [influencer for influencer in chaves if influencer not in linhas_resumo]
+	if pendentes:
+		with instrumentacao.etapa("Resumo", linhas=len(pendentes)):
+			df_pendentes = resumo.montar_resumo(ingestao.filtrar_tabelas(tabelas, pendentes))
+		linhas_calculadas = {}
+		for linha in df_pendentes.to_dict("records"):
+			influencer = linha["Username do influenciador"]
+			linhas_resumo[influencer] = linha
+			cache_resultados.guardar(chaves[influencer], linha)
+			linhas_calculadas[(influencer, hashes_arquivos[influencer])] = linha
+		acervo_perfis.guardar_linhas(versao_referencias, linhas_calculadas)
+
+	# Consolidar o DF final, na ordem de upload
+	return pd.DataFrame([linhas_resumo[influencer] for influencer in chaves], columns=resumo.COLUNAS_RESUMO)
+
+
+def _ler_cortes(texto):
+	# "5, 9, 12" -> (5.0, 9.0, 12.0); None se o texto não for uma lista de números
+	try:
+		return tuple(float(valor) for valor in texto.replace(";", ",").split(",") if valor.strip())
+	except ValueError:
+		return None
+
+
+def _exibir_modelo_educacao(armazem, tabelas, chave_perfis):
+	# Os componentes do modelo são montados uma vez por lote; mudar os
+	# parâmetros só reavalia a normal, sem refazer o resumo
+	st.session_state.setdefault("modelo_desvio", float(pontuacao.DESVIO_PADRAO_EDUCACAO))
+	st.session_state.setdefault("modelo_cortes", ", ".join("{:g}".format(corte) for corte in pontuacao.CORTES_EDUCACAO))
+
+	col_desvio, col_cortes, col_mistura = st.columns(3)
+	desvio_padrao = col_desvio.number_input("Desvio padrão (anos)", min_value=0.1, step=0.5, key="modelo_desvio")
+	texto_cortes = col_cortes.text_input("Cortes das faixas (anos de estudo)", key="modelo_cortes")
+	mistura = col_mistura.checkbox("Variação entre cidades, idades e sexos (mistura)", key="modelo_mistura")
+	st.caption(
+		"O resumo usa desvio padrão {:g} e cortes {}, sem mistura. Com a mistura, cada cidade, grupo etário e "
+		"sexo da referência tem a sua própria média, e a audiência é a combinação dessas distribuições. "
+		"As cidades sem referência de educação são tratadas de forma diferente: sem a mistura, como no resumo, "
+		"a parte da audiência nelas conta como 0 anos de estudo e puxa a média para baixo; com a mistura, essa "
+		"parte fica de fora e o restante da audiência é reponderado.".format(
+			pontuacao.DESVIO_PADRAO_EDUCACAO, ", ".join("{:g}".format(corte) for corte in pontuacao.CORTES_EDUCACAO)
+		)
+	)
+
+	cortes = _ler_cortes(texto_cortes)
+	modelo = armazem.modelo_educacao(
+		chave_perfis,
+		lambda: pontuacao.ModeloEducacao.construir(ingestao.cidades_brasileiras(tabelas), tabelas.demografia),
+	)
+	try:
+		with instrumentacao.etapa("Modelo de escolaridade", linhas=len(modelo.influencers)):
+			df_educacao = modelo.probabilidades(desvio_padrao, cortes or (), mistura)
+	except ValueError as erro:
+		st.warning(str(erro))
+		return
+
+	st.dataframe(df_educacao, column_config={faixa: st.column_config.NumberColumn(format="percent") for faixa in df_educacao.columns})
+	st.download_button(
+		"📥 Baixar as faixas em .csv",
+		data=df_educacao.to_csv().encode("utf-8"),
+		file_name="escolaridade_audiencia.csv",
+		mime=exportacao.MIMES["csv"],
+	)
+
+
+def exibir(armazem, tem_perfis):
+	"""Desenha a aba com os perfis carregados em ``armazem``."""
+	if tem_perfis:
+		# Importar os dados da sessão
+		tabelas = armazem.tabelas
+		hashes_arquivos = armazem.hashes
+
+		cache_resultados = comum.obter_cache_resultados()
+		acervo_perfis = comum.obter_acervo()
+		if st.button("🗑️ Limpar cache de resultados"):
+			# As linhas guardadas no acervo e o resumo da sessão também são descartados, para que o resumo seja recalculado
+			cache_resultados.limpar()
+			acervo_perfis.limpar_linhas()
+			armazem.descartar_resumo()
+
+		for secao, _, aviso in tabelas.avisos:
+			if secao == "demografia":
+				st.warning(aviso)
+
+		# Na primeira execução do processo, inclui a leitura das planilhas de referência
+		versao_referencias = referencias.versao()
+		chaves = {
+			influencer: cache.chave_resultado(hashes_arquivos[influencer], influencer, versao_referencias)
+			for influencer in tabelas.perfis.index
+		}
+		# O resumo consolidado fica na sessão e só é refeito quando algum arquivo muda
+		df_resumo = armazem.resumo_consolidado(
+			tuple(chaves.values()),
+			lambda: _consolidar(tabelas, hashes_arquivos, chaves, versao_referencias, cache_resultados, acervo_perfis),
+		)
+
+		st.markdown("## Consolidação de dados para os influenciadores 👨‍💻\n \n")
+		with instrumentacao.etapa("Tabela do resumo", linhas=len(df_resumo)):
+			st.table(df_resumo)
+
+		with instrumentacao.etapa("Cidades sem correspondência"):
+			df_sem_correspondencia = pontuacao.cidades_sem_correspondencia(ingestao.cidades_brasileiras(tabelas))
+		if not df_sem_correspondencia.empty:
+			with st.expander(f"Cidades sem correspondência nas tabelas de referência ({len(df_sem_correspondencia)})"):
+				st.caption("Essas cidades não entram no cálculo das classes sociais ou da escolaridade.")
+				st.dataframe(df_sem_correspondencia, hide_index=True)
+
+		with st.expander("🎓 Ajustar o modelo de escolaridade"):
+			_exibir_modelo_educacao(armazem, tabelas, tuple(chaves.values()))
+
+		if not df_resumo.empty:
+			col_formato, col_extras = st.columns(2)
+			with col_formato:
+				formato = st.selectbox("Formato do arquivo", exportacao.formatos_disponiveis(), key="formato_exportacao")
+			with col_extras:
+				incluir_extras = st.checkbox("Incluir pesos por cidade e vetores de classes e escolaridade", key="exportacao_extras")
+
+			# O arquivo é gravado em disco, em lotes, e só é refeito quando o resumo ou as opções mudam
+			def gerar_arquivo(caminho):
+				extras = exportacao.abas_extras(tabelas) if incluir_extras else ()
+				with instrumentacao.etapa("Exportação", linhas=len(df_resumo)):
+					return exportacao.exportar(df_resumo, caminho, formato, extras)
+
+			caminho_exportacao, extensao = armazem.arquivo_exportado((tuple(chaves.values()), formato, incluir_extras), gerar_arquivo)
+			file_name = exportacao.nome_arquivo_resumo(extensao=extensao)
+			with open(caminho_exportacao, "rb") as output:
+				st.download_button(label=f"📥 Baixar o resumo em formato .{extensao}",
+								  data=output,
+								  file_name=file_name,
+								  mime=exportacao.MIMES[extensao])
+	else:
+		st.warning("Por favor, faça o upload de arquivos JSON válidos na primeira aba")
+
@@ -0,0 +1,219 @@
+"""Acervo local e persistente dos perfis já processados.
+
+Cada exportação do IMAI é guardada por ``(perfil, sha256 do arquivo)`` em um
+SQLite em ``dados/.acervo``, com:
+
+- o registro compacto lido pela ingestão (ver :func:`decodificacao.podar`),
+  a partir do qual as tabelas do perfil são extraídas em frações de
+  milissegundo, com os mesmos tipos de um upload;
+- o JSON completo, comprimido, usado pela aba Posts;
+- as linhas do resumo já calculadas, por versão das tabelas de referência.
+
+Assim, uma campanha com perfis conhecidos é carregada sem novo upload nem
+nova decodificação. Exportações não acessadas há mais de ``max_dias`` são
+removidas e, passando de ``max_bytes``, as acessadas há mais tempo também.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+from analise import decodificacao, referencias
+
+PASTA_ACERVO = os.path.join(referencias.PASTA_DADOS, ".acervo")
+MAX_DIAS = 180
+MAX_BYTES = 1024 ** 3
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS perfis (
+	perfil TEXT NOT NULL,
+	sha256 TEXT NOT NULL,
+	nome_arquivo TEXT,
+	tamanho INTEGER,
+	registro BLOB,
+	conteudo BLOB NOT NULL,
+	bytes INTEGER NOT NULL,
+	guardado REAL NOT NULL,
+	acessado REAL NOT NULL,
+	PRIMARY KEY (perfil, sha256)
+);
+CREATE INDEX IF NOT EXISTS perfis_acessado ON perfis (acessado);
+CREATE TABLE IF NOT EXISTS resumos (
+	perfil TEXT NOT NULL,
+	sha256 TEXT NOT NULL,
+	versao TEXT NOT NULL,
+	linha BLOB NOT NULL,
+	PRIMARY KEY (perfil, sha256, versao)
+);
+"""
+
+
+class AcervoPerfis:
+	"""Exportações do IMAI já processadas, indexadas por ``(perfil, sha256)``.
+
+	Pode ser compartilhado entre sessões: as operações são serializadas por
+	uma trava.
+	"""
+
+	def __init__(self, caminho=None, max_dias=MAX_DIAS, max_bytes=MAX_BYTES):
+		if caminho is None:
+			os.makedirs(PASTA_ACERVO, exist_ok=True)
+			caminho = os.path.join(PASTA_ACERVO, "perfis.sqlite")
+		self.caminho = caminho
+		self.max_dias = max_dias
+		self.max_bytes = max_bytes
+		self._trava = threading.Lock()
+		self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+		self._conexao.execute("PRAGMA journal_mode=WAL")
+		self._conexao.executescript(_ESQUEMA)
+		self._atualizar_registros()
+		self.aplicar_retencao()
+
+	def _atualizar_registros(self):
+		# Registros podados com um esquema anterior são descartados; ao carregar,
+		# são refeitos a partir do JSON completo guardado
+		versao = self._conexao.execute("PRAGMA user_version").fetchone()[0]
+		if versao < decodificacao.VERSAO_REGISTRO:
+			with self._conexao:
+				self._conexao.execute("UPDATE perfis SET registro = NULL")
+				self._conexao.execute("PRAGMA user_version = {:d}".format(decodificacao.VERSAO_REGISTRO))
+
+	def guardar(self, itens):
+		"""Grava ``[(perfil, sha256, nome do arquivo, conteudo, registro)]``.
+
+		``registro`` é o registro compacto do JSON ou None (nesse caso ele é
+		obtido do conteúdo ao carregar). Exportações já guardadas só têm o
+		acesso atualizado.
+		"""
+		agora = time.time()
+		linhas = []
+		for perfil, sha256, nome_arquivo, conteudo, registro in itens:
+			registro = zlib.compress(decodificacao.codificar(registro), 1) if registro is not None else None
+			comprimido = zlib.compress(conteudo, 1)
+			tamanho_guardado = len(comprimido) + (len(registro) if registro is not None else 0)
+			linhas.append((perfil, sha256, nome_arquivo, len(conteudo), registro, comprimido, tamanho_guardado, agora, agora))
+		with self._trava, self._conexao:
+			self._conexao.executemany(
+				"INSERT INTO perfis VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+				"ON CONFLICT (perfil, sha256) DO UPDATE SET acessado = excluded.acessado, "
+				"registro = COALESCE(perfis.registro, excluded.registro)",
+				linhas,
+			)
+		if linhas:
+			self.aplicar_retencao()
+
+	def guardar_linhas(self, versao, linhas):
+		"""Grava as linhas do resumo de ``{(perfil, sha256): linha}`` para a ``versao`` das referências."""
+		dados = [
+			(perfil, sha256, versao, decodificacao.codificar(linha))
+			for (perfil, sha256), linha in linhas.items()
+		]
+		with self._trava, self._conexao:
+			# Só para exportações que estão no acervo
+			self._conexao.executemany(
+				"INSERT OR REPLACE INTO resumos SELECT ?1, ?2, ?3, ?4 WHERE EXISTS "
+				"(SELECT 1 FROM perfis WHERE perfil = ?1 AND sha256 = ?2)",
+				dados,
+			)
+
+	def listar(self):
+		"""Exportação usada mais recentemente de cada perfil: perfil, arquivo, tamanho, sha256, datas e bytes."""
+		with self._trava:
+			df = pd.read_sql_query(
+				"SELECT perfil, nome_arquivo, tamanho, sha256, guardado, acessado, bytes FROM perfis AS p "
+				"WHERE acessado = (SELECT MAX(acessado) FROM perfis WHERE perfil = p.perfil) "
+				"GROUP BY perfil ORDER BY perfil",
+				self._conexao,
+			)
+		for coluna in ["guardado", "acessado"]:
+			df[coluna] = pd.to_datetime(df[coluna], unit="s")
+		return df
+
+	def carregar(self, chaves):
+		"""``{(perfil, sha256): (registro, conteudo)}`` das exportações pedidas que estão no acervo."""
+		chaves = list(chaves)
+		resultado = {}
+		with self._trava:
+			for perfil, sha256 in chaves:
+				linha = self._conexao.execute(
+					"SELECT registro, conteudo FROM perfis WHERE perfil = ? AND sha256 = ?", (perfil, sha256)
+				).fetchone()
+				if linha is not None:
+					resultado[(perfil, sha256)] = linha
+			with self._conexao:
+				self._conexao.executemany(
+					"UPDATE perfis SET acessado = ? WHERE perfil = ? AND sha256 = ?",
+					[(time.time(), perfil, sha256) for perfil, sha256 in resultado],
+				)
+
+		carregados = {}
+		for chave, (registro, conteudo) in resultado.items():
+			conteudo = zlib.decompress(conteudo)
+			if registro is not None:
+				registro = decodificacao.decodificar(zlib.decompress(registro))
+			else:
+				registro = decodificacao.carregar_registro(conteudo)
+			carregados[chave] = (registro, conteudo)
+		return carregados
+
+	def linhas(self, chaves, versao):
+		"""``{(perfil, sha256): linha}`` das linhas do resumo já guardadas para a ``versao``."""
+		resultado = {}
+		with self._trava:
+			for perfil, sha256 in chaves:
+				linha = self._conexao.execute(
+					"SELECT linha FROM resumos WHERE perfil = ? AND sha256 = ? AND versao = ?", (perfil, sha256, versao)
+				).fetchone()
+				if linha is not None:
+					resultado[(perfil, sha256)] = decodificacao.decodificar(linha[0])
+		return resultado
+
+	def bytes(self):
+		with self._trava:
+			return self._conexao.execute("SELECT COALESCE(SUM(bytes), 0) FROM perfis").fetchone()[0]
+
+	def aplicar_retencao(self):
+		"""Remove as exportações antigas e, acima do limite de tamanho, as menos acessadas.
+
+		Retorna o número de exportações removidas.
+		"""
+		with self._trava, self._conexao:
+			removidas = self._conexao.execute(
+				"DELETE FROM perfis WHERE acessado < ?", (time.time() - self.max_dias * 86400,)
+			).rowcount
+			total = self._conexao.execute("SELECT COALESCE(SUM(bytes), 0) FROM perfis").fetchone()[0]
+			if total > self.max_bytes:
+				excedentes = []
+				for perfil, sha256, tamanho in self._conexao.execute(
+					"SELECT perfil, sha256, bytes FROM perfis ORDER BY acessado"
+				):
+					if total <= self.max_bytes:
+						break
+					excedentes.append((perfil, sha256))
+					total -= tamanho
+				self._conexao.executemany("DELETE FROM perfis WHERE perfil = ? AND sha256 = ?", excedentes)
+				removidas += len(excedentes)
+			if removidas:
+				self._conexao.execute(
+					"DELETE FROM resumos WHERE NOT EXISTS "
+					"(SELECT 1 FROM perfis WHERE perfis.perfil = resumos.perfil AND perfis.sha256 = resumos.sha256)"
+				)
+		return removidas
+
+	def limpar_linhas(self):
+		"""Apaga as linhas do resumo guardadas, mantendo as exportações (elas voltam a ser calculadas)."""
+		with self._trava, self._conexao:
+			self._conexao.execute("DELETE FROM resumos")
+
+	def limpar(self):
+		with self._trava, self._conexao:
+			self._conexao.execute("DELETE FROM perfis")
+			self._conexao.execute("DELETE FROM resumos")
+		with self._trava:
+			self._conexao.execute("VACUUM")
+
+	def fechar(self):
+		self._conexao.close()
@@ -0,0 +1,72 @@
+"""Cache LRU das linhas do resumo, indexado pelo conteúdo de cada JSON."""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+
+def sha256_conteudo(conteudo):
+	"""SHA-256 (hex) do conteúdo bruto de um arquivo enviado."""
+	return hashlib.sha256(conteudo).hexdigest()
+
+
+def chave_resultado(sha256, influencer, versao_referencias):
+	"""Chave de uma linha do resumo no :class:`CacheResultados`."""
+	return (sha256, influencer, versao_referencias)
+
+
+def _tamanho(chave, linha):
+	# Estimativa do espaço ocupado por uma entrada (chave + valores da linha)
+	tamanho = sys.getsizeof(chave) + sum(sys.getsizeof(parte) for parte in chave)
+	tamanho += sys.getsizeof(linha)
+	for coluna, valor in linha.items():
+		tamanho += sys.getsizeof(coluna) + sys.getsizeof(valor)
+	return tamanho
+
+
+class CacheResultados:
+	"""Guarda a linha final do resumo de cada influenciador.
+
+	As chaves são tuplas ``(sha256 do JSON, username, versão das referências)``,
+	de modo que um arquivo só é recalculado quando seu conteúdo, seu nome ou as
+	tabelas de referência mudam. As entradas menos usadas recentemente são
+	descartadas quando o número de itens ou a memória estimada passam do limite.
+	"""
+
+	def __init__(self, max_itens=5000, max_bytes=64 * 1024 * 1024):
+		self.max_itens = max_itens
+		self.max_bytes = max_bytes
+		self._itens = OrderedDict()
+		self._bytes = 0
+		self._trava = threading.Lock()
+
+	def __len__(self):
+		return len(self._itens)
+
+	@property
+	def bytes(self):
+		return self._bytes
+
+	def obter(self, chave):
+		with self._trava:
+			item = self._itens.get(chave)
+			if item is None:
+				return None
+			self._itens.move_to_end(chave)
+			return item[0]
+
+	def guardar(self, chave, linha):
+		with self._trava:
+			if chave in self._itens:
+				self._bytes -= self._itens.pop(chave)[1]
+			tamanho = _tamanho(chave, linha)
+			self._itens[chave] = (linha, tamanho)
+			self._bytes += tamanho
+			while self._itens and (len(self._itens) > self.max_itens or self._bytes > self.max_bytes):
+				_, (_, tamanho_removido) = self._itens.popitem(last=False)
+				self._bytes -= tamanho_removido
+
+	def limpar(self):
+		with self._trava:
+			self._itens.clear()
+			self._bytes = 0
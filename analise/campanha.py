@@ -0,0 +1,299 @@
+"""Audiência combinada de um elenco de influenciadores (campanha).
+
+Os vetores de cada influenciador (classes sociais, faixas de escolaridade,
+peso de cada cidade e de cada interesse na audiência) são calculados uma vez
+por lote de perfis, em :class:`VetoresAudiencia`. As métricas de um elenco são
+médias desses vetores ponderadas pelo número de seguidores, obtidas por somas
+sobre as linhas dos arrays:
+
+- :class:`Elenco` guarda as somas de um elenco e as atualiza ao incluir ou
+  retirar um perfil, sem percorrer os demais membros;
+- :func:`avaliar_elencos` avalia muitos elencos de uma vez, com produtos de
+  uma matriz elencos × influenciadores pelos vetores.
+
+Perfis sem número de seguidores têm peso zero; perfis sem cidades (ou sem
+dados de gênero e idade) ficam de fora apenas das médias que dependem deles.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analise import ingestao, interesses, pontuacao
+
+N_TOP_INTERESSES = 5
+
+
+def _razao(soma, peso):
+	# Média ponderada; NaN onde não há peso
+	peso = np.asarray(peso, dtype=float)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		return np.where(peso[..., None] > 0, soma / peso[..., None], np.nan)
+
+
+@dataclass(frozen=True)
+class VetoresAudiencia:
+	influencers: pd.Index
+	# (influenciadores,) número de seguidores, 0 quando ausente
+	seguidores: np.ndarray
+	# (influenciadores,) credibilidade da audiência (0 a 1), NaN quando ausente
+	credibilidade: np.ndarray
+	# (influenciadores, 4) frações, colunas na ordem de pontuacao.COLUNAS_CLASSES
+	classes: np.ndarray
+	com_classes: np.ndarray
+	# (influenciadores, 4) probabilidades, colunas na ordem de pontuacao.COLUNAS_EDUCACAO
+	educacao: np.ndarray
+	com_educacao: np.ndarray
+	# Cidades brasileiras da audiência e matriz esparsa influenciador × cidade
+	# com a fração da audiência em cada cidade
+	cidades: pd.Index
+	pesos_cidades: sparse.csr_matrix
+	# Interesses (já traduzidos), fração da audiência em cada um e se o
+	# interesse está entre os N_TOP_INTERESSES do influenciador
+	interesses: pd.Index
+	pesos_interesses: np.ndarray
+	top_interesses: np.ndarray
+	com_interesses: np.ndarray
+
+	@classmethod
+	def construir(cls, tabelas, matrizes=None, n_top=N_TOP_INTERESSES):
+		"""Vetores dos perfis de ``tabelas``, na ordem de ``tabelas.perfis``."""
+		influencers = pd.Index(tabelas.perfis.index, name="influencer")
+		n = len(influencers)
+		df_cidades = ingestao.cidades_brasileiras(tabelas)
+
+		classes = pontuacao.pontuar_classes(df_cidades, matrizes).reindex(influencers)
+		educacao = pontuacao.pontuar_educacao(df_cidades, tabelas.demografia, matrizes).reindex(influencers)
+		seguidores = np.nan_to_num(tabelas.perfis["seguidores"].to_numpy(dtype=float))
+
+		# Fração da audiência por cidade; linhas repetidas da mesma cidade são somadas
+		df_cidades = df_cidades.dropna(subset=["Cidade"])
+		codigos_influ = influencers.get_indexer(np.asarray(df_cidades["influencer"], dtype=object))
+		codigos_cidade, nomes_cidades = pd.factorize(np.asarray(df_cidades["Cidade"], dtype=object))
+		pesos_cidades = sparse.csr_matrix(
+			(np.nan_to_num(df_cidades["weight"].to_numpy(dtype=float)), (codigos_influ, codigos_cidade)),
+			shape=(n, len(nomes_cidades)),
+		)
+		pesos_cidades.sum_duplicates()
+
+		df_interesses = tabelas.interesses
+		codigos_influ = influencers.get_indexer(np.asarray(df_interesses["influencer"], dtype=object))
+		traduzidos = [interesses.INTERESSES_TRADUCAO.get(nome, nome) for nome in np.asarray(df_interesses["name"], dtype=object)]
+		codigos_interesse, nomes_interesses = pd.factorize(pd.Series(traduzidos, dtype=object))
+		validos = (codigos_influ >= 0) & (codigos_interesse >= 0)
+		pesos_interesses = np.zeros((n, len(nomes_interesses)))
+		np.add.at(
+			pesos_interesses,
+			(codigos_influ[validos], codigos_interesse[validos]),
+			np.nan_to_num(df_interesses["weight"].to_numpy(dtype=float))[validos],
+		)
+		top = interesses.top_interesses(df_interesses, n=n_top)
+		marcados = np.zeros((n, len(nomes_interesses)), dtype=bool)
+		linhas_top = influencers.get_indexer(top["influencer"])
+		colunas_top = pd.Index(nomes_interesses).get_indexer(top["interesse"])
+		marcados[linhas_top[(linhas_top >= 0) & (colunas_top >= 0)], colunas_top[(linhas_top >= 0) & (colunas_top >= 0)]] = True
+
+		return cls(
+			influencers=influencers,
+			seguidores=seguidores,
+			credibilidade=pd.to_numeric(tabelas.perfis["audience_credibility"], errors="coerce").to_numpy(dtype=float),
+			classes=np.nan_to_num(classes[pontuacao.COLUNAS_CLASSES].to_numpy(dtype=float)) / 100,
+			com_classes=classes[pontuacao.COLUNAS_CLASSES[0]].notna().to_numpy(),
+			educacao=np.nan_to_num(educacao[pontuacao.COLUNAS_EDUCACAO].to_numpy(dtype=float)),
+			com_educacao=educacao[pontuacao.COLUNAS_EDUCACAO[0]].notna().to_numpy(),
+			cidades=pd.Index(nomes_cidades, name="Cidade"),
+			pesos_cidades=pesos_cidades,
+			interesses=pd.Index(nomes_interesses, name="Interesse"),
+			pesos_interesses=pesos_interesses,
+			top_interesses=marcados,
+			com_interesses=np.bincount(codigos_influ[validos], minlength=n) > 0,
+		)
+
+	@property
+	def nbytes(self):
+		cidades = self.pesos_cidades
+		return sum(
+			array.nbytes
+			for array in (
+				self.seguidores, self.credibilidade, self.classes, self.com_classes, self.educacao, self.com_educacao,
+				cidades.data, cidades.indices, cidades.indptr, self.pesos_interesses, self.top_interesses, self.com_interesses,
+			)
+		)
+
+	def posicoes(self, perfis):
+		"""Linhas dos ``perfis`` nos arrays; levanta KeyError para perfis fora do lote."""
+		perfis = list(perfis)
+		posicoes = self.influencers.get_indexer(perfis)
+		if (posicoes < 0).any():
+			raise KeyError("Perfis fora do lote: {}".format(", ".join(str(p) for p, i in zip(perfis, posicoes) if i < 0)))
+		return posicoes
+
+
+@dataclass(frozen=True)
+class MetricasElenco:
+	perfis: int
+	seguidores: float
+	# Frações, indexadas por pontuacao.COLUNAS_CLASSES e COLUNAS_EDUCACAO
+	classes: pd.Series
+	educacao: pd.Series
+	# Seguidores estimados em cada cidade, da maior para a menor
+	alcance_cidades: pd.Series
+	# "Peso" (fração média da audiência) e "Perfis no top" (membros que têm o
+	# interesse entre os seus principais), do maior peso para o menor
+	interesses: pd.DataFrame
+
+
+class Elenco:
+	"""Somas ponderadas da audiência de um elenco, atualizadas a cada inclusão ou retirada.
+
+	Incluir ou retirar um perfil custa uma operação sobre os vetores desse
+	perfil, independentemente do tamanho do elenco.
+	"""
+
+	def __init__(self, vetores, perfis=()):
+		self.vetores = vetores
+		self.membros = {}
+		self._zerar()
+		for perfil in perfis:
+			self.incluir(perfil)
+
+	def _zerar(self):
+		vetores = self.vetores
+		# Seguidores: total e dos membros com classes, com escolaridade e com interesses
+		self._seguidores = np.zeros(4)
+		self._classes = np.zeros(vetores.classes.shape[1])
+		self._educacao = np.zeros(vetores.educacao.shape[1])
+		self._cidades = np.zeros(len(vetores.cidades))
+		self._interesses = np.zeros(len(vetores.interesses))
+		self._top = np.zeros(len(vetores.interesses), dtype=int)
+
+	def _aplicar(self, i, sinal):
+		vetores = self.vetores
+		f = sinal * vetores.seguidores[i]
+		self._seguidores += f * np.array([1, vetores.com_classes[i], vetores.com_educacao[i], vetores.com_interesses[i]])
+		self._classes += f * vetores.classes[i]
+		self._educacao += f * vetores.educacao[i]
+		inicio, fim = vetores.pesos_cidades.indptr[i], vetores.pesos_cidades.indptr[i + 1]
+		self._cidades[vetores.pesos_cidades.indices[inicio:fim]] += f * vetores.pesos_cidades.data[inicio:fim]
+		self._interesses += f * vetores.pesos_interesses[i]
+		self._top += sinal * vetores.top_interesses[i]
+
+	def incluir(self, perfil):
+		if perfil in self.membros:
+			return
+		(i,) = self.vetores.posicoes([perfil])
+		self.membros[perfil] = i
+		self._aplicar(i, 1)
+
+	def retirar(self, perfil):
+		i = self.membros.pop(perfil, None)
+		if i is None:
+			return
+		if not self.membros:
+			# Sem membros, as somas voltam a zero exatamente (sem resíduo de arredondamento)
+			self._zerar()
+		else:
+			self._aplicar(i, -1)
+
+	def copia(self):
+		outro = Elenco.__new__(Elenco)
+		outro.vetores = self.vetores
+		outro.membros = dict(self.membros)
+		for nome in ("_seguidores", "_classes", "_educacao", "_cidades", "_interesses", "_top"):
+			setattr(outro, nome, getattr(self, nome).copy())
+		return outro
+
+	def simular(self, incluir=(), retirar=()):
+		"""Métricas do elenco com as inclusões e retiradas informadas, sem alterá-lo."""
+		elenco = self.copia()
+		for perfil in retirar:
+			elenco.retirar(perfil)
+		for perfil in incluir:
+			elenco.incluir(perfil)
+		return elenco.metricas()
+
+	def simular_cada(self):
+		"""Elenco com cada perfil do lote incluído (se está fora) ou retirado (se é membro).
+
+		As linhas seguem ``vetores.influencers`` e são as somas atuais mais ou
+		menos os vetores de cada perfil, sem montar os elencos. Retorna
+		``(perfis, seguidores, classes, educacao)``: número de membros, total de
+		seguidores e as médias de classes e escolaridade de cada variação.
+		"""
+		vetores = self.vetores
+		sinal = np.ones(len(vetores.influencers))
+		sinal[list(self.membros.values())] = -1
+		f = sinal * vetores.seguidores
+		seguidores = self._seguidores[:3] + f[:, None] * np.column_stack([
+			np.ones(len(f)), vetores.com_classes, vetores.com_educacao,
+		])
+		return (
+			len(self.membros) + sinal.astype(int),
+			seguidores[:, 0],
+			_razao(self._classes + f[:, None] * vetores.classes, seguidores[:, 1]),
+			_razao(self._educacao + f[:, None] * vetores.educacao, seguidores[:, 2]),
+		)
+
+	def metricas(self):
+		vetores = self.vetores
+		total, com_classes, com_educacao, com_interesses = self._seguidores
+		interesses_elenco = pd.DataFrame(
+			{"Peso": _razao(self._interesses, com_interesses), "Perfis no top": self._top},
+			index=vetores.interesses,
+		)
+		return MetricasElenco(
+			perfis=len(self.membros),
+			seguidores=float(total),
+			classes=pd.Series(_razao(self._classes, com_classes), index=pontuacao.COLUNAS_CLASSES),
+			educacao=pd.Series(_razao(self._educacao, com_educacao), index=pontuacao.COLUNAS_EDUCACAO),
+			alcance_cidades=pd.Series(self._cidades, index=vetores.cidades).loc[lambda s: s > 0].sort_values(ascending=False),
+			interesses=interesses_elenco[interesses_elenco["Peso"] > 0].sort_values("Peso", ascending=False),
+		)
+
+
+@dataclass(frozen=True)
+class AvaliacaoElencos:
+	# Uma linha por elenco; colunas na ordem dos vetores (classes, escolaridade,
+	# vetores.cidades e vetores.interesses)
+	perfis: np.ndarray
+	seguidores: np.ndarray
+	classes: np.ndarray
+	educacao: np.ndarray
+	alcance_cidades: sparse.csr_matrix
+	interesses: np.ndarray
+	interesses_em_comum: np.ndarray
+
+
+def matriz_elencos(vetores, elencos):
+	"""Matriz esparsa elencos × influenciadores (1 para cada membro) a partir de listas de perfis."""
+	linhas, colunas = [], []
+	for j, elenco in enumerate(elencos):
+		posicoes = np.unique(vetores.posicoes(elenco))
+		linhas.append(np.full(len(posicoes), j))
+		colunas.append(posicoes)
+	linhas = np.concatenate(linhas) if linhas else np.zeros(0, dtype=int)
+	colunas = np.concatenate(colunas) if colunas else np.zeros(0, dtype=int)
+	return sparse.csr_matrix((np.ones(len(linhas)), (linhas, colunas)), shape=(len(elencos), len(vetores.influencers)))
+
+
+def avaliar_elencos(vetores, elencos):
+	"""Métricas de vários elencos de uma vez.
+
+	``elencos`` é uma lista de listas de perfis ou uma matriz (elencos ×
+	influenciadores) de 0 e 1, como a de :func:`matriz_elencos`.
+	"""
+	if not sparse.issparse(elencos) and not isinstance(elencos, np.ndarray):
+		elencos = matriz_elencos(vetores, elencos)
+	membros = sparse.csr_matrix(elencos, dtype=float)
+	f = vetores.seguidores
+	seguidores = membros @ np.column_stack([f, f * vetores.com_classes, f * vetores.com_educacao, f * vetores.com_interesses])
+	return AvaliacaoElencos(
+		perfis=np.asarray(membros.sum(axis=1)).ravel().astype(int),
+		seguidores=seguidores[:, 0],
+		classes=_razao(membros @ (f[:, None] * vetores.classes), seguidores[:, 1]),
+		educacao=_razao(membros @ (f[:, None] * vetores.educacao), seguidores[:, 2]),
+		alcance_cidades=sparse.csr_matrix(membros @ (sparse.diags(f) @ vetores.pesos_cidades)),
+		interesses=_razao(membros @ (f[:, None] * vetores.pesos_interesses), seguidores[:, 3]),
+		interesses_em_comum=np.asarray(membros @ vetores.top_interesses.astype(float)).astype(int),
+	)
@@ -0,0 +1,106 @@
+"""Índice dos nomes de cidades das tabelas de referência.
+
+Os nomes de cidades do IMAI nem sempre são grafados como nas planilhas do
+IBGE (acentos, maiúsculas, sufixos como "Campinas - SP"). O
+:class:`IndiceCidades` associa cada cidade de referência a uma chave inteira
+e converte os nomes da audiência nessas chaves:
+
+1. pelo nome normalizado (sem sufixo de UF, espaços e maiúsculas
+   uniformizados), que preserva os acentos;
+2. não havendo correspondência, pelo nome normalizado sem acentos, desde que
+   ele aponte para uma única cidade (Aracoiaba, CE, e Araçoiaba, PE, por
+   exemplo, só se distinguem pelo acento).
+
+A normalização é feita uma vez por nome distinto, e não por linha.
+"""
+import functools
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Muda sempre que a normalização altera as correspondências, para invalidar
+# os resumos calculados com a anterior (ver :func:`referencias.versao`)
+VERSAO_NORMALIZACAO = 1
+
+UFS = (
+	"AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+	"PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+)
+
+# "Campinas - SP", "Campinas (SP)", "Campinas, SP", "Campinas/SP"
+_SUFIXO_UF = re.compile(r"\s*(?:[-–,/]\s*|\()(?:{})\)?\s*$".format("|".join(UFS)), re.IGNORECASE)
+_APOSTROFOS = str.maketrans({"’": "'", "‘": "'", "´": "'", "`": "'", "–": "-", "‐": "-"})
+_ESPACOS = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=65536)
+def normalizar(nome, acentos=True):
+	"""Forma canônica de um nome de cidade; com ``acentos=False``, também sem acentos."""
+	nome = unicodedata.normalize("NFC", str(nome)).translate(_APOSTROFOS)
+	nome = _SUFIXO_UF.sub("", nome)
+	nome = _ESPACOS.sub(" ", nome).strip().casefold()
+	if not acentos:
+		nome = "".join(c for c in unicodedata.normalize("NFD", nome) if not unicodedata.combining(c))
+	return nome
+
+
+@dataclass(frozen=True)
+class IndiceCidades:
+	"""Chaves inteiras das cidades de referência.
+
+	``nomes`` tem o nome de cada chave (a posição no índice), em ordem
+	alfabética dos nomes normalizados; as chaves valem enquanto as planilhas
+	de referência não mudam.
+	"""
+	nomes: pd.Index
+	_exatas: dict = field(repr=False)
+	# Nome sem acentos -> chave, ou -1 quando corresponde a mais de uma cidade
+	_sem_acentos: dict = field(repr=False)
+
+	@classmethod
+	def construir(cls, nomes, variantes=()):
+		"""Índice das cidades em ``nomes``.
+
+		Nomes com a mesma forma normalizada recebem a mesma chave, assim como
+		os pares ``(variante, nome)`` de ``variantes`` (ex.: ``("Vitoria",
+		"Vitória (ES)")``). O nome exibido de cada chave é o primeiro recebido.
+		"""
+		normalizados = {}
+		for nome in nomes:
+			normalizados.setdefault(normalizar(nome), nome)
+		ordenados = sorted(normalizados)
+		exatas = {normalizado: chave for chave, normalizado in enumerate(ordenados)}
+		for variante, nome in variantes:
+			exatas.setdefault(normalizar(variante), exatas[normalizar(nome)])
+
+		sem_acentos = {}
+		for normalizado, chave in exatas.items():
+			sem_acento = normalizar(normalizado, acentos=False)
+			sem_acentos[sem_acento] = chave if sem_acentos.get(sem_acento, chave) == chave else -1
+		return cls(pd.Index([normalizados[n] for n in ordenados]), exatas, sem_acentos)
+
+	def __len__(self):
+		return len(self.nomes)
+
+	def chave(self, nome):
+		"""Chave de ``nome``, ou -1 sem correspondência (ou com mais de uma)."""
+		if not isinstance(nome, str):
+			return -1
+		chave = self._exatas.get(normalizar(nome))
+		if chave is None:
+			chave = self._sem_acentos.get(normalizar(nome, acentos=False), -1)
+		return chave
+
+	def chaves(self, valores):
+		"""Array com as chaves de cada valor de ``valores``, com -1 nas cidades sem correspondência.
+
+		Cada nome distinto é procurado uma única vez.
+		"""
+		codigos, unicos = pd.factorize(pd.Series(valores))
+		if not len(unicos):
+			return np.full(len(codigos), -1, dtype=np.int64)
+		chaves_unicos = np.fromiter((self.chave(nome) for nome in unicos), dtype=np.int64, count=len(unicos))
+		return np.where(codigos >= 0, chaves_unicos[codigos], -1)
@@ -0,0 +1,92 @@
+"""Gera o resumo "Defesa Influenciadores" sem o Streamlit.
+
+Uso (a partir da raiz do repositório):
+
+	python -m analise.cli caminho/para/jsons -o saida/
+	python -m analise.cli "exportacoes/*/json_*.json" --processos 8
+	python -m analise.cli caminho/para/jsons --formato parquet --extras
+	IMAI_AUTHKEY=... python -m analise.cli --imai perfil1 perfil2 @lista_de_perfis.txt
+
+As linhas são gravadas à medida que cada lote de perfis termina. Com
+``--imai``, as entradas são nomes de perfis (ou ``@arquivo`` com um por linha)
+cujos relatórios são baixados da API do IMAI, sem passar pelo disco.
+"""
+import argparse
+import os
+import sys
+
+from analise import exportacao, lote
+
+
+def _mostrar_progresso(concluidos, total):
+	print(f"\r{concluidos}/{total} perfis processados", end="" if concluidos < total else "\n", file=sys.stderr, flush=True)
+
+
+def _mostrar_downloads(concluidos, total):
+	print(f"\r{concluidos}/{total} relatórios baixados", end="" if concluidos < total else "\n", file=sys.stderr, flush=True)
+
+
+def _baixar_do_imai(args):
+	from analise import imai
+
+	with imai.ClienteIMAI(url_base=args.url_imai, trabalhadores=args.conexoes) as cliente:
+		return imai.baixar_registros(cliente, args.entradas, progresso=None if args.silencioso else _mostrar_downloads)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description="Gera o resumo dos influenciadores a partir dos JSON do IMAI.",
+		fromfile_prefix_chars="@",
+	)
+	parser.add_argument("entradas", nargs="+", help="diretórios ou padrões glob com arquivos json_{perfil}.json (com --imai, nomes dos perfis)")
+	parser.add_argument("-o", "--saida", default=".", help="diretório onde o .xlsx será gravado (padrão: diretório atual)")
+	parser.add_argument("-p", "--processos", type=int, default=None, help="número de processos (padrão: todos os núcleos)")
+	parser.add_argument("-q", "--silencioso", action="store_true", help="não mostrar o progresso nem os avisos por perfil")
+	parser.add_argument("-f", "--formato", choices=exportacao.formatos_disponiveis(), default="xlsx", help="formato do arquivo (padrão: xlsx)")
+	parser.add_argument("--extras", action="store_true", help="incluir os pesos por cidade e os vetores de classes e escolaridade")
+	parser.add_argument("--imai", action="store_true", help="baixar os relatórios dos perfis informados da API do IMAI (chave em IMAI_AUTHKEY)")
+	parser.add_argument("--url-imai", default=None, help="URL base da API do IMAI (padrão: IMAI_URL ou a API pública)")
+	parser.add_argument("--conexoes", type=int, default=8, help="downloads simultâneos com --imai (padrão: 8)")
+	args = parser.parse_args(argv)
+
+	if args.imai:
+		perfis, avisos = _baixar_do_imai(args)
+		if not perfis:
+			for aviso in avisos:
+				print(aviso, file=sys.stderr)
+			print("Nenhum relatório baixado.", file=sys.stderr)
+			return 1
+	else:
+		perfis, avisos = lote.perfis_por_arquivo(lote.listar_arquivos(args.entradas))
+		if not perfis:
+			print("Nenhum arquivo json_{perfil}.json encontrado.", file=sys.stderr)
+			return 1
+
+	os.makedirs(args.saida, exist_ok=True)
+	destino = os.path.join(args.saida, exportacao.nome_arquivo_resumo(extensao=exportacao.extensao_final(args.formato, args.extras)))
+
+	with exportacao.EscritorResumo(destino, args.formato) as escritor:
+		def gravar_lote(tabelas_lote, linhas):
+			escritor.acrescentar(linhas)
+			if args.extras:
+				for aba, df in exportacao.abas_extras(tabelas_lote):
+					escritor.escrever(aba, df)
+
+		tabelas, _, erros = lote.processar_em_paralelo(
+			perfis,
+			processos=args.processos,
+			progresso=None if args.silencioso else _mostrar_progresso,
+			silencioso=args.silencioso,
+			ao_concluir=gravar_lote,
+			# Processo sem outras threads: fork herda as referências já carregadas
+			metodo="fork",
+		)
+	if not args.silencioso:
+		for aviso in avisos + erros + [aviso for _, _, aviso in tabelas.avisos]:
+			print(aviso, file=sys.stderr)
+	print(destino)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
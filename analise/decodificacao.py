@@ -0,0 +1,79 @@
+"""Decodificação dos JSON do IMAI.
+
+Usa o ``orjson`` quando ele está instalado (bem mais rápido para exportações de
+vários MB) e o ``json`` da biblioteca padrão caso contrário. Como as
+exportações completas trazem muitos campos que o resumo não usa (textos,
+imagens e links dos posts etc.), :func:`podar` reduz a árvore decodificada aos
+caminhos lidos pela ingestão, para que apenas esse registro compacto fique em
+memória.
+"""
+import json
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+# Caminhos lidos pela ingestão; None marca um valor mantido como está e listas
+# indicam o esquema de cada item. VERSAO_REGISTRO muda sempre que o esquema
+# ganha campos, para que registros guardados com o esquema anterior sejam refeitos
+VERSAO_REGISTRO = 2
+ESQUEMA_REGISTRO = {
+	"audience_followers": {
+		"data": {
+			"audience_geo": {
+				"cities": [{"name": None, "weight": None, "country": {"code": None}, "state": {"name": None}}],
+			},
+			"audience_genders_per_age": [{"code": None, "male": None, "female": None}],
+			"audience_interests": [{"name": None, "weight": None}],
+			"audience_credibility": None,
+		},
+	},
+	"user_profile": {
+		"fullname": None,
+		"followers": None,
+		"avg_reels_plays": None,
+		"avg_views": None,
+		"recent_posts": [{"stat": {"likes": None, "comments": None, "shares": None}}],
+	},
+}
+
+
+def decodificar(conteudo):
+	"""Decodifica o conteúdo (bytes ou str) de um JSON."""
+	if orjson is not None:
+		return orjson.loads(conteudo)
+	return json.loads(conteudo)
+
+
+def codificar(dados):
+	"""Codifica ``dados`` em JSON (bytes UTF-8)."""
+	if orjson is not None:
+		return orjson.dumps(dados)
+	return json.dumps(dados, ensure_ascii=False).encode("utf-8")
+
+
+def _podar(valor, esquema):
+	if esquema is None:
+		return valor
+	if isinstance(esquema, list):
+		if not isinstance(valor, list):
+			return valor
+		return [_podar(item, esquema[0]) for item in valor]
+	if not isinstance(valor, dict):
+		return valor
+	return {chave: _podar(valor[chave], sub) for chave, sub in esquema.items() if chave in valor}
+
+
+def podar(dados):
+	"""Mantém da árvore decodificada apenas os caminhos de :data:`ESQUEMA_REGISTRO`.
+
+	Chaves ausentes continuam ausentes, de modo que a ingestão se comporta como
+	se recebesse a árvore completa.
+	"""
+	return _podar(dados, ESQUEMA_REGISTRO)
+
+
+def carregar_registro(conteudo):
+	"""Decodifica o JSON e devolve apenas o registro compacto usado pela ingestão."""
+	return podar(decodificar(conteudo))
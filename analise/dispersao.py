@@ -0,0 +1,89 @@
+"""Dispersão das interações (coeficiente de variação de likes e comments) dos posts recentes.
+
+Os posts de todos os perfis são empacotados em arrays únicos (valores +
+offsets de cada perfil) e as médias e desvios padrão são obtidos com reduções
+por segmento (``np.add.reduceat``), sem loops em Python por perfil.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _somar_segmentos(valores, inicios, tamanhos):
+	# np.add.reduceat não lida com segmentos vazios: soma apenas os não vazios
+	somas = np.zeros(len(tamanhos))
+	cheios = tamanhos > 0
+	if cheios.any():
+		somas[cheios] = np.add.reduceat(valores, inicios[cheios])
+	return somas
+
+
+def coeficiente_variacao(valores, offsets):
+	"""Coeficiente de variação (%) de cada segmento ``valores[offsets[i]:offsets[i + 1]]``.
+
+	Usa o desvio padrão populacional, como ``np.std``. Segmentos vazios ou com
+	soma zero recebem 0.
+	"""
+	valores = np.asarray(valores, dtype=float)
+	offsets = np.asarray(offsets, dtype=np.int64)
+	inicios = offsets[:-1]
+	tamanhos = np.diff(offsets)
+
+	somas = _somar_segmentos(valores, inicios, tamanhos)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		medias = somas / tamanhos
+		desvios = valores - np.repeat(medias, tamanhos)
+		desvios_padrao = np.sqrt(_somar_segmentos(desvios * desvios, inicios, tamanhos) / tamanhos)
+		cv = (desvios_padrao / medias) * 100
+
+	validos = (tamanhos > 0) & (somas > 0) & (medias != 0)
+	return np.where(validos, cv, 0.0)
+
+
+def dispersao(likes, comments, offsets, tem_likes=None):
+	"""Dispersão de cada perfil a partir dos arrays empacotados.
+
+	``likes`` e ``comments`` trazem os valores de todos os posts, na mesma
+	ordem, e ``offsets`` delimita os posts de cada perfil. Valores ausentes
+	(NaN) contam como 0, inclusive os que vinham como texto no JSON (o
+	cálculo anterior descartava o perfil nesse caso). Para perfis com
+	``tem_likes`` falso, apenas os comments são considerados. Quando o CV dos
+	likes é 0, a dispersão é o CV dos comments; caso contrário, a média dos
+	dois. O resultado é arredondado para inteiro (meio para o par, como
+	``round``).
+	"""
+	likes = np.trunc(np.nan_to_num(np.asarray(likes, dtype=float)))
+	comments = np.trunc(np.nan_to_num(np.asarray(comments, dtype=float)))
+
+	cv_comments = coeficiente_variacao(comments, offsets)
+	cv_likes = coeficiente_variacao(likes, offsets)
+	if tem_likes is not None:
+		cv_likes = np.where(np.asarray(tem_likes, dtype=bool), cv_likes, 0.0)
+
+	return np.where(cv_likes > 0, np.round((cv_comments + cv_likes) / 2, 0), np.round(cv_comments, 0))
+
+
+def empacotar_posts(posts, perfis):
+	"""Empacota a tabela de posts em ``(likes, comments, offsets)`` na ordem de ``perfis``."""
+	codigos = pd.Index(perfis).get_indexer(posts["influencer"])
+	validos = codigos >= 0
+	ordem = np.argsort(codigos[validos], kind="stable")
+
+	likes = posts["likes"].to_numpy(dtype=float)[validos][ordem]
+	comments = posts["comments"].to_numpy(dtype=float)[validos][ordem]
+	contagens = np.bincount(codigos[validos], minlength=len(perfis))
+	offsets = np.concatenate([[0], np.cumsum(contagens)])
+	return likes, comments, offsets
+
+
+def dispersao_por_perfil(tabelas):
+	"""Dispersão de cada perfil das tabelas extraídas.
+
+	Retorna uma Series indexada pelo influenciador, apenas com os perfis que
+	têm comments nos posts recentes.
+	"""
+	perfis = tabelas.perfis
+	likes, comments, offsets = empacotar_posts(tabelas.posts, perfis.index)
+	valores = dispersao(likes, comments, offsets, tem_likes=perfis["posts_likes"].to_numpy(dtype=bool))
+
+	com_comments = perfis["posts_comments"].to_numpy(dtype=bool)
+	return pd.Series(valores[com_comments], index=perfis.index[com_comments], name="Dispersão")
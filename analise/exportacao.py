@@ -0,0 +1,270 @@
+"""Exportação do resumo "Defesa Influenciadores".
+
+O :class:`EscritorResumo` grava as linhas à medida que são recebidas: no
+``.xlsx`` o xlsxwriter roda em modo ``constant_memory`` (cada linha vai para o
+disco assim que a seguinte começa) e em CSV/Parquet cada lote é acrescentado
+ao arquivo. As abas extras (pesos por cidade e vetores de classes e
+escolaridade) são calculadas e gravadas em lotes de perfis. No ``.xlsx``,
+uma aba que passa do limite de linhas do formato continua em abas numeradas
+("Pesos por cidade (2)", ...).
+"""
+import csv
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+
+import pandas as pd
+import xlsxwriter
+
+from analise import ingestao, pontuacao, resumo
+
+try:
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+except ImportError:
+	pa = pq = None
+
+ABA_RESUMO = "Defesa Influenciadores"
+ABA_CIDADES = "Pesos por cidade"
+ABA_CLASSES = "Vetores de classes"
+ABA_ESCOLARIDADE = "Vetores de escolaridade"
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MIMES = {
+	"xlsx": MIME_XLSX,
+	"csv": "text/csv",
+	"parquet": "application/vnd.apache.parquet",
+	"zip": "application/zip",
+}
+
+PERFIS_POR_LOTE = 500
+# Colunas numéricas de cada aba no Parquet; as demais são gravadas como texto.
+# O esquema é fixo: um lote só com números em "Score da audiência" (sem
+# "N/A") ou só com nulos em "Estado" não decide o tipo da coluna no arquivo
+COLUNAS_NUMERICAS_PARQUET = {
+	ABA_RESUMO: {"Dispersão de interações": "int64"},
+	ABA_CIDADES: {"weight": "float64"},
+	ABA_CLASSES: dict.fromkeys(pontuacao.COLUNAS_CLASSES, "float64"),
+	ABA_ESCOLARIDADE: dict.fromkeys(pontuacao.COLUNAS_EDUCACAO, "float64"),
+}
+# Linhas por planilha no formato .xlsx, incluindo o cabeçalho
+LINHAS_XLSX = 1048576
+
+
+def formatos_disponiveis():
+	"""Formatos de exportação suportados neste ambiente (Parquet exige o pyarrow)."""
+	return ["xlsx", "csv", "parquet"] if pq is not None else ["xlsx", "csv"]
+
+
+def extensao_final(formato, com_extras=False):
+	"""Extensão do arquivo gravado em ``formato``: CSV e Parquet com abas extras viram ``.zip``."""
+	return "zip" if com_extras and formato != "xlsx" else formato
+
+
+def nome_arquivo_resumo(agora=None, extensao="xlsx"):
+	"""Nome padrão do arquivo, ex.: ``resumo_defesa_influenciadores_2025_01_31_10_00_00.xlsx``."""
+	agora = (agora or datetime.now()).strftime("%Y_%m_%d_%H_%M_%S")
+	return "resumo_defesa_influenciadores_{}.{}".format(agora, extensao)
+
+
+def _linhas(df):
+	# Valores nativos do Python, com None no lugar de NaN
+	return df.astype(object).where(df.notna(), None).to_numpy().tolist()
+
+
+def _nome_seguro(aba):
+	return "".join(c if c.isalnum() else "_" for c in aba).strip("_").lower()
+
+
+class _AbaCsv:
+	def __init__(self, caminho, colunas):
+		self._arquivo = open(caminho, "w", newline="", encoding="utf-8-sig")
+		self._escritor = csv.writer(self._arquivo)
+		self._escritor.writerow(colunas)
+
+	def escrever(self, df):
+		self._escritor.writerows(_linhas(df))
+
+	def fechar(self):
+		self._arquivo.close()
+
+
+class _AbaParquet:
+	def __init__(self, caminho, colunas, numericas):
+		self._numericas = numericas
+		esquema = pa.schema([(coluna, pa.type_for_alias(numericas.get(coluna, "string"))) for coluna in colunas])
+		self._escritor = pq.ParquetWriter(caminho, esquema)
+
+	def escrever(self, df):
+		# Tudo o que não é coluna numérica vira texto, em todos os lotes
+		df = df.copy()
+		for coluna in df.columns:
+			if coluna not in self._numericas:
+				valores = df[coluna].astype(object)
+				df[coluna] = [None if valor is None else str(valor) for valor in valores.where(valores.notna(), None)]
+		tabela = pa.Table.from_pandas(df, schema=self._escritor.schema, preserve_index=False)
+		self._escritor.write_table(tabela)
+
+	def fechar(self):
+		self._escritor.close()
+
+
+class _AbaXlsx:
+	def __init__(self, livro, nome, colunas):
+		self._livro = livro
+		self._nome = nome
+		self._colunas = colunas
+		self._partes = 0
+		self._nova_planilha()
+
+	def _nova_planilha(self):
+		self._partes += 1
+		nome = self._nome if self._partes == 1 else "{} ({})".format(self._nome, self._partes)
+		self._planilha = self._livro.add_worksheet(nome)
+		self._gravar(0, self._colunas)
+		self._linha = 1
+
+	def _gravar(self, linha, valores):
+		# write_row retorna -1 (sem gravar) fora dos limites de linhas e colunas
+		if self._planilha.write_row(linha, 0, valores) == -1:
+			raise ValueError("Linha fora dos limites do formato .xlsx na aba {}".format(self._planilha.name))
+
+	def escrever(self, df):
+		for valores in _linhas(df):
+			if self._linha >= LINHAS_XLSX:
+				self._nova_planilha()
+			self._gravar(self._linha, valores)
+			self._linha += 1
+
+	def fechar(self):
+		pass
+
+
+class EscritorResumo:
+	"""Grava o resumo (e abas extras) em ``destino``, lote a lote.
+
+	``destino`` é um caminho ou um buffer binário. Em ``xlsx`` cada aba vira
+	uma planilha do arquivo; em ``csv`` e ``parquet``, o arquivo tem só o
+	resumo ou, havendo abas extras, é um ``.zip`` com um arquivo por aba
+	(ver :attr:`extensao`).
+	"""
+
+	def __init__(self, destino, formato="xlsx"):
+		if formato not in MIMES or formato == "zip":
+			raise ValueError("Formato de exportação desconhecido: {}".format(formato))
+		if formato == "parquet" and pq is None:
+			raise ValueError("A exportação em Parquet requer o pacote pyarrow")
+		self.destino = destino
+		self.formato = formato
+		self._abas = {}
+		self._pasta = None
+		self._livro = None
+		if formato == "xlsx":
+			self._livro = xlsxwriter.Workbook(destino, {"constant_memory": True})
+		else:
+			self._pasta = tempfile.mkdtemp(prefix="vis_influ_exportacao_")
+
+	@property
+	def extensao(self):
+		return extensao_final(self.formato, len(self._abas) > 1)
+
+	def _aba(self, nome, colunas):
+		if nome not in self._abas:
+			if self._livro is not None:
+				self._abas[nome] = _AbaXlsx(self._livro, nome, colunas)
+			else:
+				caminho = os.path.join(self._pasta, "{}.{}".format(_nome_seguro(nome), self.formato))
+				if self.formato == "csv":
+					escritor = _AbaCsv(caminho, colunas)
+				else:
+					escritor = _AbaParquet(caminho, colunas, COLUNAS_NUMERICAS_PARQUET.get(nome, {}))
+				self._abas[nome] = (escritor, caminho)
+		aba = self._abas[nome]
+		return aba if self._livro is not None else aba[0]
+
+	def escrever(self, aba, df):
+		"""Acrescenta as linhas de ``df`` à aba ``aba``, criando-a na primeira chamada."""
+		self._aba(aba, list(df.columns)).escrever(df)
+
+	def acrescentar(self, linhas):
+		"""Acrescenta linhas do resumo (dicionários ou DataFrame com :data:`resumo.COLUNAS_RESUMO`)."""
+		df = linhas if isinstance(linhas, pd.DataFrame) else pd.DataFrame(linhas, columns=resumo.COLUNAS_RESUMO)
+		self.escrever(ABA_RESUMO, df)
+
+	def fechar(self):
+		"""Conclui o arquivo e retorna a extensão final (``xlsx``, ``csv``, ``parquet`` ou ``zip``)."""
+		extensao = self.extensao
+		if self._livro is not None:
+			self._aba(ABA_RESUMO, resumo.COLUNAS_RESUMO)
+			self._livro.close()
+			return extensao
+
+		self._aba(ABA_RESUMO, resumo.COLUNAS_RESUMO)
+		for aba, _ in self._abas.values():
+			aba.fechar()
+		try:
+			if extensao == "zip":
+				self._compactar()
+			else:
+				self._copiar(self._abas[ABA_RESUMO][1])
+		finally:
+			shutil.rmtree(self._pasta, ignore_errors=True)
+		return extensao
+
+	def _copiar(self, origem):
+		if isinstance(self.destino, (str, os.PathLike)):
+			shutil.copyfile(origem, self.destino)
+		else:
+			with open(origem, "rb") as f:
+				shutil.copyfileobj(f, self.destino)
+
+	def _compactar(self):
+		with zipfile.ZipFile(self.destino, "w", compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+			for _, caminho in self._abas.values():
+				arquivo_zip.write(caminho, os.path.basename(caminho))
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, tipo, *_):
+		if tipo is None:
+			self.fechar()
+		elif self._livro is not None:
+			self._livro.close()
+		elif self._pasta is not None:
+			shutil.rmtree(self._pasta, ignore_errors=True)
+
+
+def abas_extras(tabelas, perfis_por_lote=PERFIS_POR_LOTE):
+	"""Gera ``(aba, DataFrame)`` com os pesos por cidade e os vetores de classes e escolaridade.
+
+	Os vetores não são arredondados nem formatados. Os perfis são processados
+	em lotes de ``perfis_por_lote``, de modo que apenas um lote de cada aba
+	fica em memória por vez.
+	"""
+	influencers = list(tabelas.perfis.index)
+	for inicio in range(0, len(influencers), perfis_por_lote):
+		lote = ingestao.filtrar_tabelas(tabelas, influencers[inicio:inicio + perfis_por_lote])
+		cidades = lote.cidades.astype({coluna: object for coluna in ["influencer", "Cidade", "Estado", "country.code"]})
+		yield ABA_CIDADES, cidades.reset_index(drop=True)
+
+		df_cidades = ingestao.cidades_brasileiras(lote)
+		yield ABA_CLASSES, pontuacao.pontuar_classes(df_cidades).rename_axis("influencer").reset_index()
+		yield ABA_ESCOLARIDADE, pontuacao.pontuar_educacao(df_cidades, lote.demografia).rename_axis("influencer").reset_index()
+
+
+def exportar(df_resumo, destino, formato="xlsx", extras=()):
+	"""Grava o resumo e as abas de ``extras`` (ver :func:`abas_extras`); retorna a extensão final."""
+	with EscritorResumo(destino, formato) as escritor:
+		for inicio in range(0, len(df_resumo), PERFIS_POR_LOTE):
+			escritor.acrescentar(df_resumo.iloc[inicio:inicio + PERFIS_POR_LOTE])
+		for aba, df in extras:
+			escritor.escrever(aba, df)
+	return escritor.extensao
+
+
+def escrever_excel(df_resumo, destino):
+	"""Grava o resumo em ``destino`` (caminho ou buffer binário)."""
+	exportar(df_resumo, destino, "xlsx")
@@ -0,0 +1,38 @@
+"""Paginação dos cards de posts da aba Posts.
+
+Apenas os posts da página exibida têm os dados do card montados; os demais
+ficam como estão no JSON.
+"""
+import math
+
+POSTS_POR_PAGINA = 12
+
+
+def total_paginas(total_posts, por_pagina=POSTS_POR_PAGINA):
+	return max(1, math.ceil(total_posts / por_pagina))
+
+
+def intervalo_pagina(pagina, total_posts, por_pagina=POSTS_POR_PAGINA):
+	"""Índices ``(início, fim)`` dos posts da página (contada a partir de 1)."""
+	pagina = min(max(1, pagina), total_paginas(total_posts, por_pagina))
+	inicio = (pagina - 1) * por_pagina
+	return inicio, min(inicio + por_pagina, total_posts)
+
+
+def cards_da_pagina(lista_posts, pagina, por_pagina=POSTS_POR_PAGINA):
+	"""Dados dos cards dos posts de uma página: link, imagem, texto e métricas."""
+	inicio, fim = intervalo_pagina(pagina, len(lista_posts), por_pagina)
+	cards = []
+	for post in lista_posts[inicio:fim]:
+		stat = post.get("stat", {})
+		cards.append(
+			{
+				"link": post.get("link", "#"),
+				"imagem": post.get("thumbnail") or post.get("user_picture"),
+				"texto": post.get("text", ""),
+				"likes": stat.get("likes", 0),
+				"comments": stat.get("comments", 0),
+				"shares": stat.get("shares", 0),
+			}
+		)
+	return cards
@@ -0,0 +1,217 @@
+"""Índice geográfico da audiência: pesos por cidade, estado (UF) e região.
+
+Montado uma vez por lote de perfis, o índice guarda a matriz esparsa
+influenciador × cidade com a fração da audiência em cada cidade brasileira e
+as suas agregações por UF e por região (produtos pela matriz esparsa
+cidade → UF). As consultas (cidades de maior alcance, perfis com mais de X%
+da audiência em um local, alcance por UF) são operações sobre essas matrizes,
+sem percorrer os DataFrames.
+
+A UF de cada cidade vem do estado informado pelo IMAI e, quando ele não é
+reconhecido, da tabela de classes sociais ("Cidade (UF)"). Como o IMAI lista
+apenas as principais cidades de cada perfil, as frações são da audiência
+nessas cidades.
+"""
+import functools
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analise import cidades, ingestao, pontuacao, referencias
+
+SEM_UF = "?"
+
+REGIOES = {
+	"Norte": ("AC", "AM", "AP", "PA", "RO", "RR", "TO"),
+	"Nordeste": ("AL", "BA", "CE", "MA", "PB", "PE", "PI", "RN", "SE"),
+	"Centro-Oeste": ("DF", "GO", "MS", "MT"),
+	"Sudeste": ("ES", "MG", "RJ", "SP"),
+	"Sul": ("PR", "RS", "SC"),
+}
+REGIAO_UF = {uf: regiao for regiao, ufs in REGIOES.items() for uf in ufs}
+
+NOMES_UFS = {
+	"AC": "Acre", "AL": "Alagoas", "AM": "Amazonas", "AP": "Amapá", "BA": "Bahia", "CE": "Ceará",
+	"DF": "Distrito Federal", "ES": "Espírito Santo", "GO": "Goiás", "MA": "Maranhão", "MG": "Minas Gerais",
+	"MS": "Mato Grosso do Sul", "MT": "Mato Grosso", "PA": "Pará", "PB": "Paraíba", "PE": "Pernambuco",
+	"PI": "Piauí", "PR": "Paraná", "RJ": "Rio de Janeiro", "RN": "Rio Grande do Norte", "RO": "Rondônia",
+	"RR": "Roraima", "RS": "Rio Grande do Sul", "SC": "Santa Catarina", "SE": "Sergipe", "SP": "São Paulo",
+	"TO": "Tocantins",
+}
+_UF_POR_NOME = {cidades.normalizar(nome, acentos=False): uf for uf, nome in NOMES_UFS.items()}
+_UF_POR_NOME.update({uf.casefold(): uf for uf in NOMES_UFS})
+_UF_POR_NOME["federal district"] = "DF"
+# "State of São Paulo", "Estado de São Paulo"
+_PREFIXO_ESTADO = re.compile(r"^(?:state of|estado d[eoa])\s+")
+_UF_REFERENCIA = re.compile(r"\((\w\w)\)\s*$")
+
+
+def uf_do_estado(nome):
+	"""UF de um nome de estado ("São Paulo", "State of Sao Paulo", "SP"); None se não reconhecido."""
+	if not isinstance(nome, str):
+		return None
+	return _UF_POR_NOME.get(_PREFIXO_ESTADO.sub("", cidades.normalizar(nome, acentos=False)))
+
+
+@functools.lru_cache(maxsize=1)
+def _ufs_referencia(versao):
+	# UF de cada chave do índice de cidades, pela coluna "Cidade e Estado" da
+	# tabela de classes; chaves com mais de uma UF (homônimos) ficam sem UF
+	indice = pontuacao.matrizes_referencia().indice_cidades
+	classes = referencias.classes_por_cidade()
+	ufs = classes["Cidade e Estado"].str.extract(_UF_REFERENCIA, expand=False)
+	pares = pd.DataFrame({"chave": indice.chaves(classes.index), "uf": ufs.to_numpy()}).dropna()
+	pares = pares[pares["chave"] >= 0].drop_duplicates()
+	unicos = pares[~pares["chave"].duplicated(keep=False)]
+	resultado = np.full(len(indice), None, dtype=object)
+	resultado[unicos["chave"].to_numpy()] = unicos["uf"].to_numpy()
+	return resultado
+
+
+def _agregador(grupos, rotulos):
+	# Matriz esparsa (itens × rótulos) com 1 na coluna do grupo de cada item
+	codigos = pd.Index(rotulos).get_indexer(grupos)
+	return sparse.csr_matrix((np.ones(len(codigos)), (np.arange(len(codigos)), codigos)), shape=(len(codigos), len(rotulos)))
+
+
+@dataclass(frozen=True)
+class IndiceGeografico:
+	influencers: pd.Index
+	seguidores: np.ndarray
+	# Cidades da audiência, por (nome, UF), e fração da audiência de cada
+	# influenciador em cada uma
+	cidades: pd.Index
+	ufs_cidades: np.ndarray
+	pesos: sparse.csr_matrix
+	# Agregações por UF (UFs conhecidas e SEM_UF) e por região
+	ufs: pd.Index
+	pesos_ufs: np.ndarray
+	regioes: pd.Index
+	pesos_regioes: np.ndarray
+
+	@classmethod
+	def construir(cls, tabelas):
+		"""Índice dos perfis de ``tabelas``, na ordem de ``tabelas.perfis``."""
+		influencers = pd.Index(tabelas.perfis.index, name="influencer")
+		df = ingestao.cidades_brasileiras(tabelas).dropna(subset=["Cidade"])
+
+		# UF de cada linha, procurada uma vez por cidade e estado distintos
+		codigos_estado, estados = pd.factorize(np.asarray(df["Estado"], dtype=object))
+		ufs_estado = np.array([uf_do_estado(estado) for estado in estados] + [None], dtype=object)[codigos_estado]
+		codigos_nome, nomes = pd.factorize(np.asarray(df["Cidade"], dtype=object))
+		chaves = pontuacao.codificar_cidades(nomes, pontuacao.matrizes_referencia().indice_cidades)
+		ufs_referencia = np.append(_ufs_referencia(referencias.versao()), None)[chaves][codigos_nome]
+		ufs_linhas = np.where(pd.isna(ufs_estado), ufs_referencia, ufs_estado)
+		ufs_linhas = np.where(pd.isna(ufs_linhas), SEM_UF, ufs_linhas).astype(object)
+
+		codigos_cidade, pares = pd.factorize(pd.MultiIndex.from_arrays([np.asarray(nomes, dtype=object)[codigos_nome], ufs_linhas]))
+		nomes_cidades = pares.get_level_values(0)
+		ufs_cidades = np.asarray(pares.get_level_values(1), dtype=object)
+		rotulos = [
+			"{} ({})".format(nome, uf) if uf != SEM_UF else nome
+			for nome, uf in zip(nomes_cidades, ufs_cidades)
+		]
+		pesos = sparse.csr_matrix(
+			(
+				np.nan_to_num(df["weight"].to_numpy(dtype=float)),
+				(influencers.get_indexer(np.asarray(df["influencer"], dtype=object)), codigos_cidade),
+			),
+			shape=(len(influencers), len(rotulos)),
+		)
+		pesos.sum_duplicates()
+
+		ufs = pd.Index(list(NOMES_UFS) + [SEM_UF], name="UF")
+		regioes = pd.Index(list(REGIOES) + [SEM_UF], name="Região")
+		por_uf = pesos @ _agregador(ufs_cidades, ufs)
+		regiao_das_ufs = [REGIAO_UF.get(uf, SEM_UF) for uf in ufs]
+		return cls(
+			influencers=influencers,
+			seguidores=np.nan_to_num(tabelas.perfis["seguidores"].to_numpy(dtype=float)),
+			cidades=pd.Index(rotulos, name="Cidade"),
+			ufs_cidades=ufs_cidades,
+			pesos=pesos,
+			ufs=ufs,
+			pesos_ufs=np.asarray(por_uf.todense()),
+			regioes=regioes,
+			pesos_regioes=np.asarray((por_uf @ _agregador(regiao_das_ufs, regioes)).todense()),
+		)
+
+	@property
+	def nbytes(self):
+		return sum(
+			array.nbytes
+			for array in (self.seguidores, self.pesos.data, self.pesos.indices, self.pesos.indptr, self.pesos_ufs, self.pesos_regioes)
+		)
+
+	def _linhas(self, perfis):
+		if perfis is None:
+			return np.arange(len(self.influencers))
+		posicoes = self.influencers.get_indexer(list(perfis))
+		return posicoes[posicoes >= 0]
+
+	def top_cidades(self, perfis=None, n=10):
+		"""Cidades com maior alcance estimado (seguidores × fração) somando os ``perfis`` (padrão: todos).
+
+		Retorna um DataFrame com a cidade, a UF, os seguidores estimados e
+		quantos dos perfis têm audiência na cidade.
+		"""
+		linhas = self._linhas(perfis)
+		pesos = self.pesos[linhas]
+		alcance = pesos.T @ self.seguidores[linhas]
+		presentes = np.diff(pesos.tocsc().indptr)
+		melhores = np.flatnonzero(presentes)
+		melhores = melhores[np.argsort(-alcance[melhores], kind="stable")[:n]]
+		return pd.DataFrame({
+			"Cidade": self.cidades[melhores],
+			"UF": self.ufs_cidades[melhores],
+			"Seguidores estimados": alcance[melhores],
+			"Perfis": presentes[melhores],
+		})
+
+	def _coluna(self, local):
+		# Fração da audiência de cada perfil em uma UF, região ou cidade
+		if local in self.ufs:
+			return self.pesos_ufs[:, self.ufs.get_loc(local)]
+		if local in self.regioes:
+			return self.pesos_regioes[:, self.regioes.get_loc(local)]
+		posicoes = np.flatnonzero(self.cidades == local)
+		if not len(posicoes):
+			raise KeyError("Local desconhecido: {}".format(local))
+		return np.asarray(self.pesos[:, posicoes].sum(axis=1)).ravel()
+
+	def perfis_com_participacao(self, local, minimo=0.0, perfis=None):
+		"""Perfis com pelo menos ``minimo`` (fração) da audiência em ``local`` (UF, região ou cidade), do maior para o menor."""
+		linhas = self._linhas(perfis)
+		fracao = self._coluna(local)[linhas]
+		selecionados = linhas[fracao >= minimo]
+		fracao = fracao[fracao >= minimo]
+		ordem = np.argsort(-fracao, kind="stable")
+		return pd.DataFrame({
+			"Perfil": self.influencers[selecionados[ordem]],
+			"Participação": fracao[ordem],
+			"Seguidores estimados": fracao[ordem] * self.seguidores[selecionados[ordem]],
+		})
+
+	def alcance_por_uf(self, perfis=None):
+		"""Seguidores estimados de ``perfis`` (padrão: todos) em cada UF e a participação no total das cidades brasileiras."""
+		linhas = self._linhas(perfis)
+		alcance = self.seguidores[linhas] @ self.pesos_ufs[linhas]
+		return pd.DataFrame({
+			"UF": self.ufs,
+			"Região": [REGIAO_UF.get(uf, SEM_UF) for uf in self.ufs],
+			"Seguidores estimados": alcance,
+			"Participação": alcance / alcance.sum() if alcance.sum() > 0 else np.zeros(len(alcance)),
+		}).sort_values("Seguidores estimados", ascending=False, ignore_index=True)
+
+	def alcance_por_regiao(self, perfis=None):
+		"""Seguidores estimados de ``perfis`` (padrão: todos) em cada região."""
+		linhas = self._linhas(perfis)
+		alcance = self.seguidores[linhas] @ self.pesos_regioes[linhas]
+		return pd.DataFrame({
+			"Região": self.regioes,
+			"Seguidores estimados": alcance,
+			"Participação": alcance / alcance.sum() if alcance.sum() > 0 else np.zeros(len(alcance)),
+		}).sort_values("Seguidores estimados", ascending=False, ignore_index=True)
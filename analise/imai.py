@@ -0,0 +1,232 @@
+"""Cliente da API do IMAI para baixar os relatórios dos perfis em lote.
+
+Os relatórios são pedidos em paralelo por um número limitado de threads que
+compartilham uma ``requests.Session``, reaproveitando as conexões. Respostas
+429 e erros temporários (5xx, falhas de conexão) são repetidos com espera
+exponencial; um 429 pausa todas as threads pelo tempo indicado em
+``Retry-After``, para não insistir contra o limite de requisições.
+
+Cada relatório é entregue em memória, com o mesmo conteúdo de um JSON
+exportado manualmente, e segue direto para a ingestão, sem arquivos
+temporários. Para testes sem acesso à API, ver ``benchmarks/servidor_imai.py``.
+"""
+import email.utils
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from analise import decodificacao
+
+URL_BASE = "https://imai.co/api"
+# Variáveis de ambiente com a chave de acesso e, opcionalmente, outra URL da API
+VARIAVEL_CHAVE = "IMAI_AUTHKEY"
+VARIAVEL_URL = "IMAI_URL"
+
+TRABALHADORES = 8
+TENTATIVAS = 5
+ESPERA_INICIAL = 1.0
+ESPERA_MAXIMA = 60.0
+TEMPO_LIMITE = 60
+STATUS_TEMPORARIOS = {429, 500, 502, 503, 504}
+
+
+class ErroIMAI(Exception):
+	"""Relatório que não pôde ser obtido; ``status`` é o código HTTP da última resposta, se houve."""
+
+	def __init__(self, perfil, mensagem, status=None):
+		super().__init__("Erro ao baixar o relatório do influenciador {}: {}".format(perfil, mensagem))
+		self.perfil = perfil
+		self.status = status
+
+
+def segundos_retry_after(valor, agora=None):
+	"""Espera indicada no cabeçalho ``Retry-After`` (segundos ou data HTTP), ou None."""
+	if not valor:
+		return None
+	try:
+		return max(0.0, float(valor))
+	except ValueError:
+		pass
+	try:
+		data = email.utils.parsedate_to_datetime(valor)
+	except (TypeError, ValueError):
+		return None
+	return max(0.0, data.timestamp() - (time.time() if agora is None else agora))
+
+
+class ClienteIMAI:
+	"""Baixa os relatórios do IMAI com até ``trabalhadores`` requisições simultâneas.
+
+	``chave`` e ``url_base`` vêm, por padrão, das variáveis de ambiente
+	``IMAI_AUTHKEY`` e ``IMAI_URL``. Cada relatório é tentado até
+	``tentativas`` vezes.
+	"""
+
+	def __init__(
+		self,
+		chave=None,
+		url_base=None,
+		plataforma="instagram",
+		trabalhadores=TRABALHADORES,
+		tentativas=TENTATIVAS,
+		espera_inicial=ESPERA_INICIAL,
+		espera_maxima=ESPERA_MAXIMA,
+		tempo_limite=TEMPO_LIMITE,
+	):
+		self.url_base = (url_base or os.environ.get(VARIAVEL_URL) or URL_BASE).rstrip("/")
+		self.plataforma = plataforma
+		self.trabalhadores = trabalhadores
+		self.tentativas = tentativas
+		self.espera_inicial = espera_inicial
+		self.espera_maxima = espera_maxima
+		self.tempo_limite = tempo_limite
+
+		chave = chave or os.environ.get(VARIAVEL_CHAVE)
+		self._sessao = requests.Session()
+		if chave:
+			self._sessao.headers["authkey"] = chave
+		# Uma conexão mantida por thread, em vez de uma nova a cada relatório
+		adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=trabalhadores)
+		self._sessao.mount("http://", adaptador)
+		self._sessao.mount("https://", adaptador)
+
+		self._trava = threading.Lock()
+		# Instante até o qual nenhuma thread faz requisições (após um 429)
+		self._pausa_ate = 0.0
+		self._aleatorio = random.Random()
+
+	def _aguardar_pausa(self):
+		while True:
+			with self._trava:
+				restante = self._pausa_ate - time.monotonic()
+			if restante <= 0:
+				return
+			time.sleep(restante)
+
+	def _pausar(self, segundos):
+		with self._trava:
+			self._pausa_ate = max(self._pausa_ate, time.monotonic() + segundos)
+
+	def _espera(self, tentativa):
+		# Exponencial com variação aleatória, para as threads não voltarem juntas
+		espera = min(self.espera_maxima, self.espera_inicial * 2 ** tentativa)
+		return espera * (0.5 + self._aleatorio.random() / 2)
+
+	def baixar(self, perfil):
+		"""Conteúdo (bytes) do relatório de ``perfil``; levanta :class:`ErroIMAI` se não for possível obtê-lo."""
+		url = "{}/reports/new/".format(self.url_base)
+		parametros = {"platform": self.plataforma, "url": perfil}
+		erro = None
+		for tentativa in range(self.tentativas):
+			self._aguardar_pausa()
+			try:
+				resposta = self._sessao.get(url, params=parametros, timeout=self.tempo_limite)
+			except requests.RequestException as excecao:
+				erro = ErroIMAI(perfil, excecao)
+				espera = self._espera(tentativa)
+			else:
+				if resposta.status_code == 200:
+					return resposta.content
+				erro = ErroIMAI(perfil, "HTTP {}".format(resposta.status_code), resposta.status_code)
+				if resposta.status_code not in STATUS_TEMPORARIOS:
+					raise erro
+				espera = segundos_retry_after(resposta.headers.get("Retry-After"))
+				if espera is None:
+					espera = self._espera(tentativa)
+				if resposta.status_code == 429:
+					# O limite vale para a chave: todas as threads aguardam
+					self._pausar(min(espera, self.espera_maxima))
+					continue
+			if tentativa + 1 < self.tentativas:
+				time.sleep(min(espera, self.espera_maxima))
+		raise erro
+
+	def baixar_varios(self, perfis, progresso=None):
+		"""Gera ``(perfil, conteúdo, erro)`` à medida que os relatórios chegam.
+
+		``erro`` é None ou a :class:`ErroIMAI` do perfil (e ``conteúdo``, None).
+		Há no máximo ``2 × trabalhadores`` relatórios pedidos e ainda não
+		consumidos, de modo que a memória não cresce com o número de perfis.
+		``progresso``, se informado, é chamado com ``(concluídos, total)``.
+		"""
+		perfis = list(dict.fromkeys(perfis))
+		if not perfis:
+			return
+		fila = iter(perfis)
+		limite = 2 * self.trabalhadores
+		concluidos = 0
+		with ThreadPoolExecutor(max_workers=min(self.trabalhadores, len(perfis))) as executor:
+			pendentes = {}
+
+			def pedir():
+				for perfil in itertools.islice(fila, limite - len(pendentes)):
+					pendentes[executor.submit(self.baixar, perfil)] = perfil
+
+			pedir()
+			while pendentes:
+				feitos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+				for futuro in feitos:
+					perfil = pendentes.pop(futuro)
+					try:
+						resultado = (perfil, futuro.result(), None)
+					except ErroIMAI as erro:
+						resultado = (perfil, None, erro)
+					concluidos += 1
+					if progresso:
+						progresso(concluidos, len(perfis))
+					yield resultado
+				pedir()
+
+	def fechar(self):
+		self._sessao.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *_):
+		self.fechar()
+
+
+def baixar_registros(cliente, perfis, progresso=None, ao_baixar=None):
+	"""Baixa e decodifica os relatórios de ``perfis``.
+
+	Cada relatório é reduzido ao registro compacto da ingestão (ver
+	:func:`decodificacao.podar`) assim que chega, enquanto os demais ainda
+	estão sendo baixados. ``ao_baixar``, se informado, recebe ``(perfil,
+	conteúdo, registro)`` antes do conteúdo ser descartado (ex.: para guardá-lo
+	no acervo).
+
+	Retorna ``(registros, erros)``: ``{perfil: registro}`` na ordem de
+	``perfis`` e a lista de mensagens dos perfis que falharam.
+	"""
+	registros = {}
+	erros = {}
+	for perfil, conteudo, erro in cliente.baixar_varios(perfis, progresso):
+		if erro is not None:
+			erros[perfil] = str(erro)
+			continue
+		try:
+			dados = decodificacao.decodificar(conteudo)
+		except Exception:
+			erros[perfil] = "Erro ao processar o relatório do influenciador {}".format(perfil)
+			continue
+		if isinstance(dados, dict) and dados.get("success") is False:
+			# Perfil inexistente, sem créditos etc.: a API responde 200 com o motivo
+			erros[perfil] = str(ErroIMAI(perfil, dados.get("error") or "relatório indisponível"))
+			continue
+		registro = decodificacao.podar(dados)
+		del dados
+		if ao_baixar:
+			ao_baixar(perfil, conteudo, registro)
+		registros[perfil] = registro
+	ordem = list(dict.fromkeys(perfis))
+	return (
+		{perfil: registros[perfil] for perfil in ordem if perfil in registros},
+		[erros[perfil] for perfil in ordem if perfil in erros],
+	)
@@ -0,0 +1,213 @@
+"""Extração, em uma única passagem, das tabelas planas dos JSON do IMAI."""
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CIDADES = ["influencer", "Cidade", "Estado", "country.code", "weight"]
+COLUNAS_DEMOGRAFIA = ["influencer", "code", "male", "female"]
+COLUNAS_INTERESSES = ["influencer", "name", "weight"]
+COLUNAS_POSTS = ["influencer", "likes", "comments", "shares"]
+COLUNAS_PERFIS = ["fullname", "audience_credibility", "alcance", "seguidores", "posts_likes", "posts_comments"]
+
+
+@dataclass
+class TabelasPerfis:
+	cidades: pd.DataFrame
+	demografia: pd.DataFrame
+	interesses: pd.DataFrame
+	posts: pd.DataFrame
+	perfis: pd.DataFrame
+	# Lista de (seção, influenciador, mensagem) para exibir ao usuário
+	avisos: list = field(default_factory=list)
+
+
+def nome_perfil(nome_arquivo):
+	"""Perfil do influenciador a partir do nome ``json_{perfil}.json``.
+
+	Retorna None para arquivos que não seguem o padrão (ou ``desktop.ini``).
+	"""
+	if "desktop.ini" in nome_arquivo:
+		return None
+	partes = os.path.basename(nome_arquivo).split("_")
+	if len(partes) > 1:  # Verifica se há pelo menos dois elementos após o split
+		return partes[1].replace(".json", "")
+	return None
+
+
+def _numero(valor):
+	# Converte para float, usando NaN para valores ausentes ou inválidos
+	try:
+		return float(valor)
+	except (TypeError, ValueError):
+		return np.nan
+
+
+def _dicionario(valor):
+	# Seções que deveriam ser objetos JSON; qualquer outro valor (null, lista...) conta como ausente
+	return valor if isinstance(valor, dict) else {}
+
+
+def _alcance(user_profile):
+	# Primeira hipótese: avg_reels_plays; segunda: avg_views
+	if "avg_reels_plays" in user_profile:
+		return user_profile["avg_reels_plays"]
+	return user_profile.get("avg_views")
+
+
+def _acrescentar(tabela, influencer, linhas):
+	# Acrescenta as linhas (tuplas na ordem das colunas, sem "influencer") à tabela colunar
+	colunas = list(tabela.keys())
+	tabela[colunas[0]].extend([influencer] * len(linhas))
+	for coluna, valores in zip(colunas[1:], zip(*linhas)):
+		tabela[coluna].extend(valores)
+
+
+def extrair_tabelas(dados_brutos):
+	"""Percorre cada perfil uma única vez e monta todas as tabelas planas.
+
+	As linhas são acumuladas em listas por coluna e cada tabela é construída
+	com um único ``pd.DataFrame``, evitando ``pd.concat`` dentro do loop.
+	Perfis cujo JSON não é um objeto ficam de fora, com um aviso da seção
+	"perfil"; seções com formato inesperado contam como ausentes.
+	"""
+	cidades = {coluna: [] for coluna in COLUNAS_CIDADES}
+	demografia = {coluna: [] for coluna in COLUNAS_DEMOGRAFIA}
+	interesses = {coluna: [] for coluna in COLUNAS_INTERESSES}
+	posts = {coluna: [] for coluna in COLUNAS_POSTS}
+	perfis = {coluna: [] for coluna in COLUNAS_PERFIS}
+	avisos = []
+	influencers = []
+
+	for influencer, dados in dados_brutos.items():
+		# Um JSON cujo topo não é um objeto não tem nenhuma seção aproveitável
+		if not isinstance(dados, dict):
+			avisos.append(("perfil", influencer, f"O arquivo de '{influencer}' não tem o formato esperado e foi ignorado"))
+			continue
+		influencers.append(influencer)
+		audiencia = _dicionario(_dicionario(dados.get("audience_followers")).get("data"))
+
+		# Cidades
+		try:
+			linhas = [
+				(
+					entrada.get("name"),
+					(entrada.get("state") or {}).get("name"),
+					(entrada.get("country") or {}).get("code"),
+					_numero(entrada.get("weight")),
+				)
+				for entrada in audiencia["audience_geo"]["cities"]
+			]
+			_acrescentar(cidades, influencer, linhas)
+		except Exception as e:
+			avisos.append(("cidades", influencer, f"Sem registro de cidades para '{influencer}': {e}"))
+
+		# Gênero e idade
+		try:
+			linhas = [
+				(entrada.get("code"), _numero(entrada.get("male")), _numero(entrada.get("female")))
+				for entrada in audiencia["audience_genders_per_age"]
+			]
+			_acrescentar(demografia, influencer, linhas)
+		except Exception as e:
+			avisos.append(("demografia", influencer, f"Sem registro de gênero e idade para '{influencer}': {e}"))
+
+		# Interesses
+		try:
+			linhas = [
+				(entrada.get("name"), _numero(entrada.get("weight")))
+				for entrada in audiencia["audience_interests"]
+			]
+			_acrescentar(interesses, influencer, linhas)
+		except Exception as e:
+			avisos.append(("interesses", influencer, f"Sem registro de interesses para '{influencer}': {e}"))
+
+		# Posts recentes e dados do perfil
+		user_profile = _dicionario(dados.get("user_profile"))
+		recent_posts = user_profile.get("recent_posts")
+		tem_likes = tem_comments = False
+		linhas = []
+		for post in recent_posts if isinstance(recent_posts, list) else []:
+			stat = _dicionario(_dicionario(post).get("stat"))
+			tem_likes = tem_likes or "likes" in stat
+			tem_comments = tem_comments or "comments" in stat
+			linhas.append((_numero(stat.get("likes")), _numero(stat.get("comments")), _numero(stat.get("shares"))))
+		_acrescentar(posts, influencer, linhas)
+
+		perfis["fullname"].append(user_profile.get("fullname"))
+		perfis["audience_credibility"].append(audiencia.get("audience_credibility"))
+		perfis["alcance"].append(_alcance(user_profile))
+		perfis["seguidores"].append(_numero(user_profile.get("followers")))
+		perfis["posts_likes"].append(tem_likes)
+		perfis["posts_comments"].append(tem_comments)
+
+	# Colunas de valores brutos como object, para preservar int/float/None do JSON
+	df_perfis = pd.DataFrame(
+		{
+			"fullname": pd.Series(perfis["fullname"], dtype=object),
+			"audience_credibility": pd.Series(perfis["audience_credibility"], dtype=object),
+			"alcance": pd.Series(perfis["alcance"], dtype=object),
+			"seguidores": pd.Series(perfis["seguidores"], dtype=float),
+			"posts_likes": pd.Series(perfis["posts_likes"], dtype=bool),
+			"posts_comments": pd.Series(perfis["posts_comments"], dtype=bool),
+		}
+	)
+	df_perfis.index = pd.Index(influencers, name="influencer")
+
+	return TabelasPerfis(
+		cidades=pd.DataFrame(cidades, columns=COLUNAS_CIDADES),
+		demografia=pd.DataFrame(demografia, columns=COLUNAS_DEMOGRAFIA),
+		interesses=pd.DataFrame(interesses, columns=COLUNAS_INTERESSES),
+		posts=pd.DataFrame(posts, columns=COLUNAS_POSTS),
+		perfis=df_perfis,
+		avisos=avisos,
+	)
+
+
+def cidades_brasileiras(tabelas):
+	"""Cidades da audiência localizadas no Brasil."""
+	return tabelas.cidades[tabelas.cidades["country.code"] == "BR"]
+
+
+def filtrar_tabelas(tabelas, influencers):
+	"""Restringe as tabelas aos influenciadores informados, na ordem informada."""
+	influencers = list(influencers)
+	selecionados = set(influencers)
+	return TabelasPerfis(
+		cidades=tabelas.cidades[tabelas.cidades["influencer"].isin(influencers)],
+		demografia=tabelas.demografia[tabelas.demografia["influencer"].isin(influencers)],
+		interesses=tabelas.interesses[tabelas.interesses["influencer"].isin(influencers)],
+		posts=tabelas.posts[tabelas.posts["influencer"].isin(influencers)],
+		perfis=tabelas.perfis.loc[influencers],
+		avisos=[aviso for aviso in tabelas.avisos if aviso[1] in selecionados],
+	)
+
+
+def excluir_perfis(tabelas, influencers):
+	"""Remove das tabelas os influenciadores informados, mantendo a ordem dos demais."""
+	removidos = set(influencers)
+	if not removidos:
+		return tabelas
+	return TabelasPerfis(
+		cidades=tabelas.cidades[~tabelas.cidades["influencer"].isin(removidos)],
+		demografia=tabelas.demografia[~tabelas.demografia["influencer"].isin(removidos)],
+		interesses=tabelas.interesses[~tabelas.interesses["influencer"].isin(removidos)],
+		posts=tabelas.posts[~tabelas.posts["influencer"].isin(removidos)],
+		perfis=tabelas.perfis[~tabelas.perfis.index.isin(removidos)],
+		avisos=[aviso for aviso in tabelas.avisos if aviso[1] not in removidos],
+	)
+
+
+def concatenar_tabelas(lista_tabelas):
+	"""Junta tabelas extraídas separadamente (ex.: em processos diferentes), na ordem da lista."""
+	if not lista_tabelas:
+		return extrair_tabelas({})
+	return TabelasPerfis(
+		cidades=pd.concat([t.cidades for t in lista_tabelas], ignore_index=True),
+		demografia=pd.concat([t.demografia for t in lista_tabelas], ignore_index=True),
+		interesses=pd.concat([t.interesses for t in lista_tabelas], ignore_index=True),
+		posts=pd.concat([t.posts for t in lista_tabelas], ignore_index=True),
+		perfis=pd.concat([t.perfis for t in lista_tabelas]),
+		avisos=[aviso for t in lista_tabelas for aviso in t.avisos],
+	)
@@ -0,0 +1,186 @@
+"""Medição do tempo, da CPU e da memória de cada etapa do processamento.
+
+As etapas são marcadas com ``with instrumentacao.etapa("Classes sociais"):``.
+Fora de :func:`coletar` (diagnóstico desligado), ``etapa`` devolve um contexto
+vazio e a marcação praticamente não custa nada.
+
+Cada etapa medida também é registrada como uma linha JSON no logger
+``analise.instrumentacao``, em nível INFO.
+
+O ``tracemalloc`` é único no processo: ele fica ligado enquanto houver algum
+medidor ativo (uma sessão do app com o diagnóstico ligado, por exemplo), e o
+pico de memória de uma etapa que se sobrepôs à medição de outro medidor não é
+informado, já que cada medidor zera o pico do outro.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_medidor_atual = contextvars.ContextVar("medidor_atual", default=None)
+_CONTEXTO_VAZIO = contextlib.nullcontext()
+_segundos_inicializacao = None
+
+# Medidores com memória ativos no processo e total de ativações, para saber se
+# outro medidor mediu durante uma etapa
+_trava_memoria = threading.Lock()
+_medidores_memoria = 0
+_ativacoes_memoria = 0
+_ligou_tracemalloc = False
+
+
+def _estado_memoria():
+	with _trava_memoria:
+		return _medidores_memoria, _ativacoes_memoria
+
+
+class Medidor:
+	"""Acumula as medições das etapas executadas enquanto está ativo.
+
+	Com ``memoria=True``, o pico de memória de cada etapa é medido com
+	``tracemalloc``, que deixa as alocações mais lentas enquanto estiver ligado.
+	"""
+
+	def __init__(self, memoria=True):
+		self.memoria = memoria
+		self.registros = []
+		# Alguma etapa teve o pico de memória descartado por sobreposição com outro medidor
+		self.memoria_compartilhada = False
+		self._pilha = []
+		self._ativo = False
+
+	@contextlib.contextmanager
+	def etapa(self, nome, linhas=None):
+		if self.memoria:
+			# O pico de uma etapa externa também vale para as internas
+			if self._pilha:
+				self._pilha[-1]["pico"] = max(self._pilha[-1]["pico"], tracemalloc.get_traced_memory()[1])
+			tracemalloc.reset_peak()
+		ativos, ativacoes = _estado_memoria()
+		quadro = {
+			"pico": 0,
+			"memoria_inicial": tracemalloc.get_traced_memory()[0] if self.memoria else 0,
+			"compartilhada": ativos > 1,
+			"ativacoes": ativacoes,
+		}
+		self._pilha.append(quadro)
+		inicio, inicio_cpu = time.perf_counter(), time.process_time()
+		try:
+			yield
+		finally:
+			segundos = time.perf_counter() - inicio
+			segundos_cpu = time.process_time() - inicio_cpu
+			self._pilha.pop()
+			registro = {
+				"etapa": nome,
+				"nivel": len(self._pilha),
+				"segundos": round(segundos, 6),
+				"segundos_cpu": round(segundos_cpu, 6),
+				"linhas": linhas,
+				"pico_mb": None,
+			}
+			if self.memoria:
+				pico = max(quadro["pico"], tracemalloc.get_traced_memory()[1])
+				ativos, ativacoes = _estado_memoria()
+				compartilhada = quadro["compartilhada"] or ativos > 1 or ativacoes != quadro["ativacoes"]
+				if compartilhada:
+					self.memoria_compartilhada = True
+				else:
+					registro["pico_mb"] = round((pico - quadro["memoria_inicial"]) / 1024 ** 2, 3)
+				if self._pilha:
+					self._pilha[-1]["pico"] = max(self._pilha[-1]["pico"], pico)
+					self._pilha[-1]["compartilhada"] = self._pilha[-1]["compartilhada"] or compartilhada
+			self._registrar(registro)
+
+	def registrar(self, nome, segundos, linhas=None):
+		"""Acrescenta uma etapa medida fora do medidor (ex.: as importações, antes de criá-lo)."""
+		self._registrar({
+			"etapa": nome,
+			"nivel": len(self._pilha),
+			"segundos": round(segundos, 6),
+			"segundos_cpu": None,
+			"linhas": linhas,
+			"pico_mb": None,
+		})
+
+	def _registrar(self, registro):
+		self.registros.append(registro)
+		logger.info(json.dumps(registro, ensure_ascii=False))
+
+	def iniciar(self):
+		global _medidores_memoria, _ativacoes_memoria, _ligou_tracemalloc
+		if not self.memoria or self._ativo:
+			return
+		with _trava_memoria:
+			if _medidores_memoria == 0 and not tracemalloc.is_tracing():
+				tracemalloc.start()
+				_ligou_tracemalloc = True
+			_medidores_memoria += 1
+			_ativacoes_memoria += 1
+			self._ativo = True
+
+	def parar(self):
+		# Só o último medidor ativo desliga o tracemalloc, e só se foi ligado aqui
+		global _medidores_memoria, _ligou_tracemalloc
+		if not self._ativo:
+			return
+		with _trava_memoria:
+			_medidores_memoria -= 1
+			self._ativo = False
+			if _medidores_memoria == 0 and _ligou_tracemalloc:
+				tracemalloc.stop()
+				_ligou_tracemalloc = False
+
+	def tabela(self):
+		"""Registros como DataFrame, na ordem em que as etapas terminaram."""
+		return pd.DataFrame(self.registros, columns=["etapa", "nivel", "segundos", "segundos_cpu", "linhas", "pico_mb"])
+
+
+@contextlib.contextmanager
+def coletar(medidor=None):
+	"""Ativa ``medidor`` para as etapas executadas dentro do bloco.
+
+	O mesmo medidor pode ser ativado em vários blocos (ex.: um por aba do app),
+	acumulando os registros de todos eles. Com ``medidor=None`` (diagnóstico
+	desligado), o bloco é executado sem medição.
+	"""
+	if medidor is None:
+		yield None
+		return
+	medidor.iniciar()
+	token = _medidor_atual.set(medidor)
+	try:
+		yield medidor
+	finally:
+		_medidor_atual.reset(token)
+		medidor.parar()
+
+
+def etapa(nome, linhas=None):
+	"""Contexto que mede a etapa ``nome`` no medidor ativo, se houver.
+
+	``linhas`` é o número de linhas processadas, exibido junto da medição.
+	"""
+	medidor = _medidor_atual.get()
+	if medidor is None:
+		return _CONTEXTO_VAZIO
+	return medidor.etapa(nome, linhas)
+
+
+def registrar_inicializacao(segundos):
+	"""Guarda o tempo de importação da primeira execução do app no processo e o registra no log.
+
+	As chamadas seguintes (a cada atualização do app) só retornam o valor guardado.
+	"""
+	global _segundos_inicializacao
+	if _segundos_inicializacao is None:
+		_segundos_inicializacao = segundos
+		logger.info(json.dumps({"etapa": "Inicialização", "segundos": round(segundos, 6)}, ensure_ascii=False))
+	return _segundos_inicializacao
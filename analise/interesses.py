@@ -0,0 +1,96 @@
+"""Interesses da audiência: tradução e seleção dos N principais de cada influenciador.
+
+Os nomes dos interesses são convertidos em códigos, traduzidos uma vez por
+código e os N maiores pesos de cada influenciador são obtidos com uma única
+ordenação sobre (influenciador, peso). Apenas o texto final é formatado.
+"""
+import numpy as np
+import pandas as pd
+
+# Dicionário de tradução dos interesses
+INTERESSES_TRADUCAO = {
+	"Activewear": "Roupas Esportivas",
+	"Friends, Family & Relationships": "Amigos, Família e Relacionamentos",
+	"Clothes, Shoes, Handbags & Accessories": "Moda",
+	"Beauty & Cosmetics": "Beleza e Cosméticos",
+	"Camera & Photography": "Fotografia",
+	"Toys, Children & Baby": "Brinquedos, Crianças e Bebês",
+	"Television & Film": "Televisão e Filmes",
+	"Restaurants, Food & Grocery": "Restaurantes e Gastronomia",
+	"Music": "Música",
+	"Fitness & Yoga": "Fitness e Yoga",
+	"Travel, Tourism & Aviation": "Turismo e Aviação",
+	"Pets": "Animais de Estimação",
+	"Cars & Motorbikes": "Carros e Motocicletas",
+	"Beer, Wine & Spirits": "Cerveja, Vinho e Bebidas Alcoólicas",
+	"Art & Design": "Arte e Design",
+	"Sports": "Esportes",
+	"Electronics & Computers": "Eletrônicos e Computadores",
+	"Healthy Lifestyle": "Estilo de Vida Saudável",
+	"Shopping & Retail": "Compras e Varejo",
+	"Coffee, Tea & Beverages": "Café, Chá e Bebidas Quentes",
+	"Jewellery & Watches": "Joias e Relógios",
+	"Luxury Goods": "Artigos de Luxo",
+	"Home Decor, Furniture & Garden": "Decoração, Móveis e Jardim",
+	"Wedding": "Casamento",
+	"Gaming": "Jogos Digitais",
+	"Business & Careers": "Negócios e Carreiras",
+	"Healthcare & Medicine": "Saúde e Medicina"
+}
+
+
+def top_interesses(df_interesses, n=5):
+	"""N interesses de maior peso de cada influenciador.
+
+	Retorna um DataFrame com as colunas ``influencer``, ``posicao`` (1 a n),
+	``interesse`` (já traduzido) e ``peso`` (em %), ordenado por influenciador
+	e posição. Em caso de empate, vale a ordem original das linhas; pesos
+	ausentes ficam depois de todos os demais, como no ``nlargest``.
+	"""
+	pesos = df_interesses["weight"].to_numpy(dtype=float) * 100
+
+	codigos_influ, influencers = pd.factorize(df_interesses["influencer"], sort=True)
+	codigos_nome, nomes = pd.factorize(df_interesses["name"])
+
+	# Tradução feita uma única vez por nome distinto
+	traduzidos = np.array([INTERESSES_TRADUCAO.get(nome, nome) for nome in nomes] + [np.nan], dtype=object)
+
+	# lexsort é estável: empates mantêm a ordem original das linhas
+	chave_peso = np.where(np.isnan(pesos), np.inf, -pesos)
+	ordem = np.lexsort((chave_peso, codigos_influ))
+	grupos = codigos_influ[ordem]
+	inicio_grupo = np.searchsorted(grupos, grupos, side="left")
+	posicao = np.arange(len(ordem)) - inicio_grupo
+	selecionadas = ordem[posicao < n]
+
+	return pd.DataFrame({
+		"influencer": np.asarray(influencers, dtype=object)[codigos_influ[selecionadas]],
+		"posicao": posicao[posicao < n] + 1,
+		"interesse": traduzidos[codigos_nome[selecionadas]],
+		"peso": pesos[selecionadas],
+	})
+
+
+def formatar_top_interesses(top):
+	"""Texto do resumo para cada influenciador, a partir de :func:`top_interesses`.
+
+	Cada linha tem o formato ``Interesse (12,34%)``, separadas por vírgula e
+	quebra de linha. Retorna uma Series indexada pelo influenciador.
+	"""
+	textos = {}
+
+	influencer_anterior = None
+	linhas = []
+	for influencer, interesse, peso in zip(top["influencer"], top["interesse"], top["peso"]):
+		if influencer != influencer_anterior:
+			if linhas:
+				textos[influencer_anterior] = ",  \n".join(linhas)
+			influencer_anterior = influencer
+			linhas = []
+		# Formata com vírgula decimal
+		peso_formatado = f"{peso:.2f}".replace(".", ",")
+		linhas.append(f"{interesse} ({peso_formatado}%)")
+	if linhas:
+		textos[influencer_anterior] = ",  \n".join(linhas)
+
+	return pd.Series(textos, dtype=object)
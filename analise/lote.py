@@ -0,0 +1,153 @@
+"""Processamento em lote dos JSON do IMAI, em processos paralelos."""
+import contextlib
+import glob
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from analise import decodificacao, ingestao, pontuacao, resumo
+
+# Perfis processados por tarefa: o cálculo é vetorizado, então lotes maiores
+# diluem o custo de comunicação entre processos
+PERFIS_POR_TAREFA = 32
+
+
+def listar_arquivos(entradas):
+	"""Expande diretórios e padrões glob em uma lista ordenada de arquivos ``.json``."""
+	arquivos = []
+	for entrada in entradas:
+		if os.path.isdir(entrada):
+			arquivos.extend(sorted(glob.glob(os.path.join(entrada, "*.json"))))
+		else:
+			arquivos.extend(sorted(glob.glob(entrada)))
+	return arquivos
+
+
+def perfis_por_arquivo(arquivos):
+	"""Associa cada perfil ao seu arquivo; arquivos fora do padrão geram um aviso."""
+	perfis = {}
+	avisos = []
+	for arquivo in arquivos:
+		perfil = ingestao.nome_perfil(arquivo)
+		if perfil is None:
+			avisos.append(f"Aviso: O arquivo '{arquivo}' não segue o padrão esperado.")
+		else:
+			perfis[perfil] = arquivo
+	return perfis, avisos
+
+
+def _carregar_registro(fonte):
+	# A fonte é o caminho do arquivo, o seu conteúdo já lido (upload) ou o
+	# registro já decodificado (relatório baixado da API)
+	if isinstance(fonte, dict):
+		return fonte
+	if isinstance(fonte, (bytes, bytearray)):
+		return decodificacao.carregar_registro(fonte)
+	with open(fonte, "rb") as f:
+		return decodificacao.carregar_registro(f.read())
+
+
+def processar_perfis(fontes, silencioso=False):
+	"""Decodifica os JSON de ``{perfil: caminho, bytes ou registro}`` e calcula as linhas do resumo.
+
+	Retorna ``(tabelas, linhas, erros)``, com as linhas na ordem de ``fontes``;
+	``erros`` lista os arquivos que não puderam ser lidos.
+	"""
+	saida = io.StringIO() if silencioso else None
+	with contextlib.redirect_stdout(saida) if silencioso else contextlib.nullcontext():
+		dados_brutos = {}
+		erros = []
+		for perfil, fonte in fontes.items():
+			try:
+				dados_brutos[perfil] = _carregar_registro(fonte)
+			except Exception:
+				erros.append("Erro ao processar o arquivo para o influenciador {}".format(perfil))
+
+		tabelas = ingestao.extrair_tabelas(dados_brutos)
+		df_resumo = resumo.montar_resumo(tabelas)
+	return tabelas, df_resumo.to_dict("records"), erros
+
+
+def _tarefas(fontes, tamanho):
+	itens = list(fontes.items())
+	for inicio in range(0, len(itens), tamanho):
+		yield dict(itens[inicio:inicio + tamanho])
+
+
+def _preparar_referencias():
+	# Com forkserver ou spawn, cada processo carrega as referências uma única vez;
+	# com fork, elas são herdadas do processo pai e esta função não é usada
+	pontuacao.matrizes_referencia()
+
+
+def _contexto_processos(metodo=None):
+	# Sem ``metodo``, forkserver (ou spawn): os processos não herdam as travas
+	# das outras threads do processo pai, como as do servidor do Streamlit
+	metodos = multiprocessing.get_all_start_methods()
+	if metodo not in metodos:
+		metodo = "forkserver" if "forkserver" in metodos else "spawn"
+	return multiprocessing.get_context(metodo)
+
+
+def processar_em_paralelo(fontes, processos=None, progresso=None, silencioso=False, ao_concluir=None, metodo=None):
+	"""Processa ``{perfil: caminho, bytes ou registro}`` distribuindo os perfis entre processos.
+
+	``metodo`` é o método de início dos processos. O padrão (forkserver ou
+	spawn) é seguro em processos com várias threads, como o app, e cada
+	processo carrega as tabelas de referência uma vez ao iniciar. Com
+	``"fork"``, usado pela linha de comando, as tabelas carregadas no processo
+	pai são herdadas sem serialização. ``progresso``, se informado, é chamado
+	com ``(perfis concluídos, total)`` a cada lote concluído. ``ao_concluir``,
+	se informado, recebe ``(tabelas, linhas)`` de cada lote assim que ele e
+	todos os anteriores terminam, ou seja, na ordem de ``fontes`` (ex.: para
+	gravar o resumo aos poucos).
+
+	Retorna ``(tabelas, df_resumo, erros)``, sempre na ordem de ``fontes``.
+	"""
+	_preparar_referencias()
+
+	tarefas = list(_tarefas(fontes, PERFIS_POR_TAREFA))
+	resultados = [None] * len(tarefas)
+	concluidos = 0
+	entregues = 0
+
+	def entregar():
+		nonlocal entregues
+		while entregues < len(resultados) and resultados[entregues] is not None:
+			if ao_concluir:
+				tabelas_tarefa, linhas_tarefa, _ = resultados[entregues]
+				ao_concluir(tabelas_tarefa, linhas_tarefa)
+			entregues += 1
+
+	if processos == 1 or len(tarefas) <= 1:
+		for i, tarefa in enumerate(tarefas):
+			resultados[i] = processar_perfis(tarefa, silencioso)
+			concluidos += len(tarefa)
+			if progresso:
+				progresso(concluidos, len(fontes))
+			entregar()
+	else:
+		# Com fork não há inicializador: as tabelas já estão no processo filho
+		contexto = _contexto_processos(metodo)
+		with ProcessPoolExecutor(
+			max_workers=processos,
+			mp_context=contexto,
+			initializer=None if contexto.get_start_method() == "fork" else _preparar_referencias,
+		) as executor:
+			futuros = {executor.submit(processar_perfis, tarefa, silencioso): i for i, tarefa in enumerate(tarefas)}
+			for futuro in as_completed(futuros):
+				i = futuros[futuro]
+				resultados[i] = futuro.result()
+				concluidos += len(tarefas[i])
+				if progresso:
+					progresso(concluidos, len(fontes))
+				entregar()
+
+	# Juntar na ordem das tarefas, independente da ordem de conclusão
+	tabelas = ingestao.concatenar_tabelas([tabelas_tarefa for tabelas_tarefa, _, _ in resultados])
+	linhas = [linha for _, linhas_tarefa, _ in resultados for linha in linhas_tarefa]
+	erros = [erro for _, _, erros_tarefa in resultados for erro in erros_tarefa]
+	return tabelas, pd.DataFrame(linhas, columns=resumo.COLUNAS_RESUMO), erros
@@ -0,0 +1,224 @@
+"""Cache em disco das miniaturas dos posts, com descarte LRU por tamanho.
+
+As imagens do IMAI são baixadas uma única vez, reduzidas para a largura exibida
+nos cards e gravadas em JPEG em uma pasta local. Ao voltar a um perfil, os
+cards usam os arquivos já reduzidos em vez de baixar de novo as imagens em
+tamanho original. Só são baixadas imagens http(s) das CDNs do Instagram e do
+IMAI, lidas em partes até um limite de bytes.
+"""
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image
+
+PASTA_PADRAO = os.path.join(tempfile.gettempdir(), "vis_influ_miniaturas")
+LARGURA_MINIATURA = 360
+QUALIDADE_JPEG = 80
+TEMPO_LIMITE = 5
+DOWNLOADS_SIMULTANEOS = 6
+# Domínios (e subdomínios) de onde as imagens dos posts podem ser baixadas; as
+# demais URLs ficam com o link original no card
+DOMINIOS_PERMITIDOS = ("cdninstagram.com", "fbcdn.net", "imai.co")
+MAX_BYTES_IMAGEM = 8 * 1024 * 1024
+# Imagens dos posts têm por volta de 1 megapixel; acima disso nem são decodificadas
+MAX_PIXELS_IMAGEM = 25_000_000
+TAMANHO_PARTE = 64 * 1024
+# Segundos até uma URL que falhou ser tentada de novo
+ESPERA_FALHA = 300
+
+
+def reduzir_imagem(conteudo, largura=LARGURA_MINIATURA, qualidade=QUALIDADE_JPEG):
+	"""JPEG da imagem em ``conteudo`` com no máximo ``largura`` pixels de lado."""
+	with Image.open(io.BytesIO(conteudo)) as imagem:
+		if imagem.width * imagem.height > MAX_PIXELS_IMAGEM:
+			raise ValueError("Imagem com {}x{} pixels".format(imagem.width, imagem.height))
+		imagem.thumbnail((largura, largura))
+		saida = io.BytesIO()
+		imagem.convert("RGB").save(saida, format="JPEG", quality=qualidade, optimize=True)
+	return saida.getvalue()
+
+
+def url_permitida(url, dominios=DOMINIOS_PERMITIDOS):
+	"""Se ``url`` é http(s) e aponta para um dos ``dominios`` ou um subdomínio deles."""
+	try:
+		partes = urlsplit(url)
+		host = (partes.hostname or "").rstrip(".").lower()
+	except ValueError:
+		return False
+	return partes.scheme in ("http", "https") and any(host == dominio or host.endswith("." + dominio) for dominio in dominios)
+
+
+def baixar(url, max_bytes=MAX_BYTES_IMAGEM):
+	"""Conteúdo de ``url``, lido em partes; falha acima de ``max_bytes`` ou em redirecionamentos."""
+	# Redirecionamentos não são seguidos: o destino não passou por url_permitida
+	with requests.get(url, timeout=TEMPO_LIMITE, stream=True, allow_redirects=False) as resposta:
+		resposta.raise_for_status()
+		if resposta.status_code != 200:
+			raise ValueError("Resposta {} para {}".format(resposta.status_code, url))
+		if int(resposta.headers.get("Content-Length") or 0) > max_bytes:
+			raise ValueError("Imagem com mais de {} bytes".format(max_bytes))
+		partes = []
+		total = 0
+		for parte in resposta.iter_content(TAMANHO_PARTE):
+			total += len(parte)
+			if total > max_bytes:
+				raise ValueError("Imagem com mais de {} bytes".format(max_bytes))
+			partes.append(parte)
+	return b"".join(partes)
+
+
+def uri_dados(conteudo):
+	"""``data:`` URI de um JPEG, para uso direto em ``<img src=...>``."""
+	return "data:image/jpeg;base64," + base64.b64encode(conteudo).decode("ascii")
+
+
+class CacheMiniaturas:
+	"""Miniaturas reduzidas gravadas em ``pasta``, indexadas pela URL original.
+
+	Quando o total em disco passa de ``max_bytes``, os arquivos acessados há
+	mais tempo são removidos. Apenas URLs aceitas por :func:`url_permitida`
+	com ``dominios`` são baixadas, e uma URL que falhou só é tentada de novo
+	depois de ``espera_falha`` segundos.
+	"""
+
+	def __init__(
+		self,
+		pasta=PASTA_PADRAO,
+		max_bytes=64 * 1024 * 1024,
+		largura=LARGURA_MINIATURA,
+		dominios=DOMINIOS_PERMITIDOS,
+		espera_falha=ESPERA_FALHA,
+	):
+		self.pasta = pasta
+		self.max_bytes = max_bytes
+		self.largura = largura
+		self.dominios = tuple(dominios)
+		self.espera_falha = espera_falha
+		os.makedirs(pasta, exist_ok=True)
+		self._trava = threading.Lock()
+		# {url: instante da falha}, da mais antiga para a mais recente
+		self._falhas = OrderedDict()
+		self._bytes = 0
+		# {nome do arquivo: tamanho}, do menos para o mais recentemente usado
+		self._arquivos = OrderedDict()
+		entradas = []
+		for nome in os.listdir(pasta):
+			if nome.endswith(".jpg"):
+				estado = os.stat(os.path.join(pasta, nome))
+				entradas.append((estado.st_mtime, nome, estado.st_size))
+		for _, nome, tamanho in sorted(entradas):
+			self._arquivos[nome] = tamanho
+			self._bytes += tamanho
+		with self._trava:
+			self._descartar()
+
+	@property
+	def bytes(self):
+		return self._bytes
+
+	def __len__(self):
+		return len(self._arquivos)
+
+	def _nome(self, url):
+		return hashlib.sha256("{}|{}".format(self.largura, url).encode("utf-8")).hexdigest() + ".jpg"
+
+	def _descartar(self):
+		while self._arquivos and self._bytes > self.max_bytes:
+			nome, tamanho = self._arquivos.popitem(last=False)
+			self._bytes -= tamanho
+			try:
+				os.remove(os.path.join(self.pasta, nome))
+			except OSError:
+				pass
+
+	def _ler(self, nome):
+		with self._trava:
+			if nome not in self._arquivos:
+				return None
+			self._arquivos.move_to_end(nome)
+		caminho = os.path.join(self.pasta, nome)
+		try:
+			with open(caminho, "rb") as f:
+				conteudo = f.read()
+			# O horário de modificação guarda a ordem de uso entre sessões
+			os.utime(caminho)
+		except OSError:
+			with self._trava:
+				self._bytes -= self._arquivos.pop(nome, 0)
+			return None
+		return conteudo
+
+	def _gravar(self, nome, conteudo):
+		caminho = os.path.join(self.pasta, nome)
+		descritor, temporario = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+		with os.fdopen(descritor, "wb") as f:
+			f.write(conteudo)
+		os.replace(temporario, caminho)
+		with self._trava:
+			self._bytes -= self._arquivos.pop(nome, 0)
+			self._arquivos[nome] = len(conteudo)
+			self._bytes += len(conteudo)
+			self._descartar()
+
+	def _falhou_ha_pouco(self, url):
+		with self._trava:
+			instante = self._falhas.get(url)
+			if instante is None:
+				return False
+			if time.monotonic() - instante < self.espera_falha:
+				return True
+			del self._falhas[url]
+			return False
+
+	def _registrar_falha(self, url):
+		agora = time.monotonic()
+		with self._trava:
+			self._falhas.pop(url, None)
+			self._falhas[url] = agora
+			# Em ordem de registro, as falhas já expiradas estão no início
+			while self._falhas and agora - next(iter(self._falhas.values())) >= self.espera_falha:
+				self._falhas.popitem(last=False)
+
+	def obter(self, url):
+		"""JPEG reduzido da imagem em ``url``, ou None se ela não puder ser obtida."""
+		if not url or not url_permitida(url, self.dominios) or self._falhou_ha_pouco(url):
+			return None
+		nome = self._nome(url)
+		conteudo = self._ler(nome)
+		if conteudo is not None:
+			return conteudo
+		try:
+			conteudo = reduzir_imagem(baixar(url), self.largura)
+		except Exception:
+			self._registrar_falha(url)
+			return None
+		self._gravar(nome, conteudo)
+		return conteudo
+
+	def obter_varias(self, urls):
+		"""``{url: JPEG ou None}``, baixando em paralelo as que não estão no cache."""
+		urls = list(dict.fromkeys(url for url in urls if url))
+		if not urls:
+			return {}
+		with ThreadPoolExecutor(max_workers=min(DOWNLOADS_SIMULTANEOS, len(urls))) as executor:
+			return dict(zip(urls, executor.map(self.obter, urls)))
+
+	def limpar(self):
+		with self._trava:
+			for nome in self._arquivos:
+				try:
+					os.remove(os.path.join(self.pasta, nome))
+				except OSError:
+					pass
+			self._arquivos.clear()
+			self._bytes = 0
+			self._falhas.clear()
@@ -0,0 +1,166 @@
+"""Busca dos elencos de influenciadores que melhor atendem a um público-alvo.
+
+O alvo combina métricas de cada perfil (participação das classes sociais e
+das faixas de escolaridade, score da audiência, peso de interesses) e a
+pontuação de um elenco é a média dessa combinação entre os membros, ponderada
+pelo número de seguidores, como as métricas da aba Campanha. As métricas de
+todos os perfis ficam em uma matriz densa (:class:`MatrizMetricas`), montada a
+partir dos :class:`campanha.VetoresAudiencia`, sem pandas na busca.
+
+Para um número fixo de perfis, o elenco de maior média ponderada é obtido de
+forma exata pelo método de Dinkelbach: com a média atual ``λ``, escolhem-se
+os perfis de maior ``seguidores × (pontuação − λ)`` (seleção parcial, sem
+ordenar tudo) e repete-se até ``λ`` parar de crescer, em poucas iterações.
+As alternativas listadas em seguida são as melhores trocas de um membro por
+um perfil de fora, todas avaliadas de uma vez.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from analise import pontuacao
+
+COLUNA_SCORE = "Score da audiência"
+PREFIXO_INTERESSE = "Interesse: "
+MAX_ITERACOES = 100
+N_ELENCOS = 5
+
+
+@dataclass(frozen=True)
+class MatrizMetricas:
+	influencers: pd.Index
+	colunas: pd.Index
+	# (influenciadores, métricas), NaN onde o perfil não tem o dado
+	valores: np.ndarray
+	seguidores: np.ndarray
+
+	@classmethod
+	def construir(cls, vetores):
+		"""Matriz dos perfis de ``vetores``: classes, escolaridade, score da audiência e interesses."""
+		valores = np.column_stack([
+			np.where(vetores.com_classes[:, None], vetores.classes, np.nan),
+			np.where(vetores.com_educacao[:, None], vetores.educacao, np.nan),
+			vetores.credibilidade,
+			np.where(vetores.com_interesses[:, None], vetores.pesos_interesses, np.nan),
+		])
+		colunas = pd.Index(
+			pontuacao.COLUNAS_CLASSES + pontuacao.COLUNAS_EDUCACAO + [COLUNA_SCORE]
+			+ [PREFIXO_INTERESSE + nome for nome in vetores.interesses]
+		)
+		return cls(vetores.influencers, colunas, valores, vetores.seguidores)
+
+
+@dataclass(frozen=True)
+class Alvo:
+	"""Público-alvo: ``{métrica: peso}`` (colunas de :class:`MatrizMetricas`) e o tamanho do elenco.
+
+	``obrigatorios`` entram em todos os elencos (mesmo que passem de
+	``n_perfis``) e ``excluidos`` em nenhum. Sem ``ponderar_por_seguidores``,
+	todos os perfis pesam igual na média.
+	"""
+	pesos: dict
+	n_perfis: int
+	obrigatorios: tuple = ()
+	excluidos: tuple = ()
+	ponderar_por_seguidores: bool = True
+
+
+def _posicoes(influencers, perfis):
+	posicoes = influencers.get_indexer(list(perfis))
+	if (posicoes < 0).any():
+		raise KeyError("Perfis fora do lote: {}".format(", ".join(str(p) for p, i in zip(perfis, posicoes) if i < 0)))
+	return posicoes
+
+
+def _razao(pesos, pontos, membros):
+	return (pesos[membros] * pontos[membros]).sum() / pesos[membros].sum()
+
+
+def _maiores(valores, k):
+	# Posições dos k maiores valores, sem ordenar o restante
+	if k >= len(valores):
+		return np.arange(len(valores))
+	return np.argpartition(-valores, k - 1)[:k]
+
+
+def _melhor_elenco(pesos, pontos, obrigatorios, candidatos, n_livres):
+	# Dinkelbach: o termo dos obrigatórios é constante, então a melhor escolha
+	# dos demais para um dado λ são os n_livres maiores ganhos
+	escolhidos = candidatos[_maiores(pontos[candidatos], n_livres)]
+	if n_livres >= len(candidatos):
+		return escolhidos
+	media = _razao(pesos, pontos, np.concatenate([obrigatorios, escolhidos]))
+	for _ in range(MAX_ITERACOES):
+		ganho = pesos[candidatos] * (pontos[candidatos] - media)
+		novos = candidatos[_maiores(ganho, n_livres)]
+		nova_media = _razao(pesos, pontos, np.concatenate([obrigatorios, novos]))
+		if nova_media <= media + 1e-12:
+			break
+		escolhidos, media = novos, nova_media
+	return escolhidos
+
+
+def _trocas(pesos, pontos, membros, livres, fora, n):
+	# Média de cada elenco com um membro livre trocado por um perfil de fora
+	numerador = (pesos[membros] * pontos[membros]).sum()
+	denominador = pesos[membros].sum()
+	medias = (
+		(numerador - (pesos[livres] * pontos[livres])[:, None] + (pesos[fora] * pontos[fora])[None, :])
+		/ (denominador - pesos[livres][:, None] + pesos[fora][None, :])
+	)
+	melhores = _maiores(medias.ravel(), n)
+	melhores = melhores[np.argsort(-medias.ravel()[melhores], kind="stable")]
+	return [(livres[k // len(fora)], fora[k % len(fora)]) for k in melhores]
+
+
+def otimizar(matriz, alvo, n_elencos=N_ELENCOS):
+	"""Elencos de ``alvo.n_perfis`` perfis com a maior pontuação, do melhor para o pior.
+
+	Perfis sem algum dado usado no alvo (ou, com ponderação, sem número de
+	seguidores) ficam de fora da busca. O primeiro elenco é o ótimo; os demais
+	são as melhores variações dele com uma troca.
+
+	Retorna um DataFrame com ``Perfis`` (tupla, do maior para o menor
+	contribuinte), ``Pontuação``, ``Seguidores`` e a média de cada métrica do
+	alvo. Levanta ValueError se um perfil obrigatório não tiver os dados.
+	"""
+	metricas = [metrica for metrica, peso in alvo.pesos.items() if peso]
+	if not metricas:
+		raise ValueError("O alvo não tem métricas com peso.")
+	colunas = _posicoes(matriz.colunas, metricas)
+	valores = matriz.valores[:, colunas]
+	pontos = valores @ np.array([alvo.pesos[metrica] for metrica in metricas], dtype=float)
+	pesos = matriz.seguidores if alvo.ponderar_por_seguidores else np.ones(len(matriz.influencers))
+
+	validos = np.isfinite(pontos) & (pesos > 0)
+	obrigatorios = np.unique(_posicoes(matriz.influencers, alvo.obrigatorios))
+	if not validos[obrigatorios].all():
+		raise ValueError("Perfis obrigatórios sem os dados do alvo: {}".format(
+			", ".join(matriz.influencers[obrigatorios[~validos[obrigatorios]]])
+		))
+	validos[_posicoes(matriz.influencers, alvo.excluidos)] = False
+	validos[obrigatorios] = False
+	candidatos = np.flatnonzero(validos)
+	n_livres = max(0, min(alvo.n_perfis - len(obrigatorios), len(candidatos)))
+
+	escolhidos = _melhor_elenco(pesos, pontos, obrigatorios, candidatos, n_livres) if n_livres else candidatos[:0]
+	elencos = [np.concatenate([obrigatorios, escolhidos])]
+	fora = np.setdiff1d(candidatos, escolhidos)
+	if n_elencos > 1 and len(escolhidos) and len(fora):
+		for saida, entrada in _trocas(pesos, pontos, elencos[0], escolhidos, fora, n_elencos - 1):
+			elencos.append(np.concatenate([obrigatorios, escolhidos[escolhidos != saida], [entrada]]))
+	elencos = [elenco for elenco in elencos if len(elenco)]
+
+	linhas = []
+	for elenco in elencos:
+		ordem = elenco[np.argsort(-(pesos[elenco] * pontos[elenco]), kind="stable")]
+		peso_total = pesos[elenco].sum()
+		linha = {
+			"Perfis": tuple(matriz.influencers[ordem]),
+			"Pontuação": _razao(pesos, pontos, elenco),
+			"Seguidores": matriz.seguidores[elenco].sum(),
+		}
+		linha.update(zip(metricas, (pesos[elenco] @ valores[elenco]) / peso_total))
+		linhas.append(linha)
+	return pd.DataFrame(linhas, columns=["Perfis", "Pontuação", "Seguidores"] + metricas)
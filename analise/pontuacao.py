@@ -0,0 +1,355 @@
+"""Cálculo vetorizado das classes sociais e da escolaridade da audiência.
+
+As cidades da audiência são convertidas nas chaves inteiras do
+:class:`cidades.IndiceCidades` das tabelas de referência, e as métricas de
+todos os influenciadores são obtidas com operações sobre arrays (matriz
+esparsa influenciador × cidade contra as matrizes de referência), sem merges
+de DataFrames.
+"""
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import norm
+
+from analise import cidades, referencias
+
+COLUNAS_CLASSES = ["Classes D e E", "Classe C", "Classe B", "Classe A"]
+COLUNAS_EDUCACAO = ["< 5 anos", "5-9 anos", "9-12 anos", "> 12 anos"]
+SEXOS = ["female", "male"]
+
+# Parâmetros da distribuição normal dos anos de estudo
+DESVIO_PADRAO_EDUCACAO = 3
+CORTES_EDUCACAO = (5, 9, 12)
+
+
+@dataclass(frozen=True)
+class MatrizesReferencia:
+	# As linhas das matrizes são as chaves do índice de cidades
+	indice_cidades: cidades.IndiceCidades
+	# (cidades, 4), colunas na ordem de COLUNAS_CLASSES, em %
+	classes: np.ndarray
+	# Cidades presentes na planilha de classes sociais
+	com_classes: np.ndarray
+	grupos_etarios: pd.Index
+	# (cidades, grupos etários, sexo), sexo na ordem de SEXOS, em anos de estudo
+	educacao: np.ndarray
+	# Cidades presentes na planilha de educação
+	com_educacao: np.ndarray
+
+
+def _media_por_chave(chaves, valores, n_chaves):
+	# Média das linhas de cada chave: variantes do mesmo nome (ex.: "Vitoria" e
+	# "Vitória") ou linhas repetidas na planilha contam uma única vez
+	soma = np.zeros((n_chaves,) + valores.shape[1:])
+	np.add.at(soma, chaves, valores)
+	contagem = np.bincount(chaves, minlength=n_chaves)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		media = soma / contagem.reshape((-1,) + (1,) * (valores.ndim - 1))
+	return np.nan_to_num(media), contagem > 0
+
+
+@functools.lru_cache(maxsize=1)
+def _montar_matrizes(versao):
+	classes = referencias.classes_por_cidade()
+	educacao = referencias.educacao_por_cidade().reset_index()
+
+	# Na planilha de classes, "Cidade e Estado" tem a grafia oficial de nomes
+	# como "Vitoria", que passam a ser variantes da mesma cidade
+	indice = cidades.IndiceCidades.construir(
+		list(educacao["Cidade"].unique()) + list(classes["Cidade e Estado"]),
+		variantes=zip(classes.index, classes["Cidade e Estado"]),
+	)
+	n_chaves = len(indice)
+	matriz_classes, com_classes = _media_por_chave(
+		indice.chaves(classes.index), classes[COLUNAS_CLASSES].to_numpy(dtype=float), n_chaves
+	)
+
+	codigos_grupo, grupos_etarios = pd.factorize(educacao["Grupo Etário"], sort=True)
+	chaves_educacao = indice.chaves(educacao["Cidade"]) * len(grupos_etarios) + codigos_grupo
+	tensor, presentes = _media_por_chave(
+		chaves_educacao, educacao[SEXOS].to_numpy(dtype=float), n_chaves * len(grupos_etarios)
+	)
+
+	return MatrizesReferencia(
+		indice_cidades=indice,
+		classes=matriz_classes,
+		com_classes=com_classes,
+		grupos_etarios=pd.Index(grupos_etarios),
+		educacao=tensor.reshape(n_chaves, len(grupos_etarios), len(SEXOS)),
+		com_educacao=presentes.reshape(n_chaves, len(grupos_etarios)).any(axis=1),
+	)
+
+
+def matrizes_referencia():
+	"""Matrizes de referência da versão atual das planilhas, montadas uma vez por processo."""
+	return _montar_matrizes(referencias.versao())
+
+
+def codificar_cidades(nomes, indice):
+	"""Chaves de ``nomes`` no :class:`cidades.IndiceCidades`; -1 para cidades sem correspondência."""
+	return indice.chaves(nomes)
+
+
+def _presentes(chaves, mascara):
+	# Linhas cuja chave existe e está marcada em ``mascara``
+	return (chaves >= 0) & mascara[np.maximum(chaves, 0)]
+
+
+def _pesos_por_linha(df_cidades, indice):
+	# Peso normalizado de cada linha de cidade (soma do weight da cidade no
+	# influenciador dividida pela soma total do influenciador) e a chave da
+	# cidade de referência, procurada uma vez por nome distinto
+	codigos_influ, influencers = pd.factorize(df_cidades["influencer"])
+	codigos_cidade, nomes = pd.factorize(df_cidades["Cidade"])
+	weight = np.nan_to_num(df_cidades["weight"].to_numpy(dtype=float))
+
+	n_cidades = codigos_cidade.max() + 2 if len(codigos_cidade) else 1
+	pares, codigos_par = np.unique(codigos_influ * n_cidades + (codigos_cidade + 1), return_inverse=True)
+	soma_par = np.bincount(codigos_par, weights=weight, minlength=len(pares))
+	soma_influ = np.bincount(codigos_influ, weights=weight, minlength=len(influencers))
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		peso = soma_par[codigos_par] / soma_influ[codigos_influ]
+	# Cidades sem nome ficam de fora, como no groupby original
+	peso[(codigos_cidade < 0) | ~np.isfinite(peso)] = 0.0
+
+	chaves = codificar_cidades(nomes, indice)
+	chaves = np.where(codigos_cidade >= 0, chaves[codigos_cidade] if len(chaves) else -1, -1)
+	return codigos_influ, influencers, peso, chaves
+
+
+def pontuar_classes(df_cidades, matrizes=None):
+	"""Distribuição de classes sociais (%) de cada influenciador.
+
+	Retorna um DataFrame indexado por ``influencer`` com as colunas de
+	``COLUNAS_CLASSES``. Influenciadores sem nenhuma cidade na tabela de
+	referência ficam de fora.
+	"""
+	matrizes = matrizes or matrizes_referencia()
+	if df_cidades.empty:
+		return pd.DataFrame(columns=COLUNAS_CLASSES, index=pd.Index([], name="influencer"), dtype=float)
+
+	codigos_influ, influencers, peso, chaves = _pesos_por_linha(df_cidades, matrizes.indice_cidades)
+	encontradas = _presentes(chaves, matrizes.com_classes)
+
+	# Matriz esparsa influenciador × cidade de referência
+	pesos = sparse.csr_matrix(
+		(peso[encontradas], (codigos_influ[encontradas], chaves[encontradas])),
+		shape=(len(influencers), len(matrizes.indice_cidades)),
+	)
+	total = np.asarray(pesos.sum(axis=1)).ravel()
+	validos = total > 0
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		distribuicao = (pesos @ matrizes.classes) / total[:, None]
+
+	return pd.DataFrame(
+		distribuicao[validos],
+		columns=COLUNAS_CLASSES,
+		index=pd.Index(np.asarray(influencers)[validos], name="influencer"),
+	).sort_index()
+
+
+def _pesos_demograficos(df_demografia, influencers, matrizes):
+	# Tensor (influenciador, grupo etário, sexo) com as proporções da audiência e
+	# máscara dos influenciadores que têm alguma linha de gênero e idade
+	codigos_influ = pd.Index(influencers).get_indexer(df_demografia["influencer"])
+	codigos_grupo = matrizes.grupos_etarios.get_indexer(df_demografia["code"])
+	validos = (codigos_influ >= 0) & (codigos_grupo >= 0)
+	tensor = np.zeros((len(influencers), len(matrizes.grupos_etarios), len(SEXOS)))
+	for s, sexo in enumerate(SEXOS):
+		valores = np.nan_to_num(df_demografia[sexo].to_numpy(dtype=float))
+		np.add.at(tensor, (codigos_influ[validos], codigos_grupo[validos], s), valores[validos])
+	presentes = np.bincount(codigos_influ[codigos_influ >= 0], minlength=len(influencers)) > 0
+	return tensor, presentes
+
+
+def _componentes_educacao(df_cidades, df_demografia, matrizes):
+	# Pesos das cidades de referência (matriz esparsa influenciador × cidade;
+	# cidades sem correspondência ficam de fora, como no merge "left" original)
+	# e tensor (influenciador, grupo etário, sexo) da demografia
+	codigos_influ, influencers, peso, chaves = _pesos_por_linha(df_cidades, matrizes.indice_cidades)
+	encontradas = _presentes(chaves, matrizes.com_educacao)
+	pesos = sparse.csr_matrix(
+		(peso[encontradas], (codigos_influ[encontradas], chaves[encontradas])),
+		shape=(len(influencers), len(matrizes.indice_cidades)),
+	)
+	demografia, com_demografia = _pesos_demograficos(df_demografia, influencers, matrizes)
+	return influencers, pesos, demografia, com_demografia
+
+
+def anos_de_estudo(df_cidades, df_demografia, matrizes=None):
+	"""Média esperada de anos de estudo da audiência de cada influenciador.
+
+	O cálculo é fatorado: os pesos das cidades (matriz esparsa influenciador ×
+	cidade) são contraídos com o tensor cidade × (grupo etário, sexo) da
+	referência, e o resultado é combinado com os pesos de idade e sexo de cada
+	influenciador. A memória cresce com influenciadores × (cidades + grupos
+	etários), sem montar o produto cidades × grupos etários de cada perfil.
+
+	Considera apenas influenciadores com cidades e com dados de gênero e idade.
+	"""
+	matrizes = matrizes or matrizes_referencia()
+	if df_cidades.empty or df_demografia.empty:
+		return pd.Series([], index=pd.Index([], name="influencer"), dtype=float)
+
+	influencers, pesos, demografia, com_demografia = _componentes_educacao(df_cidades, df_demografia, matrizes)
+	n_cidades, n_grupos, n_sexos = matrizes.educacao.shape
+	educacao_influ = pesos @ matrizes.educacao.reshape(n_cidades, n_grupos * n_sexos)
+	anos = (np.asarray(educacao_influ) * demografia.reshape(len(influencers), n_grupos * n_sexos)).sum(axis=1)
+	return pd.Series(
+		anos[com_demografia],
+		index=pd.Index(np.asarray(influencers)[com_demografia], name="influencer"),
+	).sort_index()
+
+
+def _validar_parametros(desvio_padrao, cortes):
+	cortes = np.asarray(cortes, dtype=float)
+	if not desvio_padrao > 0:
+		raise ValueError("O desvio padrão deve ser positivo.")
+	if cortes.ndim != 1 or not len(cortes) or (np.diff(cortes) <= 0).any():
+		raise ValueError("Os cortes devem ser uma sequência crescente de anos de estudo.")
+	return cortes
+
+
+def faixas_educacao(cortes=CORTES_EDUCACAO):
+	"""Nomes das faixas de escolaridade definidas por ``cortes`` (com os padrões, ``COLUNAS_EDUCACAO``)."""
+	rotulos = ["{:g}".format(corte) for corte in cortes]
+	return (
+		["< {} anos".format(rotulos[0])]
+		+ ["{}-{} anos".format(inicio, fim) for inicio, fim in zip(rotulos, rotulos[1:])]
+		+ ["> {} anos".format(rotulos[-1])]
+	)
+
+
+def probabilidades_educacao(medias, desvio_padrao=DESVIO_PADRAO_EDUCACAO, cortes=CORTES_EDUCACAO):
+	"""Probabilidade de cada faixa de escolaridade, com uma única chamada a ``norm.cdf``.
+
+	Retorna um array (influenciadores, len(cortes) + 1).
+	"""
+	cortes = _validar_parametros(desvio_padrao, cortes)
+	medias = np.asarray(medias, dtype=float)
+	acumulada = norm.cdf(cortes[None, :], medias[:, None], desvio_padrao)
+	n = len(medias)
+	return np.diff(np.hstack([np.zeros((n, 1)), acumulada, np.ones((n, 1))]), axis=1)
+
+
+@dataclass(frozen=True)
+class ModeloEducacao:
+	"""Componentes da escolaridade de um lote de perfis, para avaliar o modelo com outros parâmetros.
+
+	A parte cara (pesos das cidades, demografia e média de anos de estudo de
+	cada influenciador) é montada uma vez em :meth:`construir`; cada chamada
+	de :meth:`probabilidades` é só uma avaliação vetorizada da normal.
+	"""
+	influencers: pd.Index
+	# (influenciadores,) média de anos de estudo, como em anos_de_estudo
+	medias: np.ndarray
+	# Matriz esparsa influenciador × cidade de referência e tensor
+	# (influenciador, grupo etário × sexo), só dos influenciadores de ``influencers``
+	pesos: sparse.csr_matrix
+	demografia: np.ndarray
+	matrizes: MatrizesReferencia
+
+	@classmethod
+	def construir(cls, df_cidades, df_demografia, matrizes=None):
+		matrizes = matrizes or matrizes_referencia()
+		n_cidades, n_grupos, n_sexos = matrizes.educacao.shape
+		if df_cidades.empty or df_demografia.empty:
+			return cls(
+				pd.Index([], name="influencer"), np.zeros(0), sparse.csr_matrix((0, n_cidades)),
+				np.zeros((0, n_grupos * n_sexos)), matrizes,
+			)
+		influencers, pesos, demografia, com_demografia = _componentes_educacao(df_cidades, df_demografia, matrizes)
+		ordem = np.flatnonzero(com_demografia)
+		ordem = ordem[np.argsort(np.asarray(influencers, dtype=object)[ordem], kind="stable")]
+		pesos = pesos[ordem]
+		demografia = demografia[ordem].reshape(len(ordem), n_grupos * n_sexos)
+		medias = (np.asarray(pesos @ matrizes.educacao.reshape(n_cidades, n_grupos * n_sexos)) * demografia).sum(axis=1)
+		return cls(pd.Index(np.asarray(influencers)[ordem], name="influencer"), medias, pesos, demografia, matrizes)
+
+	def _acumulada_mistura(self, desvio_padrao, cortes):
+		# Cada célula (cidade, grupo etário, sexo) da referência é uma normal com a
+		# sua média e ``desvio_padrao``; a audiência é a mistura dessas normais com
+		# os pesos de cidade × demografia. Como a mistura é linear, as CDFs das
+		# células são contraídas com os pesos da mesma forma que as médias
+		n_cidades, n_grupos, n_sexos = self.matrizes.educacao.shape
+		celulas = norm.cdf(cortes[None, None, :], self.matrizes.educacao.reshape(n_cidades, -1, 1), desvio_padrao)
+		por_influenciador = np.asarray(self.pesos @ celulas.reshape(n_cidades, -1)).reshape(len(self.influencers), n_grupos * n_sexos, len(cortes))
+		acumulada = np.einsum("igk,ig->ik", por_influenciador, self.demografia)
+		# Cidades sem referência ficam fora da mistura: a massa restante é redistribuída
+		massa = np.asarray(self.pesos.sum(axis=1)).ravel() * self.demografia.sum(axis=1)
+		with np.errstate(divide="ignore", invalid="ignore"):
+			return np.where(massa[:, None] > 0, acumulada / massa[:, None], np.nan)
+
+	def probabilidades(self, desvio_padrao=DESVIO_PADRAO_EDUCACAO, cortes=CORTES_EDUCACAO, mistura=False):
+		"""Distribuição de escolaridade de cada influenciador, com colunas de :func:`faixas_educacao`.
+
+		Sem ``mistura``, é a normal centrada na média de anos de estudo da
+		audiência (o modelo do resumo). Com ``mistura``, a variação entre as
+		médias das cidades, grupos etários e sexos da referência também entra
+		na dispersão, além de ``desvio_padrao``.
+
+		As cidades sem referência de educação não são normalizadas da mesma
+		forma nos dois casos. Sem ``mistura``, o peso delas entra na média com 0
+		anos de estudo, como no resumo. Com ``mistura``, ele é descartado e os
+		demais pesos são reescalados para somar 1.
+		"""
+		cortes = _validar_parametros(desvio_padrao, cortes)
+		if not mistura:
+			valores = probabilidades_educacao(self.medias, desvio_padrao, cortes)
+		else:
+			acumulada = self._acumulada_mistura(desvio_padrao, cortes)
+			n = len(acumulada)
+			valores = np.diff(np.hstack([np.zeros((n, 1)), acumulada, np.ones((n, 1))]), axis=1)
+		return pd.DataFrame(valores, columns=faixas_educacao(cortes), index=self.influencers)
+
+
+def pontuar_educacao(df_cidades, df_demografia, matrizes=None, desvio_padrao=DESVIO_PADRAO_EDUCACAO, cortes=CORTES_EDUCACAO):
+	"""Distribuição de escolaridade de cada influenciador.
+
+	Retorna um DataFrame indexado por ``influencer`` com as colunas de
+	:func:`faixas_educacao` (com os parâmetros padrão, ``COLUNAS_EDUCACAO``).
+	"""
+	anos = anos_de_estudo(df_cidades, df_demografia, matrizes)
+	return pd.DataFrame(
+		probabilidades_educacao(anos.to_numpy(), desvio_padrao, cortes),
+		columns=faixas_educacao(cortes),
+		index=anos.index,
+	)
+
+
+def cidades_sem_correspondencia(df_cidades, matrizes=None):
+	"""Cidades da audiência que ficaram de fora de alguma tabela de referência.
+
+	Retorna um DataFrame com o nome recebido, o número de perfis, o peso somado
+	na audiência desses perfis e se a cidade foi encontrada em cada tabela,
+	das cidades com mais perfis para as com menos.
+	"""
+	matrizes = matrizes or matrizes_referencia()
+	colunas = ["Cidade", "Perfis", "Peso", "Classes sociais", "Educação"]
+	df = df_cidades.dropna(subset=["Cidade"])
+	if df.empty:
+		return pd.DataFrame(columns=colunas)
+
+	codigos_cidade, nomes = pd.factorize(df["Cidade"])
+	chaves = codificar_cidades(nomes, matrizes.indice_cidades)
+	classes = _presentes(chaves, matrizes.com_classes)
+	educacao = _presentes(chaves, matrizes.com_educacao)
+	faltantes = np.flatnonzero(~(classes & educacao))
+
+	linhas = df[np.isin(codigos_cidade, faltantes)]
+	codigos = codigos_cidade[np.isin(codigos_cidade, faltantes)]
+	agregado = pd.DataFrame({"codigo": codigos, "influencer": linhas["influencer"].to_numpy(), "weight": linhas["weight"].to_numpy(dtype=float)})
+	agregado = agregado.groupby("codigo").agg(Perfis=("influencer", "nunique"), Peso=("weight", "sum"))
+	codigos = agregado.index.to_numpy()
+	return pd.DataFrame({
+		"Cidade": np.asarray(nomes)[codigos],
+		"Perfis": agregado["Perfis"].to_numpy(),
+		"Peso": agregado["Peso"].to_numpy(),
+		"Classes sociais": classes[codigos],
+		"Educação": educacao[codigos],
+	}, columns=colunas).sort_values(["Perfis", "Peso", "Cidade"], ascending=[False, False, True], ignore_index=True)
@@ -0,0 +1,171 @@
+"""Tabelas de referência do IBGE usadas no resumo dos influenciadores.
+
+As planilhas em ``dados/`` são lidas uma única vez por processo. Na primeira
+leitura, cada planilha é convertida em um cache colunar ``.npz`` em
+``dados/.cache``, identificado pelo mtime e pelo SHA-256 do arquivo de origem,
+de modo que os processos seguintes não precisam passar pelo openpyxl.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from analise import cidades, instrumentacao
+
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados")
+PASTA_CACHE = os.path.join(PASTA_DADOS, ".cache")
+
+ARQUIVO_CLASSES = os.path.join(PASTA_DADOS, "classes_sociais_por_cidade.xlsx")
+ARQUIVO_EDUCACAO = os.path.join(PASTA_DADOS, "educacao_por_cidade.xlsx")
+# Muda sempre que o formato do .npz muda, para que caches antigos sejam refeitos
+VERSAO_CACHE = 2
+
+_tabelas = {}
+_versoes = {}
+_trava = threading.Lock()
+
+
+def _sha256(caminho):
+	h = hashlib.sha256()
+	with open(caminho, "rb") as f:
+		for bloco in iter(lambda: f.read(1 << 20), b""):
+			h.update(bloco)
+	return h.hexdigest()
+
+
+def _caminho_cache(origem):
+	nome = os.path.splitext(os.path.basename(origem))[0]
+	return os.path.join(PASTA_CACHE, nome + ".npz")
+
+
+def _ler_cache(caminho, mtime, sha=None):
+	# Retorna (DataFrame, sha) do cache se ele corresponder ao arquivo de origem
+	if not os.path.exists(caminho):
+		return None, None
+	try:
+		with np.load(caminho, allow_pickle=False) as npz:
+			if "_versao" not in npz.files or int(npz["_versao"]) != VERSAO_CACHE:
+				return None, None
+			if sha is None and int(npz["_mtime"]) != mtime:
+				return None, None
+			if sha is not None and str(npz["_sha256"]) != sha:
+				return None, None
+			colunas = [str(c) for c in npz["_colunas"]]
+			dados = {}
+			for i, coluna in enumerate(colunas):
+				valores = npz["col_{}".format(i)]
+				nulos = "nulos_{}".format(i)
+				if nulos in npz.files:
+					# Coluna de texto: as células vazias voltam a ser NaN, como no read_excel
+					valores = valores.astype(object)
+					valores[npz[nulos]] = np.nan
+				dados[coluna] = valores
+			return pd.DataFrame(dados), str(npz["_sha256"])
+	except Exception:
+		return None, None
+
+
+def _gravar_cache(caminho, df, mtime, sha):
+	pasta = os.path.dirname(caminho)
+	os.makedirs(pasta, exist_ok=True)
+	arrays = {}
+	for i, coluna in enumerate(df.columns):
+		valores = df[coluna].to_numpy()
+		if valores.dtype == object or not np.issubdtype(valores.dtype, np.number):
+			# Texto sem pickle: as células vazias vão em uma máscara à parte
+			nulos = pd.isna(df[coluna]).to_numpy()
+			valores = np.where(nulos, "", valores).astype(str)
+			arrays["nulos_{}".format(i)] = nulos
+		arrays["col_{}".format(i)] = valores
+	# Arquivo temporário próprio de cada escrita, na mesma pasta do destino
+	descritor, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp.npz")
+	try:
+		with os.fdopen(descritor, "wb") as f:
+			np.savez(
+				f,
+				_versao=np.int64(VERSAO_CACHE),
+				_colunas=np.array([str(c) for c in df.columns]),
+				_mtime=np.int64(mtime),
+				_sha256=np.array(sha),
+				**arrays
+			)
+		os.replace(temporario, caminho)
+	except BaseException:
+		os.remove(temporario)
+		raise
+
+
+def ler_planilha(origem):
+	"""Lê uma planilha de referência, usando o cache colunar quando possível.
+
+	Retorna o DataFrame e o SHA-256 do arquivo de origem.
+	"""
+	mtime = os.stat(origem).st_mtime_ns
+	cache = _caminho_cache(origem)
+
+	df, sha = _ler_cache(cache, mtime)
+	if df is not None:
+		return df, sha
+
+	# mtime diferente: o conteúdo pode ser o mesmo (ex.: checkout novo do git)
+	sha = _sha256(origem)
+	df, _ = _ler_cache(cache, mtime, sha=sha)
+	if df is None:
+		df = pd.read_excel(origem)
+		df = df.drop(columns=["Unnamed: 0"], errors="ignore")
+	try:
+		_gravar_cache(cache, df, mtime, sha)
+	except OSError:
+		# Sem permissão de escrita: segue apenas com o cache em memória
+		pass
+	return df, sha
+
+
+def _carregar(chave, origem, indice):
+	# Tabela já carregada é lida sem a trava: um processo criado por fork
+	# enquanto outra thread a segurava herdaria a trava fechada para sempre
+	tabela = _tabelas.get(chave)
+	if tabela is not None:
+		return tabela
+	with _trava:
+		if chave not in _tabelas:
+			with instrumentacao.etapa("Leitura da referência ({})".format(chave)):
+				df, sha = ler_planilha(origem)
+			_tabelas[chave] = df.set_index(indice).sort_index()
+			_versoes[chave] = sha
+		return _tabelas[chave]
+
+
+def classes_por_cidade():
+	"""Distribuição de classes sociais (%) indexada por ``Cidade``.
+
+	O DataFrame é compartilhado entre as execuções e não deve ser alterado in-place.
+	"""
+	return _carregar("classes", ARQUIVO_CLASSES, "Cidade")
+
+
+def educacao_por_cidade():
+	"""Anos médios de estudo por sexo, indexados por ``(Cidade, Grupo Etário)``.
+
+	O DataFrame é compartilhado entre as execuções e não deve ser alterado in-place.
+	"""
+	return _carregar("educacao", ARQUIVO_EDUCACAO, ["Cidade", "Grupo Etário"])
+
+
+def versao():
+	"""Identificador do conteúdo atual das tabelas de referência.
+
+	Muda sempre que alguma das planilhas em ``dados/`` ou a normalização dos
+	nomes de cidades é alterada, e serve para invalidar resultados calculados
+	com as tabelas antigas.
+	"""
+	classes_por_cidade()
+	educacao_por_cidade()
+	h = hashlib.sha256()
+	h.update(str(cidades.VERSAO_NORMALIZACAO).encode())
+	for chave in sorted(_versoes):
+		h.update(_versoes[chave].encode())
+	return h.hexdigest()[:16]
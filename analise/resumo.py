@@ -0,0 +1,148 @@
+"""Métricas do resumo "Defesa Influenciadores", calculadas a partir das tabelas extraídas."""
+import pandas as pd
+
+from analise import dispersao, ingestao, instrumentacao, interesses, pontuacao
+
+COLUNAS_RESUMO = [
+	"Username do influenciador",
+	"Nome do influenciador",
+	"Score da audiência",
+	"Dispersão de interações",
+	"Alcance médio esperado",
+	"Interesses da audiência",
+	"Classes sociais",
+	"Escolaridade",
+]
+
+
+############ Classes sociais ############
+def calcular_classes(df_cidades):
+	"""Distribuição de classes sociais da audiência, ponderada pelas cidades."""
+	result_classes = pontuacao.pontuar_classes(df_cidades)
+	result_classes = result_classes.round(2)
+	result_classes[pontuacao.COLUNAS_CLASSES] /= 100
+
+	result_classes["distribuicao_formatada"] = [
+		f"Classes D e E: {row['Classes D e E']:.2%},  \n"
+		f"Classe C: {row['Classe C']:.2%},  \n"
+		f"Classe B: {row['Classe B']:.2%},  \n"
+		f"Classe A: {row['Classe A']:.2%}"
+		for _, row in result_classes.iterrows()
+	]
+
+	# Trocar ponto por vírgula para notação percentual brasileira
+	result_classes["distribuicao_formatada"] = result_classes["distribuicao_formatada"].str.replace('.', ',', regex=False)
+	return result_classes.reset_index()
+
+
+############ Educação ############
+def calcular_educacao(df_cidades, df_demografia_audiencia):
+	"""Probabilidade de cada faixa de anos de estudo da audiência."""
+	result_edu = pontuacao.pontuar_educacao(df_cidades, df_demografia_audiencia)
+
+	# Adicionar coluna de distribuição formatada
+	result_edu["distribuicao_formatada"] = [
+		f"< 5 anos: {row['< 5 anos']:.2%},  \n"
+		f"5-9 anos: {row['5-9 anos']:.2%},  \n"
+		f"9-12 anos: {row['9-12 anos']:.2%},  \n"
+		f"acima de 12 anos: {row['> 12 anos']:.2%}"
+		for _, row in result_edu.iterrows()
+	]
+
+	# Trocar ponto por vírgula na formatação percentual
+	result_edu["distribuicao_formatada"] = result_edu["distribuicao_formatada"].str.replace('.', ',', regex=False)
+	return result_edu.rename_axis("Influencer").reset_index()
+
+
+############ Dispersão ############
+def calcular_dispersao(tabelas):
+	"""Dispersão (coeficiente de variação médio de likes e comments) dos posts recentes."""
+	dispersao_influencers = dispersao.dispersao_por_perfil(tabelas).to_dict()
+
+	for influencer in tabelas.perfis.index.difference(list(dispersao_influencers), sort=False):
+		print(f"Sem registros de likes nem comments para '{influencer}'")
+
+	return dispersao_influencers
+
+
+############ Interesses ############
+def calcular_interesses(df_interesses):
+	"""Top 5 interesses da audiência de cada influenciador, já formatados."""
+	top = interesses.top_interesses(df_interesses, n=5)
+	result_interesses = interesses.formatar_top_interesses(top)
+	return result_interesses.rename("top_interesses").rename_axis("influencer").reset_index()
+
+
+############ Outros dados ############
+def calcular_outros_dados(perfis):
+	"""Nome, score da audiência e alcance médio formatado de cada influenciador."""
+	nomes_influenciadores = {}
+	score_audiencia_influenciadores = {}
+	alcance_medio_influenciadores = {}
+
+	for influencer, perfil in perfis.iterrows():
+		# Encontrar nome do influenciador
+		if perfil["fullname"] is not None:
+			nomes_influenciadores[influencer] = perfil["fullname"]
+		else:
+			nomes_influenciadores[influencer] = influencer
+			print("Não foi possível encontrar o nome do influenciador {}".format(influencer))
+
+		# Encontrar credibilidade da audiência
+		try:
+			score_audiencia_influenciadores[influencer] = int(perfil["audience_credibility"] * 100)
+		except:
+			score_audiencia_influenciadores[influencer] = "N/A"
+			print("Não foi possível encontrar a credibilidade da audiência do influenciador {}".format(influencer))
+
+		# Encontrar e formatar média de Plays em Reels (ou de views)
+		valor = perfil["alcance"]
+
+		if valor is not None:
+			alcance_medio_influenciadores[influencer] = f"{valor:,}".replace(",", ".")
+		else:
+			alcance_medio_influenciadores[influencer] = "N/A"
+			print("Não foi possível encontrar o alcance do influenciador {}".format(influencer))
+
+	return nomes_influenciadores, score_audiencia_influenciadores, alcance_medio_influenciadores
+
+
+############ Consolidar o DF final ############
+def montar_resumo(tabelas):
+	"""Monta o DataFrame do resumo, com uma linha por influenciador na ordem de ``tabelas.perfis``."""
+	df_cidades = ingestao.cidades_brasileiras(tabelas)
+
+	with instrumentacao.etapa("Classes sociais", linhas=len(df_cidades)):
+		result_classes = calcular_classes(df_cidades)
+		classes_sociais_dict = result_classes.set_index('influencer')['distribuicao_formatada'].to_dict()
+
+	with instrumentacao.etapa("Educação", linhas=len(df_cidades) + len(tabelas.demografia)):
+		result_edu = calcular_educacao(df_cidades, tabelas.demografia)
+		escolaridade_dict = result_edu.set_index('Influencer')['distribuicao_formatada'].to_dict()
+
+	with instrumentacao.etapa("Dispersão", linhas=len(tabelas.posts)):
+		dispersao_influencers = calcular_dispersao(tabelas)
+
+	with instrumentacao.etapa("Interesses", linhas=len(tabelas.interesses)):
+		result_interesses = calcular_interesses(tabelas.interesses)
+		interesses_dict = result_interesses.set_index('influencer')['top_interesses'].to_dict()
+
+	with instrumentacao.etapa("Outros dados", linhas=len(tabelas.perfis)):
+		nomes_influenciadores, score_audiencia_influenciadores, alcance_medio_influenciadores = calcular_outros_dados(tabelas.perfis)
+
+	# Lista para armazenar os dados de cada influenciador
+	resumo_influenciadores = []
+
+	for influencer in tabelas.perfis.index:
+		resumo_influenciadores.append({
+			"Username do influenciador": influencer,
+			"Nome do influenciador": nomes_influenciadores.get(influencer),
+			"Score da audiência": score_audiencia_influenciadores.get(influencer, "N/A"),
+			"Dispersão de interações": int(dispersao_influencers.get(influencer, 0)),
+			"Alcance médio esperado": alcance_medio_influenciadores.get(influencer),
+			"Interesses da audiência": interesses_dict.get(influencer, "Não há dados de interesses da audiência disponíveis"),
+			"Classes sociais": classes_sociais_dict.get(influencer, "Não há informações geográficas para a audiência do perfil"),
+			"Escolaridade": escolaridade_dict.get(influencer, "Não há informações geográficas para a audiência do perfil"),
+		})
+
+	return pd.DataFrame(resumo_influenciadores, columns=COLUNAS_RESUMO)
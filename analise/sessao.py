@@ -0,0 +1,351 @@
+"""Armazenamento compacto dos dados de cada sessão do app.
+
+Em vez de guardar as árvores JSON e os arquivos enviados em
+``st.session_state``, cada sessão mantém:
+
+- as tabelas extraídas, com as colunas de texto codificadas como categorias
+  (cada cidade, interesse ou username é guardado uma única vez);
+- o conteúdo bruto de cada JSON, comprimido em um SQLite temporário da sessão,
+  lido apenas quando a aba Posts exibe um perfil.
+
+A cada upload, apenas os arquivos novos ou alterados são processados: os
+perfis removidos saem das tabelas e os demais não são tocados.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import weakref
+import zlib
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from analise import cache, decodificacao, ingestao
+
+
+def _compactar(df):
+	df = df.copy()
+	for coluna in df.columns:
+		if df[coluna].dtype == object or pd.api.types.is_string_dtype(df[coluna]):
+			df[coluna] = df[coluna].astype("category")
+	return df
+
+
+def compactar_tabelas(tabelas):
+	"""Tabelas com as colunas de texto codificadas como categorias."""
+	return ingestao.TabelasPerfis(
+		cidades=_compactar(tabelas.cidades),
+		demografia=_compactar(tabelas.demografia),
+		interesses=_compactar(tabelas.interesses),
+		posts=_compactar(tabelas.posts),
+		# Uma linha por perfil, com valores brutos do JSON: mantida como está
+		perfis=tabelas.perfis,
+		avisos=tabelas.avisos,
+	)
+
+
+def _anexar_coluna(antiga, nova):
+	if isinstance(antiga.dtype, pd.CategoricalDtype):
+		nova = nova.astype("category")
+		try:
+			return pd.Series(union_categoricals([antiga, nova]), name=antiga.name)
+		except TypeError:
+			# Categorias de tipos diferentes (ex.: coluna só com valores nulos)
+			return pd.concat([antiga.astype(object), nova.astype(object)], ignore_index=True).astype("category")
+	return pd.concat([antiga, nova], ignore_index=True)
+
+
+def _anexar(compacto, novo):
+	# Acrescenta linhas a uma tabela compacta sem recodificar as categorias existentes
+	if novo.empty:
+		return compacto
+	if compacto.empty:
+		return _compactar(novo).reset_index(drop=True)
+	return pd.DataFrame(
+		{
+			coluna: _anexar_coluna(compacto[coluna].reset_index(drop=True), novo[coluna].reset_index(drop=True))
+			for coluna in compacto.columns
+		}
+	)
+
+
+def _remover_categorias_sem_uso(df):
+	for coluna in df.columns:
+		if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+			df[coluna] = df[coluna].cat.remove_unused_categories()
+	return df
+
+
+def bytes_dataframe(df):
+	"""Memória ocupada por um DataFrame, incluindo o conteúdo das strings."""
+	return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def _remover_banco(conexao, caminho):
+	conexao.close()
+	try:
+		os.remove(caminho)
+	except OSError:
+		pass
+
+
+def _remover_arquivos(caminhos):
+	for caminho in caminhos:
+		try:
+			os.remove(caminho)
+		except OSError:
+			pass
+
+
+class DepositoPosts:
+	"""Conteúdo bruto dos JSON de uma sessão, comprimido em um SQLite temporário.
+
+	O arquivo é removido quando o depósito deixa de ser referenciado (fim da
+	sessão) ou em :meth:`fechar`. O último perfil lido fica decodificado em
+	memória, já que a aba Posts o relê a cada troca de página.
+	"""
+
+	def __init__(self, pasta=None):
+		descritor, self.caminho = tempfile.mkstemp(prefix="vis_influ_posts_", suffix=".sqlite", dir=pasta)
+		os.close(descritor)
+		self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+		self._conexao.execute("CREATE TABLE IF NOT EXISTS posts (influencer TEXT PRIMARY KEY, conteudo BLOB NOT NULL)")
+		self._trava = threading.Lock()
+		self._ultimo = None
+		self._finalizador = weakref.finalize(self, _remover_banco, self._conexao, self.caminho)
+
+	def guardar(self, conteudos):
+		"""Grava (ou substitui) o conteúdo de ``{influencer: bytes}``."""
+		linhas = [(influencer, zlib.compress(conteudo, 1)) for influencer, conteudo in conteudos.items()]
+		with self._trava, self._conexao:
+			self._ultimo = None
+			self._conexao.executemany("INSERT OR REPLACE INTO posts VALUES (?, ?)", linhas)
+
+	def remover(self, influencers):
+		with self._trava, self._conexao:
+			self._ultimo = None
+			self._conexao.executemany("DELETE FROM posts WHERE influencer = ?", [(i,) for i in influencers])
+
+	def substituir(self, conteudos):
+		"""Deixa no depósito apenas o conteúdo de ``{influencer: bytes}``."""
+		with self._trava, self._conexao:
+			self._ultimo = None
+			self._conexao.execute("DELETE FROM posts")
+		self.guardar(conteudos)
+
+	def carregar(self, influencer):
+		"""JSON completo do influenciador, ou None se ele não estiver no depósito."""
+		with self._trava:
+			if self._ultimo is not None and self._ultimo[0] == influencer:
+				return self._ultimo[1]
+			linha = self._conexao.execute("SELECT conteudo FROM posts WHERE influencer = ?", (influencer,)).fetchone()
+		if linha is None:
+			return None
+		dados = decodificacao.decodificar(zlib.decompress(linha[0]))
+		with self._trava:
+			self._ultimo = (influencer, dados)
+		return dados
+
+	def bytes_em_disco(self):
+		try:
+			return os.path.getsize(self.caminho)
+		except OSError:
+			return 0
+
+	def fechar(self):
+		self._finalizador()
+
+
+class ArmazemSessao:
+	"""Tabelas extraídas, arquivos já processados e depósito de posts de uma sessão."""
+
+	def __init__(self):
+		self.tabelas = compactar_tabelas(ingestao.extrair_tabelas({}))
+		# {influencer: (nome do arquivo, tamanho, sha256)}, na ordem de upload
+		self.arquivos = {}
+		self._erros = {}
+		# sha256 já calculado para cada arquivo enviado, pelo id do upload
+		self._hashes_envio = {}
+		self.posts = DepositoPosts()
+		# (chave, caminho, resultado) do último arquivo exportado
+		self._exportacao = None
+		# (chave, DataFrame) do último resumo consolidado
+		self._resumo = None
+		# (chave, campanha.VetoresAudiencia) dos perfis carregados
+		self._vetores = None
+		# (chave, pontuacao.ModeloEducacao) dos perfis carregados
+		self._modelo_educacao = None
+		# (chave, geografia.IndiceGeografico) dos perfis carregados
+		self._geografia = None
+		self._temporarios = []
+		weakref.finalize(self, _remover_arquivos, self._temporarios)
+
+	@property
+	def hashes(self):
+		return {influencer: sha for influencer, (_, _, sha) in self.arquivos.items()}
+
+	@property
+	def erros(self):
+		return [self._erros[influencer] for influencer in self.arquivos if influencer in self._erros]
+
+	def identificar(self, arquivo):
+		"""``(nome, tamanho, sha256)`` de um arquivo enviado.
+
+		O conteúdo só é lido e resumido na primeira vez em que o upload aparece.
+		"""
+		id_envio = getattr(arquivo, "file_id", None)
+		tamanho = getattr(arquivo, "size", None)
+		chave = (id_envio, arquivo.name, tamanho)
+		sha = self._hashes_envio.get(chave) if id_envio is not None else None
+		if sha is None:
+			conteudo = arquivo.getvalue()
+			sha = cache.sha256_conteudo(conteudo)
+			tamanho = len(conteudo)
+			if id_envio is not None:
+				self._hashes_envio[chave] = sha
+		return arquivo.name, tamanho, sha
+
+	def diferenca(self, arquivos):
+		"""Compara ``{influencer: (nome, tamanho, sha256)}`` com os arquivos já processados.
+
+		Retorna ``(novos, removidos)``: os perfis novos ou com conteúdo alterado,
+		na ordem de ``arquivos``, e os perfis que não foram mais enviados.
+		"""
+		novos = [influencer for influencer, identidade in arquivos.items() if self.arquivos.get(influencer) != identidade]
+		removidos = [influencer for influencer in self.arquivos if influencer not in arquivos]
+		return novos, removidos
+
+	def aplicar(self, arquivos, tabelas, erros, conteudos):
+		"""Atualiza a sessão para o conjunto ``arquivos``.
+
+		``tabelas``, ``erros`` (``{influencer: mensagem}``) e ``conteudos`` se
+		referem apenas aos perfis novos ou alterados (ver :meth:`diferenca`); os
+		perfis que continuam no upload não são reprocessados.
+		"""
+		novos, removidos = self.diferenca(arquivos)
+		descartados = removidos + [influencer for influencer in novos if influencer in self.arquivos]
+
+		restantes = ingestao.excluir_perfis(self.tabelas, descartados)
+		if descartados:
+			restantes = ingestao.TabelasPerfis(
+				cidades=_remover_categorias_sem_uso(restantes.cidades.reset_index(drop=True)),
+				demografia=_remover_categorias_sem_uso(restantes.demografia.reset_index(drop=True)),
+				interesses=_remover_categorias_sem_uso(restantes.interesses.reset_index(drop=True)),
+				posts=_remover_categorias_sem_uso(restantes.posts.reset_index(drop=True)),
+				perfis=restantes.perfis,
+				avisos=restantes.avisos,
+			)
+
+		# Perfis na ordem de upload, como em um processamento completo
+		perfis = pd.concat([restantes.perfis, tabelas.perfis])
+		ordem = [influencer for influencer in arquivos if influencer in perfis.index]
+		if list(perfis.index) != ordem:
+			perfis = perfis.loc[ordem]
+
+		self.tabelas = ingestao.TabelasPerfis(
+			cidades=_anexar(restantes.cidades, tabelas.cidades),
+			demografia=_anexar(restantes.demografia, tabelas.demografia),
+			interesses=_anexar(restantes.interesses, tabelas.interesses),
+			posts=_anexar(restantes.posts, tabelas.posts),
+			perfis=perfis,
+			avisos=restantes.avisos + tabelas.avisos,
+		)
+
+		for influencer in descartados:
+			self._erros.pop(influencer, None)
+		self._erros.update(erros)
+
+		self.posts.remover(descartados)
+		self.posts.guardar(conteudos)
+		self.arquivos = dict(arquivos)
+
+	def resumo_consolidado(self, chave, gerar):
+		"""DataFrame de ``gerar()``, refeito apenas quando ``chave`` muda."""
+		if self._resumo is None or self._resumo[0] != chave:
+			self._resumo = (chave, gerar())
+		return self._resumo[1]
+
+	def descartar_resumo(self):
+		"""Descarta o resumo consolidado e o arquivo exportado a partir dele, para que sejam refeitos."""
+		if self._exportacao is not None:
+			self._descartar_temporario(self._exportacao[1])
+			self._exportacao = None
+		self._resumo = None
+
+	def vetores_audiencia(self, chave, gerar):
+		"""Vetores de audiência de ``gerar()``, refeitos apenas quando ``chave`` muda."""
+		if self._vetores is None or self._vetores[0] != chave:
+			self._vetores = (chave, gerar())
+		return self._vetores[1]
+
+	def modelo_educacao(self, chave, gerar):
+		"""Componentes do modelo de escolaridade de ``gerar()``, refeitos apenas quando ``chave`` muda."""
+		if self._modelo_educacao is None or self._modelo_educacao[0] != chave:
+			self._modelo_educacao = (chave, gerar())
+		return self._modelo_educacao[1]
+
+	def indice_geografico(self, chave, gerar):
+		"""Índice geográfico de ``gerar()``, refeito apenas quando ``chave`` muda."""
+		if self._geografia is None or self._geografia[0] != chave:
+			self._geografia = (chave, gerar())
+		return self._geografia[1]
+
+	def arquivo_exportado(self, chave, gerar):
+		"""``(caminho, resultado)`` de ``gerar(caminho)``, refeito apenas quando ``chave`` muda.
+
+		O arquivo fica em disco, e não na sessão; o anterior é apagado quando a
+		chave muda, e o atual no fim da sessão.
+		"""
+		if self._exportacao is not None and self._exportacao[0] == chave and os.path.exists(self._exportacao[1]):
+			return self._exportacao[1], self._exportacao[2]
+
+		descritor, caminho = tempfile.mkstemp(prefix="vis_influ_resumo_")
+		os.close(descritor)
+		self._temporarios.append(caminho)
+		try:
+			resultado = gerar(caminho)
+		except Exception:
+			self._descartar_temporario(caminho)
+			raise
+
+		if self._exportacao is not None:
+			self._descartar_temporario(self._exportacao[1])
+		self._exportacao = (chave, caminho, resultado)
+		return caminho, resultado
+
+	def _descartar_temporario(self, caminho):
+		_remover_arquivos([caminho])
+		if caminho in self._temporarios:
+			self._temporarios.remove(caminho)
+
+	def limpar(self):
+		self.descartar_resumo()
+		self._vetores = None
+		self._modelo_educacao = None
+		self._geografia = None
+		self.tabelas = compactar_tabelas(ingestao.extrair_tabelas({}))
+		self.arquivos = {}
+		self._erros = {}
+		self._hashes_envio = {}
+		self.posts.substituir({})
+
+	def memoria(self, *extras):
+		"""Retorna ``(bytes em memória, bytes em disco)`` ocupados pela sessão.
+
+		Inclui o último resumo consolidado, os vetores de audiência e o índice
+		geográfico; ``extras`` são DataFrames adicionais guardados na sessão.
+		"""
+		em_memoria = sum(
+			bytes_dataframe(df)
+			for df in (self.tabelas.cidades, self.tabelas.demografia, self.tabelas.interesses, self.tabelas.posts, self.tabelas.perfis)
+		)
+		if self._resumo is not None:
+			extras += (self._resumo[1],)
+		em_memoria += sum(bytes_dataframe(df) for df in extras if df is not None)
+		for memorizado in (self._vetores, self._geografia):
+			if memorizado is not None:
+				em_memoria += memorizado[1].nbytes
+		em_memoria += sys.getsizeof(self.hashes) + sum(sys.getsizeof(h) for h in self.hashes.values())
+		return em_memoria, self.posts.bytes_em_disco()
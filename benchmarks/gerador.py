@@ -0,0 +1,125 @@
+"""Gerador de perfis sintéticos no formato dos JSON exportados pelo IMAI.
+
+As cidades são sorteadas entre as das planilhas de ``dados/`` (para que o
+cruzamento com as referências encontre correspondência) e os interesses entre
+os nomes traduzidos pelo app.
+
+Uso (a partir da raiz do repositório):
+
+	python -m benchmarks.gerador 100 perfis_sinteticos/ --cidades 50 --posts 30
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from analise import referencias
+from analise.interesses import INTERESSES_TRADUCAO
+
+GRUPOS_ETARIOS = ["13-17", "18-24", "25-34", "35-44", "45-64", "65-"]
+
+
+def _pesos(rng, n, total=1.0):
+	pesos = rng.random(n)
+	return pesos / pesos.sum() * total if n else pesos
+
+
+class GeradorPerfis:
+	"""Gera perfis sintéticos com quantidades configuráveis de cada seção.
+
+	``cidades``, ``interesses`` e ``posts`` são os números de entradas por
+	perfil e ``grupos_etarios`` o número de faixas de idade (até 6).
+	``fracao_exterior`` é a fração das cidades fora do Brasil.
+	"""
+
+	def __init__(self, cidades=50, grupos_etarios=6, interesses=10, posts=30, fracao_exterior=0.1, semente=0):
+		self.n_cidades = cidades
+		self.n_grupos = min(grupos_etarios, len(GRUPOS_ETARIOS))
+		self.n_interesses = interesses
+		self.n_posts = posts
+		self.fracao_exterior = fracao_exterior
+		self.rng = np.random.default_rng(semente)
+		self.nomes_cidades = referencias.classes_por_cidade().index.to_numpy()
+		self.nomes_interesses = np.array(list(INTERESSES_TRADUCAO))
+
+	def perfil(self, i):
+		"""Dicionário de um perfil, com a mesma estrutura do JSON do IMAI."""
+		rng = self.rng
+		cidades = [
+			{
+				"name": str(nome),
+				"weight": float(peso),
+				"country": {"code": "BR" if rng.random() >= self.fracao_exterior else "PT"},
+				"state": {"name": "Estado"},
+			}
+			for nome, peso in zip(rng.choice(self.nomes_cidades, self.n_cidades), _pesos(rng, self.n_cidades, 0.8))
+		]
+		demografia = [
+			{"code": codigo, "male": float(masculino), "female": float(feminino)}
+			for codigo, masculino, feminino in zip(
+				GRUPOS_ETARIOS[:self.n_grupos], _pesos(rng, self.n_grupos, 0.5), _pesos(rng, self.n_grupos, 0.5)
+			)
+		]
+		n_interesses = min(self.n_interesses, len(self.nomes_interesses))
+		lista_interesses = [
+			{"name": str(nome), "weight": round(float(peso), 6)}
+			for nome, peso in zip(rng.choice(self.nomes_interesses, n_interesses, replace=False), rng.random(n_interesses) / 3)
+		]
+		posts = [
+			{
+				"stat": {"likes": int(likes), "comments": int(comments), "shares": int(shares)},
+				"link": "https://www.instagram.com/p/{}_{}/".format(i, k),
+				"thumbnail": "https://example.com/{}_{}.jpg".format(i, k),
+				"text": "Post {} do perfil {}".format(k, i),
+			}
+			for k, (likes, comments, shares) in enumerate(
+				zip(rng.integers(0, 50000, self.n_posts), rng.integers(0, 2000, self.n_posts), rng.integers(0, 500, self.n_posts))
+			)
+		]
+		return {
+			"user_profile": {
+				"fullname": "Perfil Sintético {}".format(i),
+				"avg_reels_plays": int(rng.integers(1000, 10 ** 6)),
+				"followers": int(rng.integers(10 ** 4, 10 ** 7)),
+				"recent_posts": posts,
+				"commercial_posts": posts[:3],
+			},
+			"audience_followers": {
+				"data": {
+					"audience_credibility": float(rng.random()),
+					"audience_geo": {"cities": cidades},
+					"audience_genders_per_age": demografia,
+					"audience_interests": lista_interesses,
+				}
+			},
+		}
+
+	def perfis(self, n):
+		"""``{perfil: bytes do JSON}`` para ``n`` perfis, como recebidos no upload."""
+		return {
+			"perfil{:05d}".format(i): json.dumps(self.perfil(i), ensure_ascii=False).encode("utf-8")
+			for i in range(n)
+		}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("perfis", type=int, help="número de perfis a gerar")
+	parser.add_argument("saida", help="pasta onde os arquivos json_{perfil}.json são gravados")
+	parser.add_argument("--cidades", type=int, default=50)
+	parser.add_argument("--grupos-etarios", type=int, default=6)
+	parser.add_argument("--interesses", type=int, default=10)
+	parser.add_argument("--posts", type=int, default=30)
+	parser.add_argument("--semente", type=int, default=0)
+	args = parser.parse_args()
+
+	gerador = GeradorPerfis(args.cidades, args.grupos_etarios, args.interesses, args.posts, semente=args.semente)
+	os.makedirs(args.saida, exist_ok=True)
+	for perfil, conteudo in gerador.perfis(args.perfis).items():
+		with open(os.path.join(args.saida, "json_{}.json".format(perfil)), "wb") as f:
+			f.write(conteudo)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,76 @@
+"""Mede o tempo de inicialização do app, cada medição em um processo Python novo.
+
+Para cada repetição, um processo novo executa o app com o
+``streamlit.testing`` e mede: a importação do Streamlit, a primeira execução
+do script (com as importações do app, como em uma instância recém-criada) e
+uma segunda execução (uma atualização comum). Também lista quais dependências
+pesadas foram importadas na abertura da Página Inicial.
+
+Uso (a partir da raiz do repositório):
+
+	python -m benchmarks.inicializacao --repeticoes 5 --saida inicializacao.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, "infos_influencers.py")
+
+DEPENDENCIAS_PESADAS = ["scipy", "scipy.stats", "matplotlib", "PIL", "requests", "xlsxwriter", "pyarrow"]
+
+_MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit = time.perf_counter()
+app = AppTest.from_file({app!r}, default_timeout=120)
+app.run()
+primeira = time.perf_counter()
+app.run()
+segunda = time.perf_counter()
+print(json.dumps({{
+	"importacao_streamlit": streamlit - inicio,
+	"primeira_execucao": primeira - streamlit,
+	"segunda_execucao": segunda - primeira,
+	"excecoes": [str(e.value) for e in app.exception],
+	"importadas": [m for m in {pesadas!r} if m in sys.modules],
+}}))
+"""
+
+
+def medir_inicializacao(app=APP):
+	"""Tempos (em segundos) e dependências pesadas importadas em um processo novo."""
+	codigo = _MEDICAO.format(app=app, pesadas=DEPENDENCIAS_PESADAS)
+	saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+	return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--repeticoes", type=int, default=5)
+	parser.add_argument("--saida", help="arquivo JSON com os resultados")
+	args = parser.parse_args()
+
+	medicoes = [medir_inicializacao() for _ in range(args.repeticoes)]
+	for medicao in medicoes:
+		if medicao["excecoes"]:
+			print("Exceções no app:", medicao["excecoes"], file=sys.stderr)
+			sys.exit(1)
+
+	print("{:<22} {:>10} {:>10}".format("medida", "mediana (s)", "máximo (s)"))
+	for medida in ["importacao_streamlit", "primeira_execucao", "segunda_execucao"]:
+		valores = [medicao[medida] for medicao in medicoes]
+		print("{:<22} {:>10.3f} {:>10.3f}".format(medida, statistics.median(valores), max(valores)))
+	print("Dependências pesadas importadas na Página Inicial:", ", ".join(medicoes[0]["importadas"]) or "nenhuma")
+
+	if args.saida:
+		with open(args.saida, "w", encoding="utf-8") as f:
+			json.dump({"app": os.path.relpath(APP, RAIZ), "medicoes": medicoes}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+	main()
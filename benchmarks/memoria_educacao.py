@@ -0,0 +1,108 @@
+"""Compara o pico de memória do cálculo de escolaridade: merge cartesiano × cálculo fatorado.
+
+Uso (a partir da raiz do repositório):
+
+	python -m benchmarks.memoria_educacao --perfis 1000 --cidades 50
+"""
+import argparse
+import functools
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from analise import pontuacao, referencias
+
+GRUPOS_ETARIOS = ["13-17", "18-24", "25-34", "35-44", "45-64", "65-"]
+
+
+def gerar_tabelas(n_perfis, n_cidades, semente=0):
+	"""Tabelas de cidades e de gênero/idade sintéticas, com nomes reais de cidades."""
+	rng = np.random.default_rng(semente)
+	nomes = referencias.classes_por_cidade().index.to_numpy()
+
+	influencers = np.repeat(["perfil{}".format(i) for i in range(n_perfis)], n_cidades)
+	df_cidades = pd.DataFrame({
+		"influencer": influencers,
+		"Cidade": rng.choice(nomes, size=len(influencers)),
+		"country.code": "BR",
+		"weight": rng.random(len(influencers)) / 50,
+	})
+
+	influencers = np.repeat(["perfil{}".format(i) for i in range(n_perfis)], len(GRUPOS_ETARIOS))
+	df_demografia = pd.DataFrame({
+		"influencer": influencers,
+		"code": GRUPOS_ETARIOS * n_perfis,
+		"male": rng.random(len(influencers)) / 12,
+		"female": rng.random(len(influencers)) / 12,
+	})
+	return df_cidades, df_demografia
+
+
+@functools.lru_cache(maxsize=1)
+def _educacao_por_chave(versao):
+	# Referência de educação pelas chaves do índice de cidades, com a média das
+	# linhas da mesma cidade (variantes de grafia e linhas repetidas, como Vitória)
+	indice = pontuacao.matrizes_referencia().indice_cidades
+	educacao = referencias.educacao_por_cidade().reset_index()
+	educacao["chave"] = indice.chaves(educacao["Cidade"])
+	return educacao.groupby(["chave", "Grupo Etário"])[pontuacao.SEXOS].mean()
+
+
+def anos_por_merge(df_cidades, df_demografia):
+	"""Formulação anterior: cidades × grupos etários × educação via merges.
+
+	As cidades são unidas à referência pelas chaves do índice normalizado de
+	cidades, como no cálculo fatorado, e não pelo nome recebido.
+	"""
+	educacao_por_cidade = _educacao_por_chave(referencias.versao())
+	df_cidades = df_cidades.assign(chave=pontuacao.codificar_cidades(df_cidades["Cidade"], pontuacao.matrizes_referencia().indice_cidades))
+	df_unido = pd.merge(df_cidades, df_demografia, on="influencer")
+	total_weight_por_influencer = df_unido.groupby("influencer")["weight"].transform("sum")
+	total_weight_por_cidade = df_unido.groupby(["influencer", "Cidade"])["weight"].transform("sum")
+	df_unido["weight_normalized"] = total_weight_por_cidade / total_weight_por_influencer
+	df_unido["male_weighted"] = df_unido["male"] * df_unido["weight_normalized"]
+	df_unido["female_weighted"] = df_unido["female"] * df_unido["weight_normalized"]
+	df_unido.rename(columns={"code": "Grupo Etário", "male": "Proporção Male", "female": "Proporção Female"}, inplace=True)
+	df_unido_edu = df_unido.merge(educacao_por_cidade, left_on=["chave", "Grupo Etário"], right_index=True, how="left")
+	df_unido_edu["anos_female"] = df_unido_edu["female_weighted"] * df_unido_edu["female"]
+	df_unido_edu["anos_male"] = df_unido_edu["male_weighted"] * df_unido_edu["male"]
+	return df_unido_edu.groupby("influencer")[["anos_female", "anos_male"]].sum().sum(axis=1)
+
+
+def medir(funcao, *args):
+	# Retorna (resultado, segundos, pico de memória em MB); o tempo é medido
+	# sem o tracemalloc, que deixa as alocações mais lentas
+	inicio = time.perf_counter()
+	resultado = funcao(*args)
+	segundos = time.perf_counter() - inicio
+
+	tracemalloc.start()
+	funcao(*args)
+	_, pico = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return resultado, segundos, pico / 1024 ** 2
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--perfis", type=int, nargs="+", default=[100, 1000, 5000])
+	parser.add_argument("--cidades", type=int, default=50)
+	args = parser.parse_args()
+
+	# Carregar as referências fora da medição
+	pontuacao.matrizes_referencia()
+	_educacao_por_chave(referencias.versao())
+
+	print("{:>8} {:>14} {:>14} {:>12} {:>12}".format("perfis", "merge (MB)", "fatorado (MB)", "merge (s)", "fatorado (s)"))
+	for n_perfis in args.perfis:
+		df_cidades, df_demografia = gerar_tabelas(n_perfis, args.cidades)
+		esperado, t_merge, m_merge = medir(anos_por_merge, df_cidades, df_demografia)
+		obtido, t_fatorado, m_fatorado = medir(pontuacao.anos_de_estudo, df_cidades, df_demografia)
+		np.testing.assert_allclose(obtido.sort_index().to_numpy(), esperado.sort_index().to_numpy(), rtol=1e-9)
+		print("{:>8} {:>14.1f} {:>14.1f} {:>12.3f} {:>12.3f}".format(n_perfis, m_merge, m_fatorado, t_merge, t_fatorado))
+
+
+if __name__ == "__main__":
+	main()
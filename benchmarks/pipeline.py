@@ -0,0 +1,152 @@
+"""Mede o tempo e o pico de memória de cada etapa do resumo com perfis sintéticos.
+
+Os resultados são gravados em JSON, para comparação entre commits.
+
+Uso (a partir da raiz do repositório):
+
+	python -m benchmarks.pipeline --perfis 10 100 1000 10000 --saida bench.json
+	python -m benchmarks.pipeline --perfis 1000 --saida novo.json --comparar bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from analise import decodificacao, exportacao, ingestao, pontuacao, resumo
+from benchmarks.gerador import GeradorPerfis
+from benchmarks.memoria_educacao import medir
+
+LIMIAR_REGRESSAO = 1.2
+# Abaixo desses valores, tempo e memória são ruidosos demais para indicar regressão
+SEGUNDOS_MINIMOS = 0.05
+MB_MINIMOS = 1.0
+
+
+def _ingerir(conteudos):
+	return ingestao.extrair_tabelas(
+		{perfil: decodificacao.carregar_registro(conteudo) for perfil, conteudo in conteudos.items()}
+	)
+
+
+def _exportar(df_resumo):
+	destino = io.BytesIO()
+	exportacao.escrever_excel(df_resumo, destino)
+	return destino
+
+
+def medir_etapas(conteudos):
+	"""``[(etapa, segundos, pico em MB)]`` de cada etapa do resumo para ``{perfil: bytes}``."""
+	etapas = []
+
+	def etapa(nome, funcao, *args):
+		resultado, segundos, pico = medir(funcao, *args)
+		etapas.append((nome, segundos, pico))
+		return resultado
+
+	# Os cálculos imprimem avisos por perfil; não fazem parte da medição
+	with contextlib.redirect_stdout(io.StringIO()):
+		tabelas = etapa("ingestao", _ingerir, conteudos)
+		df_cidades = etapa("filtro_cidades", ingestao.cidades_brasileiras, tabelas)
+		etapa("classes", resumo.calcular_classes, df_cidades)
+		etapa("educacao", resumo.calcular_educacao, df_cidades, tabelas.demografia)
+		etapa("dispersao", resumo.calcular_dispersao, tabelas)
+		etapa("interesses", resumo.calcular_interesses, tabelas.interesses)
+		df_resumo = etapa("resumo_completo", resumo.montar_resumo, tabelas)
+		etapa("exportacao_excel", _exportar, df_resumo)
+	return etapas
+
+
+def _commit():
+	try:
+		return subprocess.run(
+			["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+		).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def comparar(atual, anterior, limiar=LIMIAR_REGRESSAO):
+	"""Linhas ``(perfis, etapa, razão de tempo, razão de memória)`` e as regressões.
+
+	Uma etapa regrediu quando o tempo ou o pico de memória ficaram acima de
+	``limiar`` vezes o valor do arquivo anterior (desde que acima de
+	``SEGUNDOS_MINIMOS`` e ``MB_MINIMOS``).
+	"""
+	anteriores = {(r["perfis"], r["etapa"]): r for r in anterior["resultados"]}
+	linhas = []
+	regressoes = []
+	for r in atual["resultados"]:
+		base = anteriores.get((r["perfis"], r["etapa"]))
+		if base is None:
+			continue
+		razao_tempo = r["segundos"] / base["segundos"] if base["segundos"] else float("inf")
+		razao_memoria = r["pico_mb"] / base["pico_mb"] if base["pico_mb"] else float("inf")
+		linha = (r["perfis"], r["etapa"], razao_tempo, razao_memoria)
+		linhas.append(linha)
+		if (razao_tempo > limiar and r["segundos"] > SEGUNDOS_MINIMOS) or (razao_memoria > limiar and r["pico_mb"] > MB_MINIMOS):
+			regressoes.append(linha)
+	return linhas, regressoes
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--perfis", type=int, nargs="+", default=[10, 100, 1000, 10000])
+	parser.add_argument("--cidades", type=int, default=50)
+	parser.add_argument("--grupos-etarios", type=int, default=6)
+	parser.add_argument("--interesses", type=int, default=10)
+	parser.add_argument("--posts", type=int, default=30)
+	parser.add_argument("--semente", type=int, default=0)
+	parser.add_argument("--saida", help="arquivo JSON com os resultados")
+	parser.add_argument("--comparar", help="JSON de uma execução anterior, para detectar regressões")
+	parser.add_argument("--limiar", type=float, default=LIMIAR_REGRESSAO)
+	args = parser.parse_args()
+
+	# Carregar as referências fora da medição
+	pontuacao.matrizes_referencia()
+
+	resultados = []
+	print("{:>8} {:<18} {:>10} {:>10}".format("perfis", "etapa", "tempo (s)", "pico (MB)"))
+	for n_perfis in args.perfis:
+		gerador = GeradorPerfis(args.cidades, args.grupos_etarios, args.interesses, args.posts, semente=args.semente)
+		conteudos = gerador.perfis(n_perfis)
+		for nome, segundos, pico in medir_etapas(conteudos):
+			resultados.append({"perfis": n_perfis, "etapa": nome, "segundos": segundos, "pico_mb": pico})
+			print("{:>8} {:<18} {:>10.3f} {:>10.1f}".format(n_perfis, nome, segundos, pico))
+
+	relatorio = {
+		"commit": _commit(),
+		"data": datetime.now().isoformat(timespec="seconds"),
+		"python": platform.python_version(),
+		"plataforma": platform.platform(),
+		"parametros": {
+			"cidades": args.cidades,
+			"grupos_etarios": args.grupos_etarios,
+			"interesses": args.interesses,
+			"posts": args.posts,
+			"semente": args.semente,
+		},
+		"resultados": resultados,
+	}
+	if args.saida:
+		with open(args.saida, "w", encoding="utf-8") as f:
+			json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+	if args.comparar:
+		with open(args.comparar, encoding="utf-8") as f:
+			anterior = json.load(f)
+		linhas, regressoes = comparar(relatorio, anterior, args.limiar)
+		print("\nComparação com {} (commit {}):".format(args.comparar, anterior.get("commit")))
+		print("{:>8} {:<18} {:>8} {:>8}".format("perfis", "etapa", "tempo", "memória"))
+		for n_perfis, nome, razao_tempo, razao_memoria in linhas:
+			marca = "  <- regressão" if (n_perfis, nome, razao_tempo, razao_memoria) in regressoes else ""
+			print("{:>8} {:<18} {:>7.2f}x {:>7.2f}x{}".format(n_perfis, nome, razao_tempo, razao_memoria, marca))
+		if regressoes:
+			sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
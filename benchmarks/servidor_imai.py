@@ -0,0 +1,164 @@
+"""Servidor local que imita a API de relatórios do IMAI, para testes sem acesso à rede.
+
+Responde ``GET /api/reports/new/?platform=instagram&url={perfil}`` com um
+relatório sintético do :class:`~benchmarks.gerador.GeradorPerfis` (sempre o
+mesmo para o mesmo perfil). Opcionalmente simula latência, limite de
+requisições por segundo (429 com ``Retry-After``) e falhas temporárias (503).
+
+Uso (a partir da raiz do repositório):
+
+	python -m benchmarks.servidor_imai --porta 8765 --latencia 0.2 --limite 20 --falhas 0.05
+	IMAI_URL=http://127.0.0.1:8765/api IMAI_AUTHKEY=teste python -m analise.cli --imai perfil1 perfil2
+"""
+import argparse
+import contextlib
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.gerador import GeradorPerfis
+
+CAMINHO_RELATORIO = "/api/reports/new/"
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+
+	def log_message(self, *_):
+		pass
+
+	def _responder(self, status, corpo, cabecalhos=()):
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(corpo)))
+		for nome, valor in cabecalhos:
+			self.send_header(nome, valor)
+		self.end_headers()
+		self.wfile.write(corpo)
+
+	def do_GET(self):
+		simulador = self.server.simulador
+		endereco = urlparse(self.path)
+		perfil = parse_qs(endereco.query).get("url", [None])[0]
+		if endereco.path != CAMINHO_RELATORIO or not perfil:
+			self._responder(404, b'{"success": false, "error": "not_found"}')
+			return
+		if simulador.chave and self.headers.get("authkey") != simulador.chave:
+			self._responder(401, b'{"success": false, "error": "unauthorized"}')
+			return
+
+		espera = simulador.reservar()
+		if espera:
+			simulador.contar("limitadas")
+			self._responder(429, b'{"success": false, "error": "too_many_requests"}', [("Retry-After", "{:.2f}".format(espera))])
+			return
+		if simulador.sortear_falha():
+			simulador.contar("falhas")
+			self._responder(503, b'{"success": false, "error": "unavailable"}')
+			return
+
+		time.sleep(simulador.latencia)
+		simulador.contar("atendidas")
+		self._responder(200, simulador.relatorio(perfil))
+
+
+class SimuladorIMAI:
+	"""Estado do servidor: parâmetros da simulação e contagem das respostas.
+
+	``limite`` é o número máximo de requisições por segundo (None: sem
+	limite) e ``falhas`` a fração das requisições respondidas com 503.
+	"""
+
+	def __init__(self, latencia=0.0, limite=None, falhas=0.0, chave=None, semente=0, **parametros_perfis):
+		self.latencia = latencia
+		self.limite = limite
+		self.falhas = falhas
+		self.chave = chave
+		self.semente = semente
+		self.parametros_perfis = parametros_perfis
+		self.contagem = {"atendidas": 0, "limitadas": 0, "falhas": 0}
+		self._trava = threading.Lock()
+		self._aleatorio = random.Random(semente)
+		self._janela = (0, 0)
+
+	def reservar(self):
+		"""0 se a requisição cabe no limite do segundo atual; senão, a espera até o próximo."""
+		if not self.limite:
+			return 0
+		with self._trava:
+			agora = time.time()
+			segundo, usadas = self._janela
+			if int(agora) != segundo:
+				segundo, usadas = int(agora), 0
+			if usadas >= self.limite:
+				return segundo + 1 - agora
+			self._janela = (segundo, usadas + 1)
+			return 0
+
+	def sortear_falha(self):
+		with self._trava:
+			return self._aleatorio.random() < self.falhas
+
+	def contar(self, resultado):
+		with self._trava:
+			self.contagem[resultado] += 1
+
+	def relatorio(self, perfil):
+		"""JSON (bytes) do relatório sintético de ``perfil``."""
+		gerador = GeradorPerfis(semente=zlib.crc32("{}|{}".format(self.semente, perfil).encode()), **self.parametros_perfis)
+		relatorio = gerador.perfil(0)
+		relatorio["success"] = True
+		relatorio["user_profile"]["username"] = perfil
+		return json.dumps(relatorio, ensure_ascii=False).encode("utf-8")
+
+
+def criar_servidor(simulador, porta=0, host="127.0.0.1"):
+	"""Servidor HTTP (ainda não iniciado) do ``simulador``; ``porta=0`` escolhe uma porta livre."""
+	servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+	servidor.daemon_threads = True
+	servidor.simulador = simulador
+	return servidor
+
+
+@contextlib.contextmanager
+def servidor_em_segundo_plano(simulador=None, porta=0):
+	"""Executa o servidor em uma thread enquanto o bloco roda; fornece a URL base da API."""
+	servidor = criar_servidor(simulador or SimuladorIMAI(), porta)
+	thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+	thread.start()
+	try:
+		yield "http://{}:{}/api".format(*servidor.server_address[:2])
+	finally:
+		servidor.shutdown()
+		servidor.server_close()
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--porta", type=int, default=8765)
+	parser.add_argument("--latencia", type=float, default=0.0, help="segundos por relatório")
+	parser.add_argument("--limite", type=int, default=None, help="requisições por segundo antes de responder 429")
+	parser.add_argument("--falhas", type=float, default=0.0, help="fração das requisições respondidas com 503")
+	parser.add_argument("--chave", default=None, help="valor exigido no cabeçalho authkey")
+	parser.add_argument("--cidades", type=int, default=50)
+	parser.add_argument("--posts", type=int, default=30)
+	args = parser.parse_args()
+
+	simulador = SimuladorIMAI(args.latencia, args.limite, args.falhas, args.chave, cidades=args.cidades, posts=args.posts)
+	servidor = criar_servidor(simulador, args.porta)
+	print("API simulada em http://{}:{}/api".format(*servidor.server_address[:2]))
+	try:
+		servidor.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		servidor.server_close()
+		print(simulador.contagem)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,31 @@
+"""Linha de comando: saída no terminal."""
+import json
+
+from analise import cli
+
+
+def _gravar_perfis(pasta, quantidade):
+	for i in range(quantidade):
+		perfil = {
+			"audience_followers": {"data": {
+				"audience_credibility": 0.8,
+				"audience_geo": {"cities": [{"name": "Recife", "weight": 0.4, "country": {"code": "BR"}, "state": {"name": "Pernambuco"}}]},
+				"audience_genders_per_age": [{"code": "25-34", "male": 0.4, "female": 0.6}],
+			}},
+			"user_profile": {"fullname": "Perfil {}".format(i), "recent_posts": [{"stat": {"likes": 10 + i, "comments": 2}}]},
+		}
+		(pasta / "json_perfil{}.json".format(i)).write_text(json.dumps(perfil), encoding="utf-8")
+
+
+def test_silencioso_nao_mostra_progresso_nem_avisos(tmp_path, capsys):
+	_gravar_perfis(tmp_path, 3)
+	saida = tmp_path / "saida"
+	assert cli.main([str(tmp_path), "-o", str(saida), "-p", "1", "-q"]) == 0
+	capturado = capsys.readouterr()
+	assert capturado.err == ""
+	assert capturado.out.strip().endswith(".xlsx")
+
+	assert cli.main([str(tmp_path), "-o", str(saida), "-p", "1"]) == 0
+	capturado = capsys.readouterr()
+	assert "3/3 perfis processados" in capturado.err
+	assert "Sem registro de interesses" in capturado.err
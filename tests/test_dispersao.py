@@ -0,0 +1,147 @@
+"""Paridade da dispersão vetorizada com o laço por perfil anterior.
+
+``dispersao_laco`` reproduz o cálculo de ``infos_influencers.py`` antes da
+vetorização, direto sobre os JSON; o cálculo novo recebe os mesmos perfis
+pelo ``extrair_tabelas`` do app.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analise import dispersao, ingestao
+
+
+def dispersao_laco(dados_brutos):
+	resultado = {}
+	for influencer in dados_brutos.keys():
+		try:
+			likes = []
+			comments = []
+			recent_posts = dados_brutos.get(influencer)["user_profile"]["recent_posts"]
+			df_temp = pd.json_normalize(recent_posts)
+			for i in range(df_temp.shape[0]):
+				comments.append(df_temp.loc[i, "stat.comments"])
+				try:
+					likes.append(df_temp.loc[i, "stat.likes"])
+				except:
+					continue
+			likes = [int(like) if not (like is None or np.isnan(like)) else 0 for like in likes]
+			comments = [int(comment) if not (comment is None or np.isnan(comment)) else 0 for comment in comments]
+			if len(likes) == 0 and len(comments) == 0:
+				raise ValueError("Sem dados de likes nem comments")
+
+			cv_likes = cv_comments = 0
+			if len(likes) > 0 and np.sum(likes) > 0:
+				media = np.mean(likes)
+				cv_likes = (np.std(likes) / media) * 100 if media != 0 else 0
+			if len(comments) > 0 and np.sum(comments) > 0:
+				media = np.mean(comments)
+				cv_comments = (np.std(comments) / media) * 100 if media != 0 else 0
+
+			if cv_likes > 0:
+				resultado[influencer] = round((cv_comments + cv_likes) / 2, 0)
+			else:
+				resultado[influencer] = round(cv_comments, 0)
+		except Exception:
+			pass
+	return pd.Series(resultado, dtype=float)
+
+
+def _stat(rng, tipo):
+	# Valores de likes/comments como aparecem nos JSON: inteiros, fracionários,
+	# nulos, texto inválido ou zero
+	if tipo == "zero":
+		return 0
+	sorteio = rng.random()
+	if sorteio < 0.05:
+		return None
+	if sorteio < 0.08:
+		return "n/d"
+	if sorteio < 0.15:
+		return float(rng.random() * 50)
+	return int(rng.integers(0, 5000))
+
+
+def _perfil(rng, tipo):
+	if tipo == "sem_posts":
+		return {"user_profile": {"recent_posts": []}}
+	posts = []
+	for _ in range(int(rng.integers(1, 25))):
+		stat = {}
+		if tipo != "so_comments" and rng.random() > 0.02:
+			stat["likes"] = _stat(rng, tipo)
+		if tipo != "so_likes":
+			stat["comments"] = _stat(rng, tipo)
+		posts.append({"stat": stat})
+	return {"user_profile": {"recent_posts": posts}}
+
+
+def _tem_texto(perfil):
+	return any(isinstance(valor, str) for post in perfil["user_profile"]["recent_posts"] for valor in post["stat"].values())
+
+
+@pytest.fixture(scope="module")
+def dados():
+	rng = np.random.default_rng(0)
+	tipos = rng.choice(["normal", "so_comments", "so_likes", "zero", "sem_posts"], size=3000, p=[0.7, 0.1, 0.05, 0.05, 0.1])
+	dados = {"perfil{}".format(i): _perfil(rng, tipo) for i, tipo in enumerate(tipos)}
+	# Casos fixos: um único post, todos os valores nulos e zeros com comments positivos
+	dados["um_post"] = {"user_profile": {"recent_posts": [{"stat": {"likes": 10, "comments": 3}}]}}
+	dados["nulos"] = {"user_profile": {"recent_posts": [{"stat": {"likes": None, "comments": None}}] * 3}}
+	dados["likes_zero"] = {"user_profile": {"recent_posts": [{"stat": {"likes": 0, "comments": c}} for c in (1, 5, 9)]}}
+	return dados
+
+
+@pytest.fixture(scope="module")
+def tabelas(dados):
+	return ingestao.extrair_tabelas(dados)
+
+
+def test_igual_ao_laco(dados, tabelas):
+	esperado = dispersao_laco(dados)
+	obtido = dispersao.dispersao_por_perfil(tabelas)
+	com_texto = [perfil for perfil in dados if _tem_texto(dados[perfil])]
+	assert com_texto
+	# Nos perfis sem texto nos números, o resultado é o mesmo do laço
+	np.testing.assert_array_equal(obtido.drop(com_texto, errors="ignore").to_numpy(), esperado.to_numpy())
+	assert list(obtido.drop(com_texto, errors="ignore").index) == list(esperado.index)
+
+
+def test_texto_conta_como_zero(dados, tabelas):
+	# O laço anterior descartava o perfil inteiro quando um like ou comment vinha
+	# como texto (np.isnan levanta TypeError); agora o valor conta como 0
+	esperado = dispersao_laco(dados)
+	obtido = dispersao.dispersao_por_perfil(tabelas)
+	com_comments = [perfil for perfil in dados if _tem_texto(dados[perfil]) and tabelas.perfis.loc[perfil, "posts_comments"]]
+	assert com_comments
+	assert not set(com_comments) & set(esperado.index)
+	assert set(com_comments) <= set(obtido.index)
+
+	perfil = {"user_profile": {"recent_posts": [{"stat": {"likes": "n/d", "comments": c}} for c in (1, 5, 9)]}}
+	assert dispersao.dispersao_por_perfil(ingestao.extrair_tabelas({"a": perfil}))["a"] == round(np.std([1, 5, 9]) / 5 * 100)
+
+
+def test_casos_limite(tabelas):
+	obtido = dispersao.dispersao_por_perfil(tabelas)
+	perfis = tabelas.perfis
+	# Perfis sem posts ou sem comments nos posts ficam de fora
+	assert not set(perfis.index[~perfis["posts_comments"]]) & set(obtido.index)
+	assert (~perfis["posts_comments"]).sum() > 0
+	# Sem likes, só os comments contam; NaN e valores nulos contam como 0
+	assert obtido["um_post"] == 0
+	assert obtido["nulos"] == 0
+	cv_comments = round(np.std([1, 5, 9]) / 5 * 100)
+	assert obtido["likes_zero"] == cv_comments
+	so_comments = [perfil for perfil in obtido.index if perfil.startswith("perfil") and not perfis.loc[perfil, "posts_likes"]]
+	assert so_comments
+
+
+def test_arrays_empacotados():
+	# Segmento vazio: 0; likes variam e comments zerados: média dos dois CVs;
+	# likes constantes (CV 0): só o CV dos comments, com NaN contando como 0
+	offsets = [0, 0, 3, 5, 7]
+	likes = [np.nan, 0, 0, 10, 30, 4, 4]
+	comments = [1, 2, 3, 0, 0, np.nan, 2]
+	obtido = dispersao.dispersao(likes, comments, offsets)
+	esperado_comments = np.std([1, 2, 3]) / 2 * 100
+	assert list(obtido) == [0, round(esperado_comments), round((50 + 0) / 2), 100]
@@ -0,0 +1,57 @@
+"""Exportação do resumo em Parquet, lote a lote."""
+import zipfile
+
+import pandas as pd
+import pytest
+
+from analise import exportacao, resumo
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _linha(username, score, alcance):
+	return {
+		"Username do influenciador": username,
+		"Nome do influenciador": username.title(),
+		"Score da audiência": score,
+		"Dispersão de interações": 12,
+		"Alcance médio esperado": alcance,
+		"Interesses da audiência": "Moda: 30%",
+		"Classes sociais": "Classe C: 40,00%",
+		"Escolaridade": "Médio: 50,00%",
+	}
+
+
+def test_parquet_com_na_no_segundo_lote(tmp_path):
+	# O primeiro lote só tem números em "Score da audiência"; o segundo traz "N/A"
+	caminho = tmp_path / "resumo.parquet"
+	with exportacao.EscritorResumo(str(caminho), "parquet") as escritor:
+		escritor.acrescentar([_linha("a", 87, "1.200"), _linha("b", 45, "3.400")])
+		escritor.acrescentar([_linha("c", "N/A", "N/A"), _linha("d", 60, None)])
+
+	tabela = pq.read_table(caminho)
+	assert tabela.column_names == resumo.COLUNAS_RESUMO
+	assert tabela.column("Score da audiência").to_pylist() == ["87", "45", "N/A", "60"]
+	assert tabela.column("Alcance médio esperado").to_pylist() == ["1.200", "3.400", "N/A", None]
+	assert tabela.column("Dispersão de interações").to_pylist() == [12] * 4
+
+
+def test_parquet_extras_com_coluna_nula_no_primeiro_lote(tmp_path):
+	caminho = tmp_path / "resumo.zip"
+	colunas = ["influencer", "Cidade", "Estado", "country.code", "weight"]
+	lotes = [
+		pd.DataFrame([("a", "Recife", None, "BR", 0.5)], columns=colunas),
+		pd.DataFrame([("b", "Natal", "Rio Grande do Norte", "BR", float("nan"))], columns=colunas),
+	]
+	with exportacao.EscritorResumo(str(caminho), "parquet") as escritor:
+		escritor.acrescentar([_linha("a", 87, "1.200")])
+		for lote in lotes:
+			escritor.escrever(exportacao.ABA_CIDADES, lote)
+	assert escritor.extensao == "zip"
+
+	pasta = tmp_path / "extraido"
+	zipfile.ZipFile(caminho).extractall(pasta)
+	tabela = pq.read_table(pasta / "pesos_por_cidade.parquet")
+	assert str(tabela.schema.field("Estado").type) == "string"
+	assert tabela.column("Estado").to_pylist() == [None, "Rio Grande do Norte"]
+	assert tabela.column("weight").to_pylist() == [0.5, None]
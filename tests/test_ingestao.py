@@ -0,0 +1,36 @@
+"""Extração das tabelas com JSON fora do formato esperado."""
+from analise import ingestao
+
+
+def _perfil(credibilidade):
+	return {
+		"audience_followers": {"data": {
+			"audience_credibility": credibilidade,
+			"audience_geo": {"cities": [{"name": "Recife", "weight": 0.5, "country": {"code": "BR"}, "state": {"name": "Pernambuco"}}]},
+		}},
+		"user_profile": {"fullname": "Perfil", "recent_posts": [{"stat": {"likes": 10, "comments": 2}}]},
+	}
+
+
+def test_formatos_inesperados_nao_interrompem_o_lote():
+	dados = {
+		"antes": _perfil(0.8),
+		"lista": [_perfil(0.5)],
+		"sem_dados": {"audience_followers": {"data": None}, "user_profile": {"fullname": "Sem dados"}},
+		"perfil_lista": {"audience_followers": [], "user_profile": ["x"]},
+		"posts_estranhos": {"user_profile": {"recent_posts": ["x", {"stat": None}, {"stat": {"likes": 3, "comments": 1}}]}},
+		"depois": _perfil(0.9),
+	}
+	tabelas = ingestao.extrair_tabelas(dados)
+
+	# O JSON que não é um objeto fica de fora, com aviso; os demais seguem
+	assert list(tabelas.perfis.index) == ["antes", "sem_dados", "perfil_lista", "posts_estranhos", "depois"]
+	assert ("perfil", "lista") in {(secao, influencer) for secao, influencer, _ in tabelas.avisos}
+	assert list(tabelas.perfis["audience_credibility"]) == [0.8, None, None, None, 0.9]
+	assert tabelas.perfis.loc["sem_dados", "fullname"] == "Sem dados"
+	assert list(tabelas.cidades["influencer"]) == ["antes", "depois"]
+	cidades_sem_registro = {influencer for secao, influencer, _ in tabelas.avisos if secao == "cidades"}
+	assert cidades_sem_registro == {"sem_dados", "perfil_lista", "posts_estranhos"}
+	# Posts que não são objetos contam como posts sem estatísticas
+	assert len(tabelas.posts[tabelas.posts["influencer"] == "posts_estranhos"]) == 3
+	assert tabelas.perfis.loc["posts_estranhos", "posts_comments"]
@@ -0,0 +1,101 @@
+"""Download das miniaturas: domínios permitidos, limite de bytes e expiração das falhas."""
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from analise import miniaturas
+
+
+def _png():
+	saida = io.BytesIO()
+	Image.new("RGB", (800, 600), (200, 30, 30)).save(saida, format="PNG")
+	return saida.getvalue()
+
+
+class _Servidor(BaseHTTPRequestHandler):
+	pedidos = []
+	falhas_restantes = 0
+
+	def do_GET(self):
+		_Servidor.pedidos.append(self.path)
+		if self.path == "/falha" and _Servidor.falhas_restantes > 0:
+			_Servidor.falhas_restantes -= 1
+			self.send_error(500)
+			return
+		if self.path == "/redireciona":
+			self.send_response(302)
+			self.send_header("Location", "/imagem.png")
+			self.end_headers()
+			return
+		corpo = b"x" * 50_000 if self.path == "/grande" else _png()
+		self.send_response(200)
+		if self.path != "/grande":
+			self.send_header("Content-Length", str(len(corpo)))
+		self.end_headers()
+		self.wfile.write(corpo)
+
+	def log_message(self, *args):
+		pass
+
+
+@pytest.fixture(scope="module")
+def url_base():
+	servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+	threading.Thread(target=servidor.serve_forever, daemon=True).start()
+	yield "http://127.0.0.1:{}".format(servidor.server_port)
+	servidor.shutdown()
+
+
+@pytest.fixture
+def cache(tmp_path):
+	_Servidor.pedidos.clear()
+	return miniaturas.CacheMiniaturas(pasta=str(tmp_path), dominios=["127.0.0.1"], espera_falha=60)
+
+
+def test_url_permitida():
+	assert miniaturas.url_permitida("https://scontent-gru2-1.cdninstagram.com/v/t51/a.jpg")
+	assert miniaturas.url_permitida("https://imai.co/img/a.jpg")
+	assert not miniaturas.url_permitida("https://cdninstagram.com.exemplo.com/a.jpg")
+	assert not miniaturas.url_permitida("file:///etc/passwd")
+	assert not miniaturas.url_permitida("http://169.254.169.254/latest/meta-data")
+	assert not miniaturas.url_permitida("http://[::1")
+
+
+def test_baixa_e_reduz(cache, url_base):
+	conteudo = cache.obter(url_base + "/imagem.png")
+	with Image.open(io.BytesIO(conteudo)) as imagem:
+		assert imagem.format == "JPEG" and max(imagem.size) == miniaturas.LARGURA_MINIATURA
+	# Da segunda vez, vem do disco
+	assert cache.obter(url_base + "/imagem.png") == conteudo
+	assert _Servidor.pedidos == ["/imagem.png"]
+
+
+def test_dominio_fora_da_lista_nao_e_baixado(tmp_path, url_base):
+	cache = miniaturas.CacheMiniaturas(pasta=str(tmp_path))
+	_Servidor.pedidos.clear()
+	assert cache.obter(url_base + "/imagem.png") is None
+	assert _Servidor.pedidos == []
+
+
+def test_limite_de_bytes_e_redirecionamento(cache, url_base):
+	with pytest.raises(ValueError):
+		miniaturas.baixar(url_base + "/grande", max_bytes=10_000)
+	assert len(miniaturas.baixar(url_base + "/grande", max_bytes=100_000)) == 50_000
+	assert cache.obter(url_base + "/redireciona") is None
+	assert _Servidor.pedidos[-1] == "/redireciona"
+
+
+def test_falha_expira(cache, url_base, monkeypatch):
+	_Servidor.falhas_restantes = 1
+	assert cache.obter(url_base + "/falha") is None
+	# Dentro da espera, a URL não é tentada de novo
+	assert cache.obter(url_base + "/falha") is None
+	assert _Servidor.pedidos == ["/falha"]
+
+	agora = miniaturas.time.monotonic() + 61
+	monkeypatch.setattr(miniaturas.time, "monotonic", lambda: agora)
+	assert cache.obter(url_base + "/falha") is not None
+	assert _Servidor.pedidos == ["/falha", "/falha"]
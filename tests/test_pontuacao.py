@@ -0,0 +1,158 @@
+"""Paridade do cálculo vetorizado de classes e escolaridade com o cálculo anterior em pandas.
+
+As funções ``*_pandas`` reproduzem os groupby/merge e o laço de ``norm.cdf``
+de ``analise/resumo.py`` antes da vetorização. As cidades do fixture são
+cidades de referência cujo nome não tem variantes nem linhas repetidas nas
+planilhas: nelas o índice normalizado de cidades dá o mesmo resultado que o
+merge pelo nome (Vitória, com linhas repetidas, é tratada à parte).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+
+from analise import pontuacao, referencias
+
+GRUPOS_ETARIOS = ["13-17", "18-24", "25-34", "35-44", "45-64"]
+
+
+def classes_pandas(df_cidades):
+	classes_por_cidade = referencias.classes_por_cidade()
+	df_classes_influ = df_cidades.copy()
+	total_weight_por_influencer = df_classes_influ.groupby("influencer")["weight"].transform("sum")
+	total_weight_por_cidade = df_classes_influ.groupby(["influencer", "Cidade"])["weight"].transform("sum")
+	df_classes_influ["normalized_weight"] = total_weight_por_cidade / total_weight_por_influencer
+	df_merged_classes = pd.merge(df_classes_influ, classes_por_cidade, left_on="Cidade", right_index=True, how="inner")
+	df_merged_classes["total_weight"] = df_merged_classes.groupby("influencer")["normalized_weight"].transform("sum")
+	df_merged_classes["normalized_weight"] = df_merged_classes["normalized_weight"] / df_merged_classes["total_weight"]
+	for coluna in pontuacao.COLUNAS_CLASSES:
+		df_merged_classes["normalized " + coluna] = df_merged_classes["normalized_weight"] * df_merged_classes[coluna]
+	resultado = df_merged_classes.groupby("influencer")[["normalized " + coluna for coluna in pontuacao.COLUNAS_CLASSES]].sum()
+	resultado.columns = pontuacao.COLUNAS_CLASSES
+	return resultado
+
+
+def educacao_pandas(df_cidades, df_demografia):
+	educacao_por_cidade = referencias.educacao_por_cidade()
+	df_unido = pd.merge(df_cidades, df_demografia, on="influencer")
+	total_weight_por_influencer = df_unido.groupby("influencer")["weight"].transform("sum")
+	total_weight_por_cidade = df_unido.groupby(["influencer", "Cidade"])["weight"].transform("sum")
+	df_unido["weight_normalized"] = total_weight_por_cidade / total_weight_por_influencer
+	df_unido["male_weighted"] = df_unido["male"] * df_unido["weight_normalized"]
+	df_unido["female_weighted"] = df_unido["female"] * df_unido["weight_normalized"]
+	df_unido.rename(columns={"code": "Grupo Etário", "male": "Proporção Male", "female": "Proporção Female"}, inplace=True)
+	df_unido_edu = df_unido.merge(educacao_por_cidade, left_on=["Cidade", "Grupo Etário"], right_index=True, how="left")
+	df_unido_edu["anos_female"] = df_unido_edu["female_weighted"] * df_unido_edu["female"]
+	df_unido_edu["anos_male"] = df_unido_edu["male_weighted"] * df_unido_edu["male"]
+	total_anos_por_influencer = df_unido_edu.groupby("influencer")[["anos_female", "anos_male"]].sum().sum(axis=1)
+
+	linhas = {}
+	for influencer, media in total_anos_por_influencer.items():
+		linhas[influencer] = [
+			norm.cdf(5, media, 3),
+			norm.cdf(9, media, 3) - norm.cdf(5, media, 3),
+			norm.cdf(12, media, 3) - norm.cdf(9, media, 3),
+			1 - norm.cdf(12, media, 3),
+		]
+	return pd.DataFrame.from_dict(linhas, orient="index", columns=pontuacao.COLUNAS_EDUCACAO)
+
+
+def _cidades_sem_variantes(n):
+	# Cidades presentes nas duas planilhas, com uma linha por grupo etário e cuja
+	# chave no índice normalizado não recebe nenhum outro nome das planilhas
+	classes = referencias.classes_por_cidade()
+	educacao = referencias.educacao_por_cidade().reset_index()
+	indice = pontuacao.matrizes_referencia().indice_cidades
+	nomes = pd.Series(list(classes.index) + list(educacao["Cidade"].unique()))
+	nomes_por_chave = nomes.groupby(indice.chaves(nomes)).nunique()
+	linhas_por_cidade = educacao.groupby("Cidade").size()
+	candidatas = [
+		cidade for cidade in classes.index
+		if linhas_por_cidade.get(cidade) == educacao["Grupo Etário"].nunique()
+		and nomes_por_chave.get(indice.chave(cidade)) == 1
+	]
+	return list(np.random.default_rng(0).choice(candidatas, size=n, replace=False))
+
+
+@pytest.fixture(scope="module")
+def tabelas():
+	rng = np.random.default_rng(1)
+	cidades = _cidades_sem_variantes(12)
+	linhas = []
+	# Perfis com cidades de referência, algumas repetidas no mesmo perfil
+	for i in range(6):
+		for cidade in rng.choice(cidades, size=5):
+			linhas.append(("perfil{}".format(i), cidade, "BR", rng.random() / 10))
+	# Cidade desconhecida junto de cidades conhecidas
+	linhas += [("desconhecida", "Cidade Que Não Existe", "BR", 0.2), ("desconhecida", cidades[0], "BR", 0.1)]
+	# Apenas cidades desconhecidas
+	linhas += [("so_desconhecidas", "Cidade Que Não Existe", "BR", 0.3), ("so_desconhecidas", "Outra Cidade", "BR", 0.1)]
+	# Apenas cidades no exterior
+	linhas += [("exterior", "Lisboa", "PT", 0.4), ("exterior", "Buenos Aires", "AR", 0.2)]
+	# Sem dados de gênero e idade
+	linhas += [("sem_demografia", cidades[1], "BR", 0.3), ("sem_demografia", cidades[2], "BR", 0.2)]
+	df_cidades = pd.DataFrame(linhas, columns=["influencer", "Cidade", "country.code", "weight"])
+	df_cidades = df_cidades[df_cidades["country.code"] == "BR"]
+
+	# "sem_cidades" tem gênero e idade, mas nenhuma cidade
+	perfis_demografia = ["perfil{}".format(i) for i in range(6)] + ["desconhecida", "so_desconhecidas", "exterior", "sem_cidades"]
+	df_demografia = pd.DataFrame([
+		(perfil, grupo, rng.random() / 10, rng.random() / 10)
+		for perfil in perfis_demografia
+		for grupo in GRUPOS_ETARIOS
+	], columns=["influencer", "code", "male", "female"])
+	return df_cidades, df_demografia
+
+
+def test_classes_iguais_ao_pandas(tabelas):
+	df_cidades, _ = tabelas
+	esperado = classes_pandas(df_cidades)
+	obtido = pontuacao.pontuar_classes(df_cidades)
+	assert list(obtido.index) == list(esperado.index)
+	assert "sem_demografia" in obtido.index
+	assert not {"so_desconhecidas", "exterior", "sem_cidades"} & set(obtido.index)
+	np.testing.assert_allclose(obtido.to_numpy(), esperado.to_numpy(), rtol=1e-10)
+
+
+def test_educacao_igual_ao_pandas(tabelas):
+	df_cidades, df_demografia = tabelas
+	esperado = educacao_pandas(df_cidades, df_demografia)
+	obtido = pontuacao.pontuar_educacao(df_cidades, df_demografia)
+	assert list(obtido.index) == list(esperado.index)
+	assert not {"sem_demografia", "exterior", "sem_cidades"} & set(obtido.index)
+	# Sem nenhuma cidade de referência, a média é 0 nos dois cálculos
+	assert "so_desconhecidas" in obtido.index
+	np.testing.assert_allclose(obtido.to_numpy(), esperado.to_numpy(), rtol=1e-10, atol=1e-15)
+
+
+def test_tabelas_vazias():
+	df_cidades = pd.DataFrame(columns=["influencer", "Cidade", "country.code", "weight"])
+	df_demografia = pd.DataFrame(columns=["influencer", "code", "male", "female"])
+	assert pontuacao.pontuar_classes(df_cidades).empty
+	assert pontuacao.pontuar_educacao(df_cidades, df_demografia).empty
+
+
+def test_vitoria_usa_a_media_das_linhas_repetidas():
+	# Vitória tem linhas repetidas na planilha de educação: o merge somava as
+	# repetições e o índice normalizado usa a média delas
+	educacao = referencias.educacao_por_cidade().loc["Vitória"]
+	df_cidades = pd.DataFrame({"influencer": ["a"], "Cidade": ["Vitória"], "country.code": ["BR"], "weight": [1.0]})
+	df_demografia = pd.DataFrame({"influencer": ["a"], "code": ["25-34"], "male": [0.0], "female": [1.0]})
+	esperado = educacao.loc["25-34", "female"]
+	assert len(np.atleast_1d(esperado)) > 1
+	assert pontuacao.anos_de_estudo(df_cidades, df_demografia)["a"] == pytest.approx(np.mean(esperado))
+
+
+def test_cidade_sem_referencia_no_modelo_de_escolaridade():
+	# Metade da audiência em uma cidade sem referência: sem a mistura, ela conta
+	# como 0 anos de estudo (como no resumo); com a mistura, é descartada
+	cidade = _cidades_sem_variantes(1)[0]
+	df_demografia = pd.DataFrame({"influencer": ["a"], "code": ["25-34"], "male": [0.0], "female": [1.0]})
+	conhecida = pd.DataFrame({"influencer": ["a"], "Cidade": [cidade], "country.code": ["BR"], "weight": [0.5]})
+	desconhecida = pd.DataFrame({"influencer": ["a"], "Cidade": ["Cidade Que Não Existe"], "country.code": ["BR"], "weight": [0.5]})
+	so_conhecida = pontuacao.ModeloEducacao.construir(conhecida, df_demografia)
+	com_desconhecida = pontuacao.ModeloEducacao.construir(pd.concat([conhecida, desconhecida]), df_demografia)
+
+	assert com_desconhecida.medias[0] == pytest.approx(so_conhecida.medias[0] / 2)
+	assert not np.allclose(com_desconhecida.probabilidades().to_numpy(), so_conhecida.probabilidades().to_numpy())
+	pd.testing.assert_frame_equal(com_desconhecida.probabilidades(mistura=True), so_conhecida.probabilidades(mistura=True))
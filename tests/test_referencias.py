@@ -0,0 +1,67 @@
+"""Cache colunar das planilhas de referência."""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analise import referencias
+
+
+@pytest.fixture
+def planilha(tmp_path, monkeypatch):
+	monkeypatch.setattr(referencias, "PASTA_CACHE", str(tmp_path / "cache"))
+	caminho = tmp_path / "referencia.xlsx"
+	pd.DataFrame({
+		"Cidade": ["Recife", None, "Natal"],
+		"Grupo Etário": ["18-24", "25-34", None],
+		"female": [9.5, np.nan, 11.0],
+	}).to_excel(caminho)
+	return str(caminho)
+
+
+def test_valores_ausentes_continuam_ausentes(planilha):
+	lido, sha = referencias.ler_planilha(planilha)
+	assert os.path.exists(referencias._caminho_cache(planilha))
+	do_cache, sha_cache = referencias.ler_planilha(planilha)
+	assert sha_cache == sha
+	pd.testing.assert_frame_equal(do_cache, lido, check_dtype=False)
+	assert do_cache["Cidade"].isna().tolist() == [False, True, False]
+	assert do_cache["Grupo Etário"].isna().tolist() == [False, False, True]
+	assert "nan" not in set(do_cache["Cidade"].dropna())
+
+
+def test_cache_em_formato_antigo_e_refeito(planilha):
+	referencias.ler_planilha(planilha)
+	cache = referencias._caminho_cache(planilha)
+	mtime = os.stat(planilha).st_mtime_ns
+	assert referencias._ler_cache(cache, mtime)[0] is not None
+	# Cache sem a versão do formato (texto vazio gravado como "nan")
+	with np.load(cache) as npz:
+		antigo = {nome: npz[nome] for nome in npz.files if nome != "_versao" and not nome.startswith("nulos_")}
+	np.savez(cache, **antigo)
+	assert referencias._ler_cache(cache, mtime) == (None, None)
+
+
+def test_escritas_simultaneas(planilha):
+	df, sha = referencias.ler_planilha(planilha)
+	cache = referencias._caminho_cache(planilha)
+	mtime = os.stat(planilha).st_mtime_ns
+	erros = []
+
+	def gravar():
+		try:
+			for _ in range(20):
+				referencias._gravar_cache(cache, df, mtime, sha)
+		except Exception as e:
+			erros.append(e)
+
+	threads = [threading.Thread(target=gravar) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert not erros
+	assert os.listdir(os.path.dirname(cache)) == [os.path.basename(cache)]
+	pd.testing.assert_frame_equal(referencias._ler_cache(cache, mtime)[0], df, check_dtype=False)